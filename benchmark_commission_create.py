@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Commission Line Create Benchmark
+================================
+
+This script compares creating commission lines one record at a time, the
+way the former single-dict create override was called, with one batched
+create of the same values. Commission rates are left out of the values, so
+both runs resolve them from the products.
+
+The values are built from existing eligible invoice lines (100k by default,
+generate them first with generate_commission_data.py). Existing commission
+lines are deleted in the current transaction, which is rolled back at the
+end, so the real commission lines are never touched.
+
+Usage:
+odoo-bin shell -c /path/to/odoo.conf -d your_database
+>>> exec(open('/path/to/benchmark_commission_create.py').read())
+"""
+
+import time
+
+LINE_COUNT = 100000
+
+
+def _prepare_vals_list(env, line_count):
+    """Commission line values without rate for ``line_count`` eligible invoice lines."""
+    service = env['sales.commission.service']
+    move_lines = env['account.move.line'].search(
+        service._get_eligible_line_domain() + [('product_id.product_tmpl_id.commission_rate', '!=', 0)],
+        order='id', limit=line_count,
+    )
+    rows = move_lines.read(['move_id', 'product_id', 'quantity', 'price_subtotal'], load=None)
+    vals_list = list(service._prepare_commission_vals(rows, service._get_commission_rate_index()).values())
+    for vals in vals_list:
+        del vals['commission_rate']
+    return vals_list
+
+
+def _time_create(env, create):
+    """Run ``create`` and flush, return ``(seconds, queries)``."""
+    env.invalidate_all()
+    queries = env.cr.sql_log_count
+    start = time.perf_counter()
+    create()
+    env.flush_all()
+    return time.perf_counter() - start, env.cr.sql_log_count - queries
+
+
+def benchmark_commission_create(env, line_count=LINE_COUNT):
+    """Print the time and query count of per-record and batched commission line creation."""
+    print("=" * 80)
+    print("COMMISSION LINE CREATE BENCHMARK")
+    print("=" * 80)
+
+    cr = env.cr
+    commission_line_model = env['sales.commission.line']
+    vals_list = _prepare_vals_list(env, line_count)
+    if len(vals_list) < line_count:
+        print(f"Only {len(vals_list)} eligible invoice lines found, run generate_commission_data.py first.")
+    print(f"Creating {len(vals_list)} commission lines")
+
+    try:
+        cr.execute("DELETE FROM sales_commission_line")
+        cr.execute("SAVEPOINT commission_create_benchmark")
+
+        single_seconds, single_queries = _time_create(
+            env, lambda: [commission_line_model.create(dict(vals)) for vals in vals_list],
+        )
+        cr.execute("ROLLBACK TO SAVEPOINT commission_create_benchmark")
+
+        batch_seconds, batch_queries = _time_create(
+            env, lambda: commission_line_model.create([dict(vals) for vals in vals_list]),
+        )
+
+        print(f"\n{'Create':12} | {'Seconds':>10} | {'Queries':>10} | {'Lines/s':>10}")
+        print("-" * 52)
+        for label, seconds, queries in [
+            ('per record', single_seconds, single_queries),
+            ('batched', batch_seconds, batch_queries),
+        ]:
+            print(f"{label:12} | {seconds:10.2f} | {queries:10} | {len(vals_list) / max(seconds, 0.001):10.0f}")
+        print(f"\nSpeedup: {single_seconds / max(batch_seconds, 0.001):.1f}x")
+        print("=" * 80)
+        return {
+            'lines': len(vals_list),
+            'single_seconds': single_seconds,
+            'single_queries': single_queries,
+            'batch_seconds': batch_seconds,
+            'batch_queries': batch_queries,
+        }
+    finally:
+        cr.rollback()
+
+
+# Main execution
+if 'env' in globals():
+    benchmark_commission_create(env)
+else:
+    print("This script should be run in Odoo shell context.")
+    print("Example:")
+    print("  odoo-bin shell -c /path/to/odoo.conf -d your_database")
+    print("  >>> exec(open('/path/to/benchmark_commission_create.py').read())")
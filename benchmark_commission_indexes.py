@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Commission Line Index Benchmark
+===============================
+
+This script measures the report query shapes of sales.commission.line with
+the baseline single-column indexes, then with the composite and partial
+indexes declared in COMMISSION_LINE_INDEXES. It prints the EXPLAIN plan and
+execution time of each query before and after.
+
+Queries run against a synthetic copy of the table (5M rows by default)
+created in the current transaction, which is rolled back at the end, so the
+real commission lines are never touched.
+
+Usage:
+odoo-bin shell -c /path/to/odoo.conf -d your_database
+>>> exec(open('/path/to/benchmark_commission_indexes.py').read())
+"""
+
+import time
+
+from odoo.addons.sales_commision_product.models.commission import COMMISSION_LINE_INDEXES
+
+BENCH_TABLE = 'sales_commission_line_bench'
+ROW_COUNT = 5000000
+COMPANY_COUNT = 3
+SALESPERSON_COUNT = 200
+YEARS = 5
+
+# single-column indexes created by index=True on the model fields
+BASELINE_INDEXES = ['salesperson_id', 'invoice_id', 'invoice_line_id', 'product_id', 'company_id']
+
+QUERIES = [
+    ('List view, first page', """
+        SELECT id FROM {table}
+         WHERE company_id = 1
+         ORDER BY invoice_date DESC, id DESC
+         LIMIT 80
+    """),
+    ('Pivot: commission per salesperson for a quarter', """
+        SELECT salesperson_id, SUM(commission_amount), SUM(line_subtotal)
+          FROM {table}
+         WHERE company_id = 1
+           AND invoice_date BETWEEN CURRENT_DATE - 90 AND CURRENT_DATE
+         GROUP BY salesperson_id
+    """),
+    ('Report wizard: paid lines of a month', """
+        SELECT salesperson_id, SUM(commission_amount)
+          FROM {table}
+         WHERE company_id = 1
+           AND invoice_date BETWEEN CURRENT_DATE - 30 AND CURRENT_DATE
+           AND payment_state IN ('paid', 'in_payment')
+           AND invoice_state = 'posted'
+         GROUP BY salesperson_id
+    """),
+    ('Report details: one salesperson, keyset page', """
+        SELECT id, invoice_date, commission_amount FROM {table}
+         WHERE salesperson_id = 7
+           AND invoice_date BETWEEN CURRENT_DATE - 365 AND CURRENT_DATE
+         ORDER BY invoice_date, id
+         LIMIT 2000
+    """),
+    ('Returns of a year', """
+        SELECT SUM(ABS(line_subtotal)) FROM {table}
+         WHERE company_id = 1
+           AND move_type = 'out_refund'
+           AND invoice_date BETWEEN CURRENT_DATE - 365 AND CURRENT_DATE
+    """),
+]
+
+
+def _create_bench_table(cr, row_count):
+    """Create and fill the synthetic commission line table."""
+    cr.execute(f"CREATE TABLE {BENCH_TABLE} (LIKE sales_commission_line INCLUDING DEFAULTS)")
+    cr.execute(f"""
+        INSERT INTO {BENCH_TABLE} (
+            id, salesperson_id, invoice_id, invoice_line_id, product_id, quantity,
+            commission_rate, commission_amount, line_subtotal, company_id,
+            invoice_date, move_type, invoice_state, payment_state
+        )
+        SELECT n,
+               1 + (n * 7919) %% %(salespersons)s,
+               n / 3,
+               n,
+               1 + (n * 104729) %% 5000,
+               1,
+               10,
+               CASE WHEN n %% 10 = 0 THEN -10 ELSE 10 END,
+               CASE WHEN n %% 10 = 0 THEN -100 ELSE 100 END,
+               1 + n %% %(companies)s,
+               CURRENT_DATE - ((n * 31) %% (365 * %(years)s)),
+               CASE WHEN n %% 10 = 0 THEN 'out_refund' ELSE 'out_invoice' END,
+               'posted',
+               (ARRAY['not_paid', 'partial', 'in_payment', 'paid', 'paid'])[1 + n %% 5]
+          FROM generate_series(1, %(rows)s) AS n
+    """, {'rows': row_count, 'salespersons': SALESPERSON_COUNT, 'companies': COMPANY_COUNT, 'years': YEARS})
+    for column in BASELINE_INDEXES:
+        cr.execute(f"CREATE INDEX {BENCH_TABLE}_{column}_idx ON {BENCH_TABLE} ({column})")
+    cr.execute(f"ANALYZE {BENCH_TABLE}")
+
+
+def _create_tuned_indexes(cr):
+    """Create the indexes of COMMISSION_LINE_INDEXES on the synthetic table."""
+    for suffix, expressions, where in COMMISSION_LINE_INDEXES:
+        cr.execute(f"CREATE INDEX {BENCH_TABLE}_{suffix} ON {BENCH_TABLE} ({', '.join(expressions)})"
+                   + (f" WHERE {where}" if where else ""))
+    cr.execute(f"ANALYZE {BENCH_TABLE}")
+
+
+def _explain_queries(cr):
+    """Return ``[(label, execution ms, plan lines)]`` of every benchmark query."""
+    results = []
+    for label, query in QUERIES:
+        # warm the cache so both runs compare plans, not disk reads
+        cr.execute(query.format(table=BENCH_TABLE))
+        cr.execute("EXPLAIN (ANALYZE, BUFFERS) " + query.format(table=BENCH_TABLE))
+        plan = [row[0] for row in cr.fetchall()]
+        execution_ms = next(
+            float(line.split(':')[1].split()[0]) for line in plan if line.startswith('Execution Time')
+        )
+        results.append((label, execution_ms, plan))
+    return results
+
+
+def benchmark_commission_indexes(env, row_count=ROW_COUNT):
+    """Print the plans and timings of the report queries before and after the tuned indexes."""
+    print("=" * 80)
+    print("COMMISSION LINE INDEX BENCHMARK")
+    print("=" * 80)
+
+    cr = env.cr
+    start = time.perf_counter()
+    _create_bench_table(cr, row_count)
+    print(f"Synthetic table: {row_count} rows in {time.perf_counter() - start:.1f}s")
+
+    try:
+        before = _explain_queries(cr)
+        _create_tuned_indexes(cr)
+        after = _explain_queries(cr)
+
+        for (label, before_ms, before_plan), (dummy, after_ms, after_plan) in zip(before, after):
+            print(f"\n{label}")
+            print("-" * 60)
+            print("Before:")
+            print("\n".join("    " + line for line in before_plan))
+            print("After:")
+            print("\n".join("    " + line for line in after_plan))
+
+        print(f"\n{'Query':50} | {'Before ms':>10} | {'After ms':>10} | {'Speedup':>7}")
+        print("-" * 86)
+        for (label, before_ms, dummy), (dummy, after_ms, dummy) in zip(before, after):
+            print(f"{label:50} | {before_ms:10.2f} | {after_ms:10.2f} | {before_ms / max(after_ms, 0.001):6.1f}x")
+        print("=" * 80)
+        return [(label, before_ms, after_ms) for (label, before_ms, dummy), (dummy, after_ms, dummy) in zip(before, after)]
+    finally:
+        cr.rollback()
+
+
+# Main execution
+if 'env' in globals():
+    benchmark_commission_indexes(env)
+else:
+    print("This script should be run in Odoo shell context.")
+    print("Example:")
+    print("  odoo-bin shell -c /path/to/odoo.conf -d your_database")
+    print("  >>> exec(open('/path/to/benchmark_commission_indexes.py').read())")
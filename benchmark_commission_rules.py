@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Commission Rule Engine Benchmark
+================================
+
+This script measures what commission rules cost a sync. It times building
+commission values for existing eligible invoice lines (100k by default,
+generate them first with generate_commission_data.py) with the product
+rate only, then with a generated set of rules on salespeople, product
+categories and amount tiers compiled by CompiledRuleSet. The SQL engine is
+timed the same way, with a cold full sync (all commission lines deleted
+first) without and with the rules, so the cost of compiling the rules into
+their lookup table and joining it is included.
+
+The rules are created in the current transaction, which is rolled back at
+the end, so the database is left untouched.
+
+Usage:
+odoo-bin shell -c /path/to/odoo.conf -d your_database
+>>> exec(open('/path/to/benchmark_commission_rules.py').read())
+"""
+
+import time
+
+LINE_COUNT = 100000
+RULE_COUNT = 200
+
+
+def _read_line_rows(env, line_count):
+    """Raw rows of ``line_count`` eligible invoice lines, as read by the ORM sync."""
+    service = env['sales.commission.service']
+    move_lines = env['account.move.line'].search(
+        service._get_eligible_line_domain(), order='id', limit=line_count,
+    )
+    return move_lines.read(['move_id', 'product_id', 'quantity', 'price_subtotal'], load=None)
+
+
+def _create_rules(env, rule_count):
+    """Create ``rule_count`` rules spread over salespeople, categories and tiers."""
+    salespeople = env['account.move'].search([
+        ('move_type', 'in', ('out_invoice', 'out_refund')), ('invoice_user_id', '!=', False),
+    ], limit=1000).invoice_user_id
+    categories = env['product.category'].search([])
+    vals_list = []
+    for index in range(rule_count):
+        vals = {
+            'name': f'Benchmark rule {index}',
+            'sequence': index,
+            'min_amount': (index % 4) * 250.0,
+            'rate': 1.0 + index % 20,
+        }
+        if salespeople and index % 2 == 0:
+            vals['salesperson_id'] = salespeople[index % len(salespeople)].id
+        if categories and index % 3 == 0:
+            vals['product_categ_id'] = categories[index % len(categories)].id
+        vals_list.append(vals)
+    return env['sales.commission.rule'].create(vals_list)
+
+
+def _time_prepare(env, line_rows, with_rules):
+    """Build commission values for ``line_rows``, return ``(seconds, commission lines)``."""
+    service = env['sales.commission.service']
+    env.invalidate_all()
+    start = time.perf_counter()
+    rate_index = service._get_commission_rate_index()
+    rule_set = service._get_commission_rule_set() if with_rules else None
+    eligible_map = service._prepare_commission_vals(line_rows, rate_index, rule_set)
+    return time.perf_counter() - start, len(eligible_map)
+
+
+def _time_sql_sync(env):
+    """Run a cold SQL engine sync and roll it back, return ``(seconds, counts)``."""
+    cr = env.cr
+    service = env['sales.commission.service']
+    cr.execute("SAVEPOINT benchmark_sql_sync")
+    try:
+        cr.execute("DELETE FROM sales_commission_line")
+        env.invalidate_all()
+        start = time.perf_counter()
+        counts = service._sync_commission_lines('sql')
+        return time.perf_counter() - start, counts
+    finally:
+        cr.execute("ROLLBACK TO SAVEPOINT benchmark_sql_sync")
+        env.invalidate_all()
+
+
+def benchmark_commission_rules(env, line_count=LINE_COUNT, rule_count=RULE_COUNT):
+    """Print the throughput of commission value building without and with rules."""
+    print("=" * 80)
+    print("COMMISSION RULE ENGINE BENCHMARK")
+    print("=" * 80)
+
+    cr = env.cr
+    line_rows = _read_line_rows(env, line_count)
+    if len(line_rows) < line_count:
+        print(f"Only {len(line_rows)} eligible invoice lines found, run generate_commission_data.py first.")
+    print(f"Evaluating {len(line_rows)} invoice lines")
+
+    try:
+        env['sales.commission.rule'].search([]).write({'active': False})
+        product_seconds, product_lines = _time_prepare(env, line_rows, with_rules=False)
+        env.flush_all()
+        sql_product_seconds, sql_product_counts = _time_sql_sync(env)
+        _create_rules(env, rule_count)
+        rule_seconds, rule_lines = _time_prepare(env, line_rows, with_rules=True)
+        env.flush_all()
+        sql_seconds, counts = _time_sql_sync(env)
+
+        print(f"\n{'Rates':24} | {'Seconds':>10} | {'Evaluated':>10} | {'Lines/s':>10}")
+        print("-" * 64)
+        for label, seconds, evaluated in [
+            ('product rate only (ORM)', product_seconds, len(line_rows)),
+            (f'{rule_count} rules (ORM)', rule_seconds, len(line_rows)),
+            ('product rate only (SQL)', sql_product_seconds, sql_product_counts['scanned']),
+            (f'{rule_count} rules (SQL)', sql_seconds, counts['scanned']),
+        ]:
+            print(f"{label:24} | {seconds:10.2f} | {evaluated:10} | {evaluated / max(seconds, 0.001):10.0f}")
+        print(f"\nCommission lines: {product_lines} with product rates, {rule_lines} with rules")
+        print(f"\nRule overhead (ORM): {rule_seconds / max(product_seconds, 0.001):.1f}x")
+        print(f"Rule overhead (SQL): {sql_seconds / max(sql_product_seconds, 0.001):.1f}x")
+        print("=" * 80)
+        return {
+            'lines': len(line_rows),
+            'rules': rule_count,
+            'product_seconds': product_seconds,
+            'rule_seconds': rule_seconds,
+            'sql_product_seconds': sql_product_seconds,
+            'sql_seconds': sql_seconds,
+        }
+    finally:
+        cr.rollback()
+
+
+# Main execution
+if 'env' in globals():
+    benchmark_commission_rules(env)
+else:
+    print("This script should be run in Odoo shell context.")
+    print("Example:")
+    print("  odoo-bin shell -c /path/to/odoo.conf -d your_database")
+    print("  >>> exec(open('/path/to/benchmark_commission_rules.py').read())")
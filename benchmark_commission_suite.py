@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+Commission Benchmark Suite
+==========================
+
+This script measures the hot paths of the commission module on generated
+datasets of growing size:
+
+- run_commission_sync: cold full sync, warm no-op incremental sync, and an
+  incremental sync after 1% of the invoice lines changed, per engine;
+- wizard.commission.report: _get_commission_data (report cache disabled),
+  PDF rendering, streaming Excel export and CSV export of the last 30 days.
+
+For every case it records the wall time, the number of SQL queries and the
+peak RSS reached during the case, and writes the results to a JSON file named after
+the current git commit so runs can be compared between commits.
+
+Datasets are built with generate_commission_data.py, looked up in the
+current directory (run the shell from the repository root); only its
+functions are loaded, not its main block. Sizes are
+cumulative: each size tops up the invoices generated for the previous one.
+Use a throwaway database.
+
+Usage:
+odoo-bin shell -c /path/to/odoo.conf -d your_database --workers=0
+>>> exec(open('/path/to/benchmark_commission_suite.py').read())
+>>> compare_benchmarks('benchmark_results_<old>.json', 'benchmark_results_<new>.json')
+"""
+
+from datetime import date, timedelta
+import ast
+import json
+import os
+import platform
+import resource
+import subprocess
+import tempfile
+import time
+
+# invoice counts of the generated datasets (~5 lines per invoice)
+DATASET_SIZES = [10000, 50000, 200000]
+ENGINES = ['sql', 'orm']
+CHURN_RATIO = 0.01
+# directory holding generate_commission_data.py, where results are written too
+SCRIPT_DIR = os.getcwd()
+
+
+def _git_commit(directory):
+    """Return the current git commit of ``directory``, or ``unknown``."""
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=directory, text=True,
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def _load_functions(path):
+    """Define the functions of the odoo shell script at ``path`` without running its main block."""
+    with open(path) as f:
+        tree = ast.parse(f.read(), path)
+    tree.body = [node for node in tree.body if not isinstance(node, ast.If)]
+    namespace = {'__name__': os.path.splitext(os.path.basename(path))[0]}
+    exec(compile(tree, path, 'exec'), namespace)
+    return namespace
+
+
+def _reset_peak_rss():
+    """
+    Reset the peak resident set size of this process to its current size,
+    so the next reading covers one case only. Needs Linux; returns whether
+    the reset happened.
+    """
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+    except OSError:
+        return False
+    return True
+
+
+def _peak_rss_kb():
+    """Peak resident set size since the last reset, in KiB; of the whole process without /proc."""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def _measure(env, results, case, size, func):
+    """Run ``func`` once, commit, and append its metrics to ``results``."""
+    env.invalidate_all()
+    per_case_rss = _reset_peak_rss()
+    queries = env.cr.sql_log_count
+    start = time.perf_counter()
+    func()
+    env.cr.commit()
+    elapsed = time.perf_counter() - start
+    result = {
+        'case': case,
+        'invoices': size,
+        'seconds': round(elapsed, 3),
+        'queries': env.cr.sql_log_count - queries,
+        'peak_rss_kb': _peak_rss_kb(),
+        # 'process' when the peak could not be reset and covers the previous cases too
+        'peak_rss_scope': 'case' if per_case_rss else 'process',
+    }
+    results.append(result)
+    print(f"  {case:32} {result['seconds']:10.2f}s {result['queries']:10} queries "
+          f"{result['peak_rss_kb'] / 1024:10.0f} MiB peak")
+    return result
+
+
+def _reset_commission_lines(env):
+    """Delete all commission lines and sync watermarks, for a cold sync."""
+    env.cr.execute("DELETE FROM sales_commission_line")
+    service = env['sales.commission.service']._get_service()
+    service.write({
+        'last_processed_move_line_id': False,
+        'last_sync_date': False,
+        'last_full_sync_date': False,
+        'sync_run_start': False,
+    })
+    env.cr.commit()
+
+
+def _churn_invoice_lines(env, ratio):
+    """Change the price of ``ratio`` of the customer invoice lines and touch their moves."""
+    env.cr.execute("""
+        WITH churned AS (
+            UPDATE account_move_line aml
+               SET price_subtotal = price_subtotal + 1,
+                   write_date = now() at time zone 'UTC'
+             WHERE aml.display_type = 'product'
+               AND aml.move_id IN (SELECT id FROM account_move WHERE move_type IN ('out_invoice', 'out_refund'))
+               AND random() < %s
+         RETURNING move_id
+        )
+        UPDATE account_move SET write_date = now() at time zone 'UTC'
+         WHERE id IN (SELECT move_id FROM churned)
+    """, [ratio])
+    env.cr.commit()
+
+
+def _benchmark_sync(env, results, size, engines):
+    """Cold, warm and churned syncs for each engine."""
+    service = env['sales.commission.service']
+    for engine in engines:
+        _reset_commission_lines(env)
+        _measure(env, results, f'sync_cold_full[{engine}]', size,
+                 lambda: service.run_commission_sync(engine=engine))
+        _measure(env, results, f'sync_warm_noop[{engine}]', size,
+                 lambda: service.run_commission_sync(incremental=True, engine=engine))
+        _churn_invoice_lines(env, CHURN_RATIO)
+        _measure(env, results, f'sync_churn_1pct[{engine}]', size,
+                 lambda: service.run_commission_sync(incremental=True, engine=engine))
+
+
+def _benchmark_reports(env, results, size):
+    """Report data, PDF, Excel and CSV on the last 30 days of data."""
+    icp = env['ir.config_parameter'].sudo()
+    cache_size = icp.get_param('sales_commision_product.report_cache_size')
+    icp.set_param('sales_commision_product.report_cache_size', 0)
+    try:
+        wizard_model = env['wizard.commission.report']
+        full = wizard_model.create({
+            'date_from': date.today() - timedelta(days=3650),
+            'date_to': date.today(),
+            'status_filter': 'all',
+        })
+        month = wizard_model.create({
+            'date_from': date.today() - timedelta(days=30),
+            'date_to': date.today(),
+            'status_filter': 'all',
+        })
+        _measure(env, results, 'report_data_all_history', size, full._get_commission_data)
+        _measure(env, results, 'report_data_30_days', size, month._get_commission_data)
+        _measure(env, results, 'report_pdf_30_days', size, lambda: env['ir.actions.report']._render_qweb_pdf(
+            'sales_commision_product.action_report_commission_financial', month.ids,
+        ))
+        _measure(env, results, 'export_excel_30_days', size, month._render_excel_streaming)
+
+        def export_csv():
+            with tempfile.TemporaryFile() as output:
+                full._write_export_csv(output)
+
+        _measure(env, results, 'export_csv_all_history', size, export_csv)
+    finally:
+        icp.set_param('sales_commision_product.report_cache_size', cache_size or False)
+        env.cr.commit()
+
+
+def benchmark_commission_suite(env, sizes=DATASET_SIZES, engines=ENGINES, output_dir=SCRIPT_DIR):
+    """Run every benchmark case on each dataset size and write the results as JSON."""
+    print("=" * 80)
+    print("COMMISSION BENCHMARK SUITE")
+    print("=" * 80)
+
+    generator = _load_functions(os.path.join(output_dir, 'generate_commission_data.py'))
+
+    commit = _git_commit(output_dir)
+    run = {
+        'commit': commit,
+        'date': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'database': env.cr.dbname,
+        'python': platform.python_version(),
+        'results': [],
+    }
+    generated = 0
+    for size in sizes:
+        if size > generated:
+            generator['generate_commission_data'](env, invoice_count=size - generated)
+            generated = size
+        print(f"\nDataset: {size} invoices")
+        print("-" * 80)
+        _benchmark_sync(env, run['results'], size, engines)
+        _benchmark_reports(env, run['results'], size)
+
+    path = os.path.join(output_dir, f'benchmark_results_{commit}.json')
+    with open(path, 'w') as f:
+        json.dump(run, f, indent=2)
+    print(f"\nResults written to {path}")
+    print("=" * 80)
+    return run
+
+
+def compare_benchmarks(old_path, new_path):
+    """Print the time, query and peak RSS ratio of each case between two result files."""
+    with open(old_path) as f:
+        old = json.load(f)
+    with open(new_path) as f:
+        new = json.load(f)
+    old_results = {(r['case'], r['invoices']): r for r in old['results']}
+
+    print(f"{'Case':32} | {'Invoices':>8} | {old['commit']:>9} | {new['commit']:>9} | {'Time':>6} | "
+          f"{'Queries':>7} | {'RSS':>6}")
+    print("-" * 95)
+    for result in new['results']:
+        before = old_results.get((result['case'], result['invoices']))
+        if not before:
+            continue
+        # peaks of the whole process do not compare case by case
+        if result.get('peak_rss_scope') == before.get('peak_rss_scope') == 'case':
+            rss = f"{result['peak_rss_kb'] / max(before['peak_rss_kb'], 1):5.2f}x"
+        else:
+            rss = f"{'n/a':>6}"
+        print(f"{result['case']:32} | {result['invoices']:8} | {before['seconds']:8.2f}s | "
+              f"{result['seconds']:8.2f}s | {result['seconds'] / max(before['seconds'], 0.001):5.2f}x | "
+              f"{result['queries'] / max(before['queries'], 1):6.2f}x | {rss}")
+
+
+# Main execution
+if 'env' in globals():
+    benchmark_commission_suite(env)
+else:
+    print("This script should be run in Odoo shell context.")
+    print("Example:")
+    print("  odoo-bin shell -c /path/to/odoo.conf -d your_database")
+    print("  >>> exec(open('/path/to/benchmark_commission_suite.py').read())")
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Parallel Commission Sync Benchmark
+==================================
+
+This script measures the wall-clock time of a full commission sync as the
+number of worker threads grows. Every run deletes all commission lines and
+rebuilds them, so use a copy of the production database.
+
+Usage:
+odoo-bin shell -c /path/to/odoo.conf -d your_database --workers=0
+>>> exec(open('/path/to/benchmark_parallel_sync.py').read())
+
+Each worker opens its own database cursor, so make sure db_maxconn is larger
+than the largest worker count.
+"""
+
+import time
+
+WORKER_COUNTS = [1, 2, 4, 8]
+ENGINES = ['orm', 'sql']
+
+
+def benchmark_parallel_sync(env, worker_counts=WORKER_COUNTS, engines=ENGINES):
+    """Run a full commission sync per engine and worker count and print timings."""
+    print("=" * 80)
+    print("PARALLEL COMMISSION SYNC BENCHMARK")
+    print("=" * 80)
+
+    service = env['sales.commission.service']
+    line_count = env['account.move.line'].search_count([
+        ('move_id.move_type', 'in', ['out_invoice', 'out_refund']),
+    ])
+    print(f"Customer invoice lines: {line_count}")
+
+    results = []
+    for engine in engines:
+        baseline = None
+        for workers in worker_counts:
+            env.cr.execute("DELETE FROM sales_commission_line")
+            env.cr.commit()
+            env.invalidate_all()
+
+            start = time.perf_counter()
+            ok = service.run_commission_sync(engine=engine, workers=workers)
+            env.cr.commit()
+            elapsed = time.perf_counter() - start
+
+            baseline = baseline or elapsed
+            results.append((engine, workers, elapsed, baseline / elapsed, ok))
+
+    print(f"\n{'Engine':8} | {'Workers':7} | {'Seconds':>9} | {'Speedup':>7} | Result")
+    print("-" * 50)
+    for engine, workers, elapsed, speedup, ok in results:
+        print(f"{engine:8} | {workers:7} | {elapsed:9.2f} | {speedup:6.2f}x | {'OK' if ok else 'FAILED'}")
+    print("=" * 80)
+    return results
+
+
+# Main execution
+if 'env' in globals():
+    benchmark_parallel_sync(env)
+else:
+    print("This script should be run in Odoo shell context.")
+    print("Example:")
+    print("  odoo-bin shell -c /path/to/odoo.conf -d your_database")
+    print("  >>> exec(open('/path/to/benchmark_parallel_sync.py').read())")
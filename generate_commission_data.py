@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+"""
+Synthetic Commission Data Generator
+===================================
+
+This script bulk-creates production-sized data to profile the commission
+sync and report paths:
+
+- N salespeople and M products with commission rates (through the ORM, the
+  counts are small);
+- K posted customer invoices and credit notes with a configurable number of
+  lines each and a configurable payment-state mix, inserted with set-based
+  SQL in batches committed one at a time.
+
+Every generated move is balanced: its product lines are credited (debited for
+credit notes) and one receivable line carries the total. Payment states are
+set directly with a matching residual amount; no payment entries are
+created. Expect about 1M invoice lines in a few minutes with the defaults.
+
+Use a throwaway database: the data cannot be removed cleanly afterwards.
+
+Usage:
+odoo-bin shell -c /path/to/odoo.conf -d your_database
+>>> exec(open('/path/to/generate_commission_data.py').read())
+>>> generate_commission_data(env, invoice_count=50000, max_lines=20)
+
+Loading the script only defines generate_commission_data(); nothing is
+written until it is called. Call it without arguments for the defaults
+(200k invoices, about 1M lines).
+
+Then run the commission sync to build the commission lines.
+"""
+
+import random
+import time
+
+SALESPERSON_COUNT = 50
+PRODUCT_COUNT = 500
+CUSTOMER_COUNT = 200
+INVOICE_COUNT = 200000
+# lines per invoice are drawn uniformly between these bounds (~5 on average)
+MIN_LINES = 1
+MAX_LINES = 9
+REFUND_RATIO = 0.1
+# share of invoices per payment state
+PAYMENT_MIX = {'paid': 0.5, 'in_payment': 0.1, 'partial': 0.1, 'not_paid': 0.3}
+DAYS = 730
+BATCH_SIZE = 20000
+SEED = 42
+
+
+def _get_or_create_salespeople(env, count):
+    """Return ``count`` benchmark salespeople, creating the missing ones."""
+    users = env['res.users'].search([('login', '=like', 'bench_salesperson_%')], order='id')
+    missing = range(len(users), count)
+    if missing:
+        users |= env['res.users'].with_context(no_reset_password=True).create([{
+            'name': f'Bench Salesperson {index}',
+            'login': f'bench_salesperson_{index}',
+            'groups_id': [(6, 0, [env.ref('sales_team.group_sale_salesman').id])],
+        } for index in missing])
+    return users[:count]
+
+
+def _get_or_create_products(env, count):
+    """Return ``count`` benchmark products, one in five without commission rate."""
+    products = env['product.product'].search([('default_code', '=like', 'BENCH-%')], order='id')
+    missing = range(len(products), count)
+    if missing:
+        rng = random.Random(SEED)
+        products |= env['product.product'].create([{
+            'name': f'Bench Product {index}',
+            'default_code': f'BENCH-{index:05d}',
+            'type': 'consu',
+            'list_price': rng.randint(10, 1000),
+            'commission_rate': 0.0 if index % 5 == 0 else rng.choice([2.5, 5.0, 7.5, 10.0, 15.0]),
+        } for index in missing])
+    return products[:count]
+
+
+def _get_or_create_customers(env, count):
+    """Return ``count`` benchmark customers, creating the missing ones."""
+    partners = env['res.partner'].search([('ref', '=like', 'BENCH-%')], order='id')
+    missing = range(len(partners), count)
+    if missing:
+        partners |= env['res.partner'].create([{
+            'name': f'Bench Customer {index}',
+            'ref': f'BENCH-{index:05d}',
+            'customer_rank': 1,
+        } for index in missing])
+    return partners[:count]
+
+
+def _payment_state_sql(payment_mix):
+    """SQL CASE mapping the random column ``r`` to a payment state."""
+    total = sum(payment_mix.values())
+    cases, threshold = [], 0.0
+    for state, share in payment_mix.items():
+        threshold += share / total
+        cases.append(f"WHEN r < {threshold:.6f} THEN '{state}'")
+    return f"CASE {' '.join(cases)} ELSE 'not_paid' END"
+
+
+def _insert_batch(cr, params, first, last, payment_state_sql):
+    """Insert invoices ``first`` to ``last`` with their lines in set-based SQL."""
+    params = dict(params, first=first, last=last)
+    cr.execute("""
+        CREATE TEMP TABLE bench_move ON COMMIT DROP AS
+        SELECT nextval('account_move_id_seq') AS id, n,
+               CASE WHEN random() < %(refund_ratio)s THEN 'out_refund' ELSE 'out_invoice' END AS move_type,
+               (%(salesperson_ids)s::int[])[1 + floor(random() * cardinality(%(salesperson_ids)s::int[]))::int]
+                   AS salesperson_id,
+               (%(partner_ids)s::int[])[1 + floor(random() * cardinality(%(partner_ids)s::int[]))::int]
+                   AS partner_id,
+               CURRENT_DATE - floor(random() * %(days)s)::int AS invoice_date,
+               %(min_lines)s + floor(random() * (%(max_lines)s - %(min_lines)s + 1))::int AS line_count,
+               random() AS r
+          FROM generate_series(%(first)s, %(last)s) AS n
+    """, params)
+    cr.execute(f"""
+        ALTER TABLE bench_move ADD COLUMN payment_state varchar;
+        UPDATE bench_move SET payment_state = {payment_state_sql};
+
+        CREATE TEMP TABLE bench_line ON COMMIT DROP AS
+        SELECT m.id AS move_id, line_no,
+               m.move_type, m.invoice_date, m.partner_id,
+               (%(product_ids)s::int[])[1 + floor(random() * cardinality(%(product_ids)s::int[]))::int]
+                   AS product_id,
+               1 + floor(random() * 10)::int AS quantity,
+               round((10 + random() * 990)::numeric, 2) AS price_unit
+          FROM bench_move m
+         CROSS JOIN LATERAL generate_series(1, m.line_count) AS line_no;
+
+        CREATE TEMP TABLE bench_total ON COMMIT DROP AS
+        SELECT move_id, sum(quantity * price_unit) AS total
+          FROM bench_line
+         GROUP BY move_id;
+    """, params)
+
+    # sign of the receivable balance; income lines carry the opposite sign
+    cr.execute("""
+        INSERT INTO account_move (
+            id, name, ref, move_type, state, date, invoice_date, invoice_date_due,
+            journal_id, company_id, currency_id, partner_id, commercial_partner_id,
+            invoice_user_id, payment_state, auto_post, sequence_prefix, sequence_number,
+            amount_untaxed, amount_tax, amount_total, amount_residual,
+            amount_untaxed_signed, amount_tax_signed, amount_total_signed,
+            amount_total_in_currency_signed, amount_residual_signed,
+            create_uid, create_date, write_uid, write_date
+        )
+        SELECT m.id, %(prefix)s || lpad(m.n::text, 8, '0'), 'BENCH', m.move_type, 'posted',
+               m.invoice_date, m.invoice_date, m.invoice_date + 30,
+               %(journal_id)s, %(company_id)s, %(currency_id)s, m.partner_id, m.partner_id,
+               m.salesperson_id, m.payment_state, 'no', %(prefix)s, m.n,
+               t.total, 0, t.total, res.residual,
+               sign * t.total, 0, sign * t.total, sign * t.total, sign * res.residual,
+               %(uid)s, now() at time zone 'UTC', %(uid)s, now() at time zone 'UTC'
+          FROM bench_move m
+          JOIN bench_total t ON t.move_id = m.id
+         CROSS JOIN LATERAL (
+               SELECT CASE WHEN m.move_type = 'out_refund' THEN -1 ELSE 1 END AS sign,
+                      CASE m.payment_state
+                           WHEN 'not_paid' THEN t.total
+                           WHEN 'partial' THEN round(t.total / 2, 2)
+                           ELSE 0
+                      END AS residual
+         ) res
+    """, params)
+    cr.execute("""
+        INSERT INTO account_move_line (
+            move_id, move_name, date, parent_state, journal_id, company_id, company_currency_id,
+            currency_id, account_id, partner_id, name, display_type, sequence,
+            product_id, product_uom_id, quantity, price_unit, discount, price_subtotal, price_total,
+            balance, debit, credit, amount_currency, amount_residual, amount_residual_currency,
+            reconciled, create_uid, create_date, write_uid, write_date
+        )
+        SELECT l.move_id, %(prefix)s || lpad(m.n::text, 8, '0'), l.invoice_date, 'posted',
+               %(journal_id)s, %(company_id)s, %(currency_id)s, %(currency_id)s,
+               %(income_account_id)s, l.partner_id, 'Bench line', 'product', l.line_no,
+               l.product_id, %(uom_id)s, l.quantity, l.price_unit, 0,
+               l.quantity * l.price_unit, l.quantity * l.price_unit,
+               -sign * l.quantity * l.price_unit,
+               GREATEST(-sign * l.quantity * l.price_unit, 0),
+               GREATEST(sign * l.quantity * l.price_unit, 0),
+               -sign * l.quantity * l.price_unit, 0, 0,
+               false, %(uid)s, now() at time zone 'UTC', %(uid)s, now() at time zone 'UTC'
+          FROM bench_line l
+          JOIN bench_move m ON m.id = l.move_id
+         CROSS JOIN LATERAL (
+               SELECT CASE WHEN l.move_type = 'out_refund' THEN -1 ELSE 1 END AS sign
+         ) s
+    """, params)
+    cr.execute("""
+        INSERT INTO account_move_line (
+            move_id, move_name, date, date_maturity, parent_state, journal_id, company_id,
+            company_currency_id, currency_id, account_id, partner_id, name, display_type, sequence,
+            quantity, price_unit, discount, price_subtotal, price_total,
+            balance, debit, credit, amount_currency, amount_residual, amount_residual_currency,
+            reconciled, create_uid, create_date, write_uid, write_date
+        )
+        SELECT m.id, am.name, m.invoice_date, m.invoice_date + 30, 'posted',
+               %(journal_id)s, %(company_id)s, %(currency_id)s, %(currency_id)s,
+               %(receivable_account_id)s, m.partner_id, '', 'payment_term', 10000,
+               0, 0, 0, 0, 0,
+               am.amount_total_signed,
+               GREATEST(am.amount_total_signed, 0),
+               GREATEST(-am.amount_total_signed, 0),
+               am.amount_total_signed, am.amount_residual_signed, am.amount_residual_signed,
+               am.payment_state IN ('paid', 'in_payment'),
+               %(uid)s, now() at time zone 'UTC', %(uid)s, now() at time zone 'UTC'
+          FROM bench_move m
+          JOIN account_move am ON am.id = m.id
+    """, params)
+    cr.execute("SELECT count(*) FROM bench_line")
+    return cr.fetchone()[0]
+
+
+def generate_commission_data(
+    env,
+    salesperson_count=SALESPERSON_COUNT,
+    product_count=PRODUCT_COUNT,
+    customer_count=CUSTOMER_COUNT,
+    invoice_count=INVOICE_COUNT,
+    min_lines=MIN_LINES,
+    max_lines=MAX_LINES,
+    refund_ratio=REFUND_RATIO,
+    payment_mix=PAYMENT_MIX,
+    days=DAYS,
+    batch_size=BATCH_SIZE,
+    seed=SEED,
+):
+    """Generate benchmark salespeople, products and posted invoices, and print throughput."""
+    print("=" * 80)
+    print("GENERATING SYNTHETIC COMMISSION DATA")
+    print("=" * 80)
+
+    company = env.company
+    journal = env['account.journal'].search([
+        ('type', '=', 'sale'), ('company_id', '=', company.id),
+    ], limit=1)
+    receivable_account = env['account.account'].search([
+        ('account_type', '=', 'asset_receivable'), ('company_id', '=', company.id),
+    ], limit=1)
+    income_account = env['account.account'].search([
+        ('account_type', '=', 'income'), ('company_id', '=', company.id),
+    ], limit=1)
+    if not (journal and receivable_account and income_account):
+        print("❌ A sale journal, a receivable and an income account are required.")
+        print("Install a chart of accounts first.")
+        return
+
+    salespeople = _get_or_create_salespeople(env, salesperson_count)
+    products = _get_or_create_products(env, product_count)
+    customers = _get_or_create_customers(env, customer_count)
+    env.cr.commit()
+    print(f"Salespeople: {len(salespeople)}, products: {len(products)}, customers: {len(customers)}")
+
+    prefix = f"{journal.code}/BENCH/"
+    env.cr.execute("""
+        SELECT COALESCE(max(sequence_number), 0) FROM account_move
+         WHERE journal_id = %s AND sequence_prefix = %s
+    """, [journal.id, prefix])
+    offset = env.cr.fetchone()[0]
+    env.cr.execute("SELECT setseed(%s)", [(seed % 1000) / 1000.0])
+
+    params = {
+        'refund_ratio': refund_ratio,
+        'salesperson_ids': salespeople.ids,
+        'partner_ids': customers.ids,
+        'product_ids': products.ids,
+        'days': days,
+        'min_lines': min_lines,
+        'max_lines': max_lines,
+        'prefix': prefix,
+        'journal_id': journal.id,
+        'company_id': company.id,
+        'currency_id': company.currency_id.id,
+        'income_account_id': income_account.id,
+        'receivable_account_id': receivable_account.id,
+        'uom_id': env.ref('uom.product_uom_unit').id,
+        'uid': env.uid,
+    }
+    payment_state_sql = _payment_state_sql(payment_mix)
+
+    start = time.perf_counter()
+    total_lines = 0
+    for first in range(offset + 1, offset + invoice_count + 1, batch_size):
+        last = min(first + batch_size - 1, offset + invoice_count)
+        total_lines += _insert_batch(env.cr, params, first, last, payment_state_sql)
+        env.cr.commit()
+        elapsed = time.perf_counter() - start
+        print(f"  {last - offset:>10} invoices, {total_lines:>10} lines "
+              f"({total_lines / max(elapsed, 1e-6):,.0f} lines/s)")
+
+    env.cr.execute("ANALYZE account_move; ANALYZE account_move_line")
+    env.cr.commit()
+    env.invalidate_all()
+
+    elapsed = time.perf_counter() - start
+    print(f"\n✅ {invoice_count} invoices, {total_lines} invoice lines in {elapsed:.1f}s")
+    print("Run the commission sync to build the commission lines, e.g.:")
+    print("  env['sales.commission.service'].run_commission_sync(engine='sql'); env.cr.commit()")
+    print("=" * 80)
+    return {'invoices': invoice_count, 'lines': total_lines, 'seconds': elapsed}
+
+
+# Main execution: only define the generator, the data is written on an explicit call
+if 'env' in globals():
+    print("generate_commission_data() loaded, nothing was written yet. Example:")
+    print("  >>> generate_commission_data(env, invoice_count=50000, max_lines=20)")
+else:
+    print("This script should be run in Odoo shell context.")
+    print("Example:")
+    print("  odoo-bin shell -c /path/to/odoo.conf -d your_database")
+    print("  >>> exec(open('/path/to/generate_commission_data.py').read())")
+    print("  >>> generate_commission_data(env, invoice_count=50000, max_lines=20)")
@@ -37,6 +37,14 @@ def run_commission_tests(env):
         'sales_commision_product.tests.test_commission_service',
         'sales_commision_product.tests.test_wizard_commission_sync',
         'sales_commision_product.tests.test_wizard_commission_report',
+        'sales_commision_product.tests.test_account_move',
+        'sales_commision_product.tests.test_commission_queue',
+        'sales_commision_product.tests.test_commission_summary',
+        'sales_commision_product.tests.test_commission_report_job',
+        'sales_commision_product.tests.test_commission_profile',
+        'sales_commision_product.tests.test_commission_sync_run',
+        'sales_commision_product.tests.test_commission_rate',
+        'sales_commision_product.tests.test_commission_rule',
     ]
     
     total_tests = 0
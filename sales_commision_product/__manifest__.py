@@ -11,12 +11,19 @@
         "security/sales_commission_security.xml",
         "security/ir.model.access.csv",
         "data/commission_cron.xml",
+        "data/commission_summary_data.xml",
         "views/product_views.xml",
+        "views/commission_rule_views.xml",
         "views/wizard_commission_sync_views.xml",
         "views/wizard_commission_report_views.xml",
         "reports/commission_report.xml",
         "reports/commission_report_template.xml",
         "views/commission_views.xml",
+        "views/commission_service_views.xml",
+        "views/commission_sync_run_views.xml",
+        "views/commission_summary_views.xml",
+        "views/commission_report_job_views.xml",
+        "views/commission_profile_views.xml",
     ],
     "demo": [
         "data/demo_data.xml",
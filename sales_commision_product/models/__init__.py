@@ -1,5 +1,14 @@
 from . import product
 from . import commission
+from . import commission_rate
+from . import commission_rule
+from . import commission_profile
+from . import commission_sync_run
 from . import commission_service
+from . import commission_queue
+from . import commission_summary
+from . import commission_report_job
+from . import account_move
 from . import wizard_commission_sync
 from . import wizard_commission_report
+from . import report_commission_financial
@@ -0,0 +1,68 @@
+from odoo import api, models
+
+COMMISSION_MOVE_TYPES = ("out_invoice", "out_refund")
+
+
+class AccountMove(models.Model):
+    _inherit = "account.move"
+
+    def _queue_commission_recompute(self):
+        """
+        Queue customer invoices for commission recomputation.
+
+        Only the move ids are recorded here; the queue cron recomputes the
+        commission lines of queued invoices in large batches, so posting and
+        bulk imports stay cheap.
+        """
+        moves = self.filtered(lambda move: move.move_type in COMMISSION_MOVE_TYPES)
+        if moves:
+            self.env["sales.commission.queue"]._enqueue(moves.ids)
+
+    def _post(self, soft=True):
+        posted = super()._post(soft=soft)
+        posted._queue_commission_recompute()
+        return posted
+
+    def button_draft(self):
+        res = super().button_draft()
+        self._queue_commission_recompute()
+        return res
+
+    def button_cancel(self):
+        res = super().button_cancel()
+        self._queue_commission_recompute()
+        return res
+
+    def write(self, vals):
+        if "invoice_date" in vals or "move_type" in vals:
+            # the commission lines' stored copies follow; flag the summary rows they leave
+            self.env["sales.commission.line"].sudo().search(
+                [("invoice_id", "in", self.ids)]
+            )._mark_summary_dirty(stored=True)
+        res = super().write(vals)
+        # payment_state is a stored compute: reconciliation recomputes it
+        # without write(), and is caught by the account.partial.reconcile
+        # overrides below. This only covers explicit writes (imports,
+        # migrations, scripts).
+        if "payment_state" in vals:
+            self._queue_commission_recompute()
+        return res
+
+
+class AccountPartialReconcile(models.Model):
+    _inherit = "account.partial.reconcile"
+
+    def _get_commission_moves(self):
+        return self.debit_move_id.move_id | self.credit_move_id.move_id
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        partials = super().create(vals_list)
+        partials._get_commission_moves()._queue_commission_recompute()
+        return partials
+
+    def unlink(self):
+        moves = self._get_commission_moves()
+        res = super().unlink()
+        moves._queue_commission_recompute()
+        return res
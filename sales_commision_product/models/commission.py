@@ -1,4 +1,37 @@
 from odoo import api, fields, models
+from odoo.tools import sql
+
+# fields whose change moves a line to another summary row or changes its totals
+SUMMARY_FIELDS = {
+    "salesperson_id", "company_id", "invoice_id", "invoice_date", "move_type",
+    "line_subtotal", "commission_amount",
+}
+
+# stored related fields recomputed from the invoice without going through write()
+SUMMARY_RELATED_FIELDS = ("invoice_date", "move_type")
+
+# payment states of invoices whose commission counts as paid
+PAID_PAYMENT_STATES = ("paid", "in_payment")
+
+# many2one fields making up the display name, with their model
+NAME_FIELDS = {
+    "salesperson_id": "res.users",
+    "product_id": "product.product",
+    "invoice_id": "account.move",
+}
+
+# (name suffix, columns, partial index condition) of the composite indexes
+# backing the report access paths
+COMMISSION_LINE_INDEXES = [
+    # wizard status filters
+    ("report_idx", ["company_id", "invoice_date", "payment_state", "salesperson_id"], ""),
+    # list and pivot views: company record rule, date range, default order
+    ("company_date_idx", ["company_id", "invoice_date DESC", "id DESC"], ""),
+    # per-salesperson detail pages and the salesperson record rule
+    ("salesperson_date_idx", ["salesperson_id", "invoice_date", "id"], ""),
+    # returns totals and refund analysis
+    ("refund_date_idx", ["company_id", "invoice_date"], "move_type = 'out_refund'"),
+]
 
 
 class SalesCommissionLine(models.Model):
@@ -28,6 +61,9 @@ class SalesCommissionLine(models.Model):
     )
     invoice_date = fields.Date(related="invoice_id.invoice_date", store=True)
     move_type = fields.Selection(related="invoice_id.move_type", store=True)
+    # denormalized so report filters need no join on account_move
+    invoice_state = fields.Selection(related="invoice_id.state", store=True, string="Invoice Status")
+    payment_state = fields.Selection(related="invoice_id.payment_state", store=True)
     product_id = fields.Many2one(
         comodel_name="product.product",
         string="Product",
@@ -69,19 +105,129 @@ class SalesCommissionLine(models.Model):
         ),
     ]
 
+    def _auto_init(self):
+        """
+        Fill the denormalized invoice columns with one UPDATE on install,
+        instead of the ORM recomputing them record by record.
+        """
+        cr = self.env.cr
+        missing = [
+            column for column in ("invoice_state", "payment_state")
+            if not sql.column_exists(cr, self._table, column)
+        ]
+        if sql.table_exists(cr, self._table) and missing:
+            for column in missing:
+                sql.create_column(cr, self._table, column, "varchar")
+            cr.execute("""
+                UPDATE sales_commission_line scl
+                   SET invoice_state = am.state,
+                       payment_state = am.payment_state
+                  FROM account_move am
+                 WHERE am.id = scl.invoice_id
+            """)
+        return super()._auto_init()
+
+    def init(self):
+        for suffix, expressions, where in COMMISSION_LINE_INDEXES:
+            sql.create_index(
+                self.env.cr, f"{self._table}_{suffix}", self._table, expressions, where=where,
+            )
+
     def name_get(self):
-        """Return a readable name for commission lines."""
-        result = []
-        for record in self:
-            name = f"{record.salesperson_id.name} - {record.product_id.name} - {record.invoice_id.name}"
-            result.append((record.id, name))
-        return result
+        """
+        Return a readable name for commission lines.
+
+        The salesperson, product and invoice of all lines are read at once,
+        then the names of each model in a single read, however many lines
+        are named.
+        """
+        rows = self.read(list(NAME_FIELDS), load=None)
+        names = {}
+        for field_name, model_name in NAME_FIELDS.items():
+            ids = {row[field_name] for row in rows if row[field_name]}
+            names[field_name] = {
+                record["id"]: record["name"]
+                for record in self.env[model_name].browse(ids).read(["name"])
+            }
+        return [
+            (row["id"], " - ".join(
+                str(names[field_name].get(row[field_name], False)) for field_name in NAME_FIELDS
+            ))
+            for row in rows
+        ]
     
-    @api.model
-    def create(self, vals):
-        """Override create to set commission_rate from product if not provided."""
-        if (not vals.get("commission_rate") or vals.get("commission_rate") is False) and vals.get("product_id"):
-            product = self.env["product.product"].browse(vals["product_id"])
-            vals["commission_rate"] = product.product_tmpl_id.commission_rate or 0.0
-        return super().create(vals)
+    @api.model_create_multi
+    def create(self, vals_list):
+        """
+        Override create to set commission_rate from product if not provided,
+        at the rate effective on the invoice date.
+
+        The rates of the whole batch are read at once, so batched creates
+        from the sync keep the ORM's multi-create path.
+        """
+        missing_rate = [vals for vals in vals_list if not vals.get("commission_rate") and vals.get("product_id")]
+        if missing_rate:
+            rate_index = self.env["sales.commission.service"]._get_commission_rate_index(
+                {vals["product_id"] for vals in missing_rate}
+            )
+            undated_invoices = self.env["account.move"].browse(
+                {vals["invoice_id"] for vals in missing_rate if not vals.get("invoice_date") and vals.get("invoice_id")}
+            )
+            invoice_dates = {invoice["id"]: invoice["invoice_date"] for invoice in undated_invoices.read(["invoice_date"])}
+            for vals in missing_rate:
+                invoice_date = fields.Date.to_date(vals.get("invoice_date")) or invoice_dates.get(vals.get("invoice_id"))
+                vals["commission_rate"] = rate_index.get(vals["product_id"], invoice_date)
+        records = super().create(vals_list)
+        records._mark_summary_dirty()
+        self.env["sales.commission.service"]._bump_data_version()
+        return records
+
+    def write(self, vals):
+        summary_changed = SUMMARY_FIELDS.intersection(vals)
+        if summary_changed:
+            self._mark_summary_dirty()
+        res = super().write(vals)
+        if summary_changed:
+            self._mark_summary_dirty()
+        self.env["sales.commission.service"]._bump_data_version()
+        return res
+
+    def unlink(self):
+        self._mark_summary_dirty()
+        self.env["sales.commission.service"]._bump_data_version()
+        return super().unlink()
+
+    def _compute_field_value(self, field):
+        if field.name not in SUMMARY_RELATED_FIELDS:
+            return super()._compute_field_value(field)
+        # the invoice date or type changed: the lines leave the summary rows
+        # they are stored under for new ones
+        self._mark_summary_dirty(stored=True)
+        res = super()._compute_field_value(field)
+        self.sudo()._mark_summary_dirty()
+        return res
+
+    def _mark_summary_dirty(self, stored=False):
+        """
+        Flag the monthly summary rows these lines contribute to for refresh.
+
+        :param stored: use the values stored in the database, ignoring
+            pending changes, which are not recomputed
+        """
+        summary = self.env["sales.commission.summary"]
+        if stored:
+            line_ids = tuple(line_id for line_id in self._ids if isinstance(line_id, int))
+            if not line_ids:
+                return
+            self.env.cr.execute("""
+                SELECT salesperson_id, company_id, invoice_date, move_type
+                  FROM sales_commission_line
+                 WHERE id IN %s
+            """, [line_ids])
+            summary._mark_dirty(summary._get_key(*row) for row in self.env.cr.fetchall())
+            return
+        summary._mark_dirty(
+            summary._get_key(line["salesperson_id"], line["company_id"], line["invoice_date"], line["move_type"])
+            for line in self.read(["salesperson_id", "company_id", "invoice_date", "move_type"], load=None)
+        )
 
@@ -0,0 +1,141 @@
+from odoo import api, fields, models
+from contextlib import contextmanager
+from datetime import timedelta
+import contextvars
+import logging
+import time
+
+_logger = logging.getLogger(__name__)
+
+PROFILING_PARAM = "sales_commision_product.profiling"
+PROFILE_RETENTION_DAYS = 30
+
+# {phase name: stats} of the operation being profiled in this context
+_active_phases = contextvars.ContextVar("sales_commission_profile_phases", default=None)
+
+
+@contextmanager
+def profile_phase(env, name):
+    """
+    Time the enclosed block as phase ``name`` of the operation being
+    profiled, if any. Repeated phases add up.
+
+    Yields a dict whose ``rows`` entry the caller may increase.
+    """
+    stats = {"rows": 0}
+    phases = _active_phases.get()
+    if phases is None:
+        yield stats
+        return
+    start, queries = time.perf_counter(), env.cr.sql_log_count
+    try:
+        yield stats
+    finally:
+        phase = phases.setdefault(name, {"calls": 0, "duration": 0.0, "query_count": 0, "row_count": 0})
+        phase["calls"] += 1
+        phase["duration"] += time.perf_counter() - start
+        phase["query_count"] += env.cr.sql_log_count - queries
+        phase["row_count"] += stats["rows"]
+
+
+class CommissionProfile(models.Model):
+    _name = "sales.commission.profile"
+    _description = "Sales Commission Profiling Run"
+    _order = "id desc"
+
+    name = fields.Char(string="Operation", required=True, readonly=True)
+    operation = fields.Selection(
+        [
+            ("sync", "Commission Sync"),
+            ("report", "Report"),
+            ("export", "Export"),
+        ],
+        string="Type",
+        required=True,
+        readonly=True,
+    )
+    user_id = fields.Many2one(comodel_name="res.users", string="User", readonly=True)
+    start_date = fields.Datetime(string="Started On", readonly=True)
+    duration = fields.Float(string="Duration (s)", digits=(16, 3), readonly=True)
+    query_count = fields.Integer(string="Queries", readonly=True)
+    row_count = fields.Integer(string="Rows", readonly=True)
+    phase_ids = fields.One2many(
+        comodel_name="sales.commission.profile.phase",
+        inverse_name="profile_id",
+        string="Phases",
+        readonly=True,
+    )
+
+    @api.model
+    def _is_profiling_enabled(self):
+        return bool(self.env["ir.config_parameter"].sudo().get_param(PROFILING_PARAM))
+
+    @api.model
+    @contextmanager
+    def _profile(self, operation, name):
+        """
+        Profile the enclosed block when the ``sales_commision_product.profiling``
+        system parameter is set, and store the run with its phases once the
+        block completes. Inside another profiled block, the block is recorded
+        as a phase of the outer run instead.
+
+        Yields a dict whose ``rows`` entry the caller may set. Once the block
+        completes, its ``profile_id`` entry holds the id of the stored run.
+        """
+        if _active_phases.get() is not None:
+            with profile_phase(self.env, name) as stats:
+                yield stats
+            return
+        stats = {"rows": 0}
+        if not self._is_profiling_enabled():
+            yield stats
+            return
+        phases = {}
+        token = _active_phases.set(phases)
+        start_date, start, queries = fields.Datetime.now(), time.perf_counter(), self.env.cr.sql_log_count
+        try:
+            yield stats
+        finally:
+            _active_phases.reset(token)
+        duration = time.perf_counter() - start
+        stats["profile_id"] = self.sudo().create({
+            "name": name,
+            "operation": operation,
+            "user_id": self.env.uid,
+            "start_date": start_date,
+            "duration": duration,
+            "query_count": self.env.cr.sql_log_count - queries,
+            "row_count": stats["rows"],
+            "phase_ids": [
+                (0, 0, dict(phase, name=phase_name, sequence=sequence))
+                for sequence, (phase_name, phase) in enumerate(phases.items())
+            ],
+        }).id
+        _logger.info("Profiled %s: %.3fs, %d queries", name, duration, self.env.cr.sql_log_count - queries)
+
+    @api.autovacuum
+    def _gc_profiles(self):
+        """Remove profiling runs older than PROFILE_RETENTION_DAYS."""
+        self.search([
+            ("start_date", "<", fields.Datetime.now() - timedelta(days=PROFILE_RETENTION_DAYS)),
+        ]).unlink()
+
+
+class CommissionProfilePhase(models.Model):
+    _name = "sales.commission.profile.phase"
+    _description = "Sales Commission Profiling Phase"
+    _order = "profile_id, sequence"
+
+    profile_id = fields.Many2one(
+        comodel_name="sales.commission.profile",
+        string="Profiling Run",
+        required=True,
+        ondelete="cascade",
+        index=True,
+    )
+    sequence = fields.Integer(string="Sequence")
+    name = fields.Char(string="Phase", required=True)
+    calls = fields.Integer(string="Calls")
+    duration = fields.Float(string="Duration (s)", digits=(16, 3))
+    query_count = fields.Integer(string="Queries")
+    row_count = fields.Integer(string="Rows")
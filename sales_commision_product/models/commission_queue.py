@@ -0,0 +1,201 @@
+from odoo import api, fields, models
+import logging
+import threading
+
+_logger = logging.getLogger(__name__)
+
+QUEUE_BATCH_SIZE = 1000
+QUEUE_MAX_ATTEMPTS = 3
+QUEUE_PROCESSING_TIMEOUT_MINUTES = 30
+
+
+class CommissionQueue(models.Model):
+    _name = "sales.commission.queue"
+    _description = "Sales Commission Recompute Queue"
+    _log_access = False
+    _order = "id"
+
+    move_id = fields.Many2one(
+        comodel_name="account.move",
+        string="Invoice",
+        required=True,
+        ondelete="cascade",
+    )
+    enqueue_date = fields.Datetime(
+        string="Queued On",
+        required=True,
+        default=fields.Datetime.now,
+        help="First time the invoice was queued since it was last processed.",
+    )
+    state = fields.Selection(
+        [
+            ("queued", "Queued"),
+            ("processing", "Processing"),
+            ("failed", "Failed"),
+        ],
+        string="Status",
+        required=True,
+        default="queued",
+        help="Failed entries gave an error QUEUE_MAX_ATTEMPTS times in a row "
+             "and are parked until the invoice changes again.",
+    )
+    processing_date = fields.Datetime(string="Claimed On")
+    attempt_count = fields.Integer(string="Failed Attempts")
+    error = fields.Text(string="Last Error")
+
+    _sql_constraints = [
+        (
+            "unique_move",
+            "unique(move_id)",
+            "This invoice is already queued for commission recomputation.",
+        ),
+    ]
+
+    @api.model
+    def _enqueue(self, move_ids):
+        """
+        Queue invoices for commission recomputation.
+
+        Queuing an invoice that is already waiting is a no-op, so repeated
+        events on the same invoice coalesce into a single recomputation.
+        An invoice being processed is queued again, as the worker may have
+        read it before this change, and a failed one gets a new chance.
+        """
+        if not move_ids:
+            return
+        self.env.cr.execute("""
+            INSERT INTO sales_commission_queue (move_id, enqueue_date, state, attempt_count)
+            SELECT move_id, (now() at time zone 'UTC'), 'queued', 0
+              FROM unnest(%s) AS move_id
+            ON CONFLICT (move_id) DO UPDATE
+               SET state = 'queued',
+                   enqueue_date = EXCLUDED.enqueue_date,
+                   attempt_count = 0,
+                   error = NULL
+             WHERE sales_commission_queue.state != 'queued'
+        """, [list(move_ids)])
+        # reports filter on the invoice payment state, which just changed
+        self.env["sales.commission.service"]._bump_data_version()
+
+    @api.model
+    def _get_queue_stats(self):
+        """
+        Return the queue depth and the enqueue date of its oldest entry,
+        failed entries apart, and the number of failed entries.
+        """
+        self.env.cr.execute("""
+            SELECT count(*) FILTER (WHERE state != 'failed'),
+                   min(enqueue_date) FILTER (WHERE state != 'failed'),
+                   count(*) FILTER (WHERE state = 'failed')
+              FROM sales_commission_queue
+        """)
+        depth, oldest, failed = self.env.cr.fetchone()
+        return {"depth": depth, "oldest_date": oldest, "failed": failed}
+
+    @api.model
+    def _claim_batch(self, after_id, batch_size):
+        """
+        Mark the next ``batch_size`` queued entries processing, with entries
+        left processing for longer than QUEUE_PROCESSING_TIMEOUT_MINUTES by
+        a worker that died. Entries locked by a concurrent worker are skipped.
+
+        :return: ``[(entry id, move id)]`` in id order
+        """
+        self.env.cr.execute("""
+            UPDATE sales_commission_queue
+               SET state = 'processing', processing_date = (now() at time zone 'UTC')
+             WHERE id IN (
+                   SELECT id FROM sales_commission_queue
+                    WHERE id > %s
+                      AND (state = 'queued' OR (
+                           state = 'processing'
+                           AND processing_date < (now() at time zone 'UTC') - %s * interval '1 minute'
+                      ))
+                    ORDER BY id
+                    LIMIT %s
+                      FOR UPDATE SKIP LOCKED
+             )
+         RETURNING id, move_id
+        """, [after_id, QUEUE_PROCESSING_TIMEOUT_MINUTES, batch_size])
+        return sorted(self.env.cr.fetchall())
+
+    @api.model
+    def _recompute_batch(self, move_ids):
+        """
+        Recompute the commissions of ``move_ids``, one invoice at a time when
+        the batch fails, so one bad invoice does not hold back the others.
+
+        :return: ``{move id: error message}`` of the invoices that failed
+        """
+        service = self.env["sales.commission.service"]
+        try:
+            with self.env.cr.savepoint():
+                service._recompute_moves(move_ids)
+            return {}
+        except Exception:
+            _logger.exception("Commission recompute of %d queued invoices failed, retrying one by one", len(move_ids))
+            self.env.invalidate_all()
+        errors = {}
+        for move_id in move_ids:
+            try:
+                with self.env.cr.savepoint():
+                    service._recompute_moves([move_id])
+            except Exception as e:
+                _logger.exception("Commission recompute of invoice %d failed", move_id)
+                self.env.invalidate_all()
+                errors[move_id] = str(e)
+        return errors
+
+    @api.model
+    def _release_batch(self, entries, errors):
+        """
+        Remove the processed entries and queue failed ones again, parking them
+        after QUEUE_MAX_ATTEMPTS failures. Entries queued again by a change
+        made while they were processed are left queued.
+        """
+        done_ids = [entry_id for entry_id, move_id in entries if move_id not in errors]
+        if done_ids:
+            self.env.cr.execute("""
+                DELETE FROM sales_commission_queue
+                 WHERE id IN %s AND state = 'processing'
+            """, [tuple(done_ids)])
+        for entry_id, move_id in entries:
+            if move_id in errors:
+                self.env.cr.execute("""
+                    UPDATE sales_commission_queue
+                       SET attempt_count = attempt_count + 1,
+                           error = %s,
+                           state = CASE WHEN attempt_count + 1 >= %s THEN 'failed' ELSE 'queued' END
+                     WHERE id = %s AND state = 'processing'
+                """, [errors[move_id], QUEUE_MAX_ATTEMPTS, entry_id])
+
+    @api.model
+    def _process_queue(self, batch_size=QUEUE_BATCH_SIZE):
+        """
+        Drain the queue ``batch_size`` invoices at a time. Each batch is
+        claimed and committed before its recomputation, so the queue rows
+        are not locked while invoices are queued again, and its entries are
+        released in the transaction of the recomputation. Invoices that
+        fail are queued again for the next run, see :meth:`_release_batch`.
+
+        :return: number of invoices processed
+        """
+        auto_commit = not getattr(threading.current_thread(), "testing", False)
+        processed = 0
+        last_id = 0
+        while True:
+            entries = self._claim_batch(last_id, batch_size)
+            if not entries:
+                break
+            if auto_commit:
+                self.env.cr.commit()
+            last_id = entries[-1][0]
+            errors = self._recompute_batch([move_id for dummy, move_id in entries])
+            self._release_batch(entries, errors)
+            if auto_commit:
+                self.env.cr.commit()
+            processed += len(entries) - len(errors)
+            self.env.invalidate_all()
+        if processed:
+            _logger.info("Processed %d queued invoices for commission recomputation", processed)
+        return processed
@@ -0,0 +1,90 @@
+from odoo import api, fields, models
+from odoo.exceptions import ValidationError
+from odoo.tools import sql
+from datetime import date
+
+
+def rate_history_join(template_column, date_column):
+    """
+    SQL lateral join exposing ``history.rate``: the rate history entry of
+    the template ``template_column`` effective on ``date_column``, NULL
+    when no entry covers that date.
+    """
+    return f"""
+        LEFT JOIN LATERAL (
+            SELECT rate
+              FROM sales_commission_rate
+             WHERE product_tmpl_id = {template_column}
+               AND valid_from <= {date_column}
+               AND (valid_to IS NULL OR valid_to >= {date_column})
+             ORDER BY valid_from DESC
+             LIMIT 1
+        ) history ON TRUE
+    """
+
+
+class CommissionRate(models.Model):
+    _name = "sales.commission.rate"
+    _description = "Sales Commission Rate History"
+    _order = "product_tmpl_id, valid_from desc"
+    _rec_name = "product_tmpl_id"
+
+    product_tmpl_id = fields.Many2one(
+        comodel_name="product.template",
+        string="Product",
+        required=True,
+        ondelete="cascade",
+        index=True,
+    )
+    valid_from = fields.Date(string="Valid From", required=True)
+    valid_to = fields.Date(
+        string="Valid To",
+        help="Last day the rate applies, included. Leave empty for a rate without end.",
+    )
+    rate = fields.Float(string="Commission Rate (%)", required=True)
+
+    def init(self):
+        sql.create_index(
+            self.env.cr, f"{self._table}_product_valid_from_idx", self._table,
+            ["product_tmpl_id", "valid_from"],
+        )
+
+    @api.constrains("rate")
+    def _check_rate(self):
+        for history in self:
+            if history.rate < 0 or history.rate > 100:
+                raise ValidationError("Commission rate must be between 0 and 100%.")
+
+    @api.constrains("product_tmpl_id", "valid_from", "valid_to")
+    def _check_dates(self):
+        for history in self:
+            if history.valid_to and history.valid_to < history.valid_from:
+                raise ValidationError("The end of a commission rate period cannot precede its start.")
+            overlapping = self.search_count([
+                ("id", "!=", history.id),
+                ("product_tmpl_id", "=", history.product_tmpl_id.id),
+                ("valid_from", "<=", history.valid_to or date.max),
+                "|", ("valid_to", "=", False), ("valid_to", ">=", history.valid_from),
+            ])
+            if overlapping:
+                raise ValidationError(
+                    f"Commission rate periods of {history.product_tmpl_id.display_name} cannot overlap."
+                )
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        histories = super().create(vals_list)
+        histories.product_tmpl_id._commission_rate_changed()
+        return histories
+
+    def write(self, vals):
+        templates = self.product_tmpl_id
+        res = super().write(vals)
+        (templates | self.product_tmpl_id)._commission_rate_changed()
+        return res
+
+    def unlink(self):
+        templates = self.product_tmpl_id
+        res = super().unlink()
+        templates._commission_rate_changed()
+        return res
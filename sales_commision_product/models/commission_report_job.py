@@ -0,0 +1,276 @@
+from odoo import api, fields, models
+from odoo.exceptions import UserError
+from datetime import timedelta
+import logging
+import threading
+
+from .wizard_commission_report import STATUS_FILTER_SELECTION
+
+_logger = logging.getLogger(__name__)
+
+REPORT_JOB_RETENTION_DAYS = 7
+REPORT_JOB_TIMEOUT_MINUTES = 60
+REPORT_MIMETYPES = {
+    'pdf': 'application/pdf',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+}
+
+
+class CommissionReportJob(models.Model):
+    _name = "sales.commission.report.job"
+    _description = "Sales Commission Report Job"
+    _order = "id desc"
+
+    user_id = fields.Many2one(
+        comodel_name="res.users",
+        string="Requested By",
+        required=True,
+        default=lambda self: self.env.user,
+    )
+    company_id = fields.Many2one(
+        comodel_name="res.company",
+        string="Company",
+        required=True,
+        default=lambda self: self.env.company,
+    )
+    report_type = fields.Selection(
+        [('pdf', 'PDF'), ('xlsx', 'Excel')],
+        string="Format",
+        required=True,
+    )
+    date_from = fields.Date(string="Date From", required=True)
+    date_to = fields.Date(string="Date To", required=True)
+    status_filter = fields.Selection(STATUS_FILTER_SELECTION, string="Invoice Status", required=True)
+    salesperson_ids = fields.Many2many(
+        comodel_name="res.users",
+        relation="sales_commission_report_job_res_users_rel",
+        column1="job_id",
+        column2="user_id",
+        string="Salespersons",
+    )
+    state = fields.Selection(
+        [
+            ('queued', 'Queued'),
+            ('running', 'Running'),
+            ('done', 'Done'),
+            ('failed', 'Failed'),
+        ],
+        string="Status",
+        required=True,
+        default='queued',
+    )
+    data_fingerprint = fields.Char(
+        string="Data Fingerprint",
+        help="Fingerprint of the commission lines the report was rendered from.",
+    )
+    attachment_id = fields.Many2one(
+        comodel_name="ir.attachment",
+        string="Report File",
+        ondelete="set null",
+    )
+    date_started = fields.Datetime(string="Started On")
+    date_done = fields.Datetime(string="Finished On")
+    error = fields.Text(string="Error")
+
+    def _get_filter_vals(self):
+        """Return the wizard values reproducing the job filters."""
+        self.ensure_one()
+        return {
+            'date_from': self.date_from,
+            'date_to': self.date_to,
+            'status_filter': self.status_filter,
+            'salesperson_ids': [(6, 0, self.salesperson_ids.ids)],
+        }
+
+    @api.model
+    def _get_stale_cutoff(self):
+        """Return the start date before which a running job is considered dead."""
+        return fields.Datetime.now() - timedelta(minutes=REPORT_JOB_TIMEOUT_MINUTES)
+
+    @api.model
+    def _find_matching(self, wizard, report_type, fingerprint):
+        """
+        Return the most recent usable job of the current user for the same
+        report. Jobs running for longer than REPORT_JOB_TIMEOUT_MINUTES are
+        ignored, so the report is queued again.
+        """
+        jobs = self.search([
+            ('user_id', '=', self.env.uid),
+            ('company_id', '=', self.env.company.id),
+            ('report_type', '=', report_type),
+            ('date_from', '=', wizard.date_from),
+            ('date_to', '=', wizard.date_to),
+            ('status_filter', '=', wizard.status_filter),
+            '|', '|',
+            ('state', '=', 'queued'),
+            '&', ('state', '=', 'running'), ('date_started', '>=', self._get_stale_cutoff()),
+            '&', ('state', '=', 'done'), ('data_fingerprint', '=', fingerprint),
+        ])
+        for job in jobs:
+            if job.salesperson_ids == wizard.salesperson_ids and (job.state != 'done' or job.attachment_id):
+                return job
+        return self.browse()
+
+    @api.model
+    def _request(self, wizard, report_type):
+        """
+        Queue the report of ``wizard`` for background rendering.
+
+        A finished job rendered from unchanged commission data is downloaded
+        right away, and a request identical to a pending one is not queued
+        twice.
+        """
+        if not wizard._has_commission_data():
+            raise UserError("No commission data found for the selected filters.")
+        job = self._find_matching(wizard, report_type, wizard._get_data_fingerprint())
+        if job.state == 'done':
+            return job.action_download()
+        if not job:
+            job = self.create({
+                'report_type': report_type,
+                'date_from': wizard.date_from,
+                'date_to': wizard.date_to,
+                'status_filter': wizard.status_filter,
+                'salesperson_ids': [(6, 0, wizard.salesperson_ids.ids)],
+            })
+            self.env.ref('sales_commision_product.ir_cron_sales_commission_report_jobs')._trigger()
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'title': "Commission Report",
+                'message': "The report is being generated. You will be notified when it is ready.",
+                'type': 'info',
+                'next': {'type': 'ir.actions.act_window_close'},
+            },
+        }
+
+    def _render(self):
+        """Render the job report as its user and return ``(content, fingerprint)``."""
+        self.ensure_one()
+        wizard = self.env['wizard.commission.report'].with_user(self.user_id).with_company(
+            self.company_id
+        ).create(self._get_filter_vals())
+        fingerprint = wizard._get_data_fingerprint()
+        if self.report_type == 'pdf':
+            content = self.env['ir.actions.report'].with_user(self.user_id).with_company(
+                self.company_id
+            )._render_qweb_pdf('sales_commision_product.action_report_commission_financial', wizard.ids)[0]
+        else:
+            content = wizard._render_excel_streaming()
+        return content, fingerprint
+
+    def _run(self):
+        """Render the job, store the file as an attachment and notify the requester."""
+        self.ensure_one()
+        try:
+            with self.env.cr.savepoint():
+                content, fingerprint = self._render()
+                attachment = self.env['ir.attachment'].create({
+                    'name': f"Commission_Report_{self.date_from}_{self.date_to}.{self.report_type}",
+                    'type': 'binary',
+                    'raw': content,
+                    'res_model': self._name,
+                    'res_id': self.id,
+                    'mimetype': REPORT_MIMETYPES[self.report_type],
+                })
+        except Exception as e:
+            _logger.exception("Commission report job %d failed", self.id)
+            self.write({'state': 'failed', 'error': str(e), 'date_done': self.env.cr.now()})
+            self._notify("The commission report could not be generated.", 'danger')
+            return
+        self.write({
+            'state': 'done',
+            'attachment_id': attachment.id,
+            'data_fingerprint': fingerprint,
+            'date_done': self.env.cr.now(),
+            'error': False,
+        })
+        self._notify("Your commission report is ready. Open Commission Reports to download it.", 'success')
+
+    def _notify(self, message, notification_type):
+        """Send a notification to the user who requested the job."""
+        self.ensure_one()
+        self.env['bus.bus']._sendone(self.user_id.partner_id, 'simple_notification', {
+            'title': "Commission Report",
+            'message': message,
+            'type': notification_type,
+            'sticky': True,
+        })
+
+    @api.model
+    def _fail_stale_jobs(self):
+        """
+        Mark failed the jobs running for longer than
+        REPORT_JOB_TIMEOUT_MINUTES, left behind by a worker that was killed
+        or timed out while rendering, and notify their requesters.
+        """
+        jobs = self.search([
+            ('state', '=', 'running'),
+            ('date_started', '<', self._get_stale_cutoff()),
+        ])
+        for job in jobs:
+            _logger.warning("Commission report job %d timed out", job.id)
+            job.write({
+                'state': 'failed',
+                'error': f"The report was not generated within {REPORT_JOB_TIMEOUT_MINUTES} minutes.",
+                'date_done': self.env.cr.now(),
+            })
+            job._notify("The commission report could not be generated.", 'danger')
+        return jobs
+
+    @api.model
+    def _process_jobs(self, limit=None):
+        """
+        Render queued jobs one at a time, committing after each. Jobs locked
+        by a concurrent worker are skipped, and stale running jobs are
+        marked failed first.
+
+        :return: number of jobs processed
+        """
+        auto_commit = not getattr(threading.current_thread(), "testing", False)
+        self._fail_stale_jobs()
+        if auto_commit:
+            self.env.cr.commit()
+        processed = 0
+        while limit is None or processed < limit:
+            self.env.cr.execute("""
+                SELECT id FROM sales_commission_report_job
+                 WHERE state = 'queued'
+                 ORDER BY id
+                 LIMIT 1
+                   FOR UPDATE SKIP LOCKED
+            """)
+            row = self.env.cr.fetchone()
+            if not row:
+                break
+            job = self.browse(row[0])
+            job.write({'state': 'running', 'date_started': self.env.cr.now()})
+            if auto_commit:
+                self.env.cr.commit()
+            job._run()
+            if auto_commit:
+                self.env.cr.commit()
+            processed += 1
+        return processed
+
+    def action_download(self):
+        """Download the rendered report."""
+        self.ensure_one()
+        if not self.attachment_id:
+            raise UserError("The report file is not available.")
+        return {
+            'type': 'ir.actions.act_url',
+            'url': f'/web/content/{self.attachment_id.id}?download=true',
+            'target': 'self',
+        }
+
+    @api.autovacuum
+    def _gc_report_jobs(self):
+        """Remove finished jobs and their files after REPORT_JOB_RETENTION_DAYS."""
+        jobs = self.search([
+            ('state', 'in', ['done', 'failed']),
+            ('date_done', '<', fields.Datetime.now() - timedelta(days=REPORT_JOB_RETENTION_DAYS)),
+        ])
+        jobs.attachment_id.unlink()
+        jobs.unlink()
@@ -0,0 +1,65 @@
+from odoo import api, fields, models
+from odoo.exceptions import ValidationError
+
+
+def rule_band_join(company, salesperson, team, categ, partner, amount):
+    """
+    SQL join exposing ``band.rate``: the rate of the first active commission
+    rule matching a line, NULL when none does. Arguments are the SQL
+    expressions of the line's attributes, looked up in the temporary table
+    filled by ``sales.commission.service._create_rule_band_table``.
+    """
+    return f"""
+        LEFT JOIN sales_commission_rule_band band
+               ON band.company_id = {company}
+              AND band.salesperson_id = COALESCE({salesperson}, 0)
+              AND band.team_id = COALESCE({team}, 0)
+              AND band.categ_id = COALESCE({categ}, 0)
+              AND band.partner_id = COALESCE({partner}, 0)
+              AND ABS({amount}) >= band.amount_from
+              AND (band.amount_to IS NULL OR ABS({amount}) < band.amount_to)
+    """
+
+
+class CommissionRule(models.Model):
+    _name = "sales.commission.rule"
+    _description = "Sales Commission Rule"
+    _order = "sequence, id"
+
+    name = fields.Char(string="Name", required=True)
+    active = fields.Boolean(default=True)
+    sequence = fields.Integer(
+        string="Priority",
+        default=10,
+        help="The first matching rule in this order gives the commission rate.",
+    )
+    company_id = fields.Many2one(comodel_name="res.company", string="Company")
+    salesperson_id = fields.Many2one(comodel_name="res.users", string="Salesperson")
+    team_id = fields.Many2one(comodel_name="crm.team", string="Sales Team")
+    product_categ_id = fields.Many2one(
+        comodel_name="product.category",
+        string="Product Category",
+        help="Also matches products of its subcategories.",
+    )
+    partner_category_id = fields.Many2one(
+        comodel_name="res.partner.category",
+        string="Customer Tag",
+        help="Matches invoices whose customer carries this tag.",
+    )
+    min_amount = fields.Float(
+        string="Minimum Line Amount",
+        help="Tier on the invoice line alone: only lines whose subtotal, in absolute value, "
+             "reaches this amount match. Sales volumes are not added up across lines or periods.",
+    )
+    rate = fields.Float(
+        string="Commission Rate (%)",
+        required=True,
+        help="Replaces the product's commission rate on matching invoice lines. "
+             "A rate of 0 excludes them from commissions.",
+    )
+
+    @api.constrains("rate")
+    def _check_rate(self):
+        for rule in self:
+            if rule.rate < 0 or rule.rate > 100:
+                raise ValidationError("Commission rate must be between 0 and 100%.")
@@ -1,9 +1,40 @@
 from odoo import api, fields, models
-from odoo.tools import float_compare
+from odoo.tools import float_compare, split_every
+from concurrent.futures import ThreadPoolExecutor
 import logging
+import threading
+import time
+
+from .commission import PAID_PAYMENT_STATES
+from .commission_profile import profile_phase
+from .commission_rate import rate_history_join
+from .commission_rule import rule_band_join
+from .rate_index import RateIntervalIndex
+from .rule_engine import CompiledRuleSet
+from .report_cache import report_data_cache
 
 _logger = logging.getLogger(__name__)
 
+SYNC_ENGINES = ("orm", "sql")
+SYNC_CHUNK_SIZE = 5000
+# counts returned by _sync_commission_lines
+SYNC_COUNT_KEYS = ("scanned", "skipped", "created", "updated", "deleted")
+# restate_all: a rate change restates every line of the product, keep_paid:
+# lines of paid invoices keep the rate they were paid at
+RATE_CHANGE_POLICIES = ("restate_all", "keep_paid")
+# non-transactional counter bumped whenever commission report data changes
+DATA_VERSION_SEQUENCE = "sales_commission_data_version_seq"
+DATA_VERSION_BUMPED = "sales_commision_product.data_version_bumped"
+
+
+def _sum_counts(results):
+    """Add up the counts of several :meth:`_sync_commission_lines` calls."""
+    totals = dict.fromkeys(SYNC_COUNT_KEYS, 0)
+    for result in results:
+        for key in totals:
+            totals[key] += result[key]
+    return totals
+
 
 class CommissionService(models.Model):
     _name = "sales.commission.service"
@@ -15,6 +46,116 @@ class CommissionService(models.Model):
         string="Last Processed Move Line",
         help="Technical field to avoid duplicate commission entries.",
     )
+    last_sync_date = fields.Datetime(
+        string="Last Sync Watermark",
+        help="Technical field: start of the last successful sync, or of the "
+             "oldest transaction then running if earlier. Incremental syncs "
+             "only visit invoice lines written since this date.",
+    )
+    last_full_sync_date = fields.Datetime(
+        string="Last Full Reconcile",
+        help="Technical field: start of the last successful full reconcile.",
+    )
+    sync_run_start = fields.Datetime(
+        string="Chunked Run Started",
+        readonly=True,
+        help="Start of the chunked sync in progress, empty when none is pending.",
+    )
+    sync_run_incremental = fields.Boolean(string="Chunked Run Is Incremental", readonly=True)
+    sync_cursor_move_line_id = fields.Integer(
+        string="Resume After Move Line",
+        readonly=True,
+        help="Id of the last invoice line committed by the chunked sync in progress.",
+    )
+    sync_chunks_done = fields.Integer(string="Chunks Done", readonly=True)
+    sync_rows_done = fields.Integer(string="Lines Processed", readonly=True)
+    sync_rows_per_second = fields.Float(string="Lines per Second", readonly=True, digits=(16, 1))
+    queue_depth = fields.Integer(
+        string="Queued Invoices",
+        compute="_compute_queue_stats",
+        help="Invoices waiting for commission recomputation.",
+    )
+    queue_oldest_date = fields.Datetime(
+        string="Oldest Queued On",
+        compute="_compute_queue_stats",
+        help="When the longest-waiting invoice was queued. An old date means "
+             "commission data is falling behind.",
+    )
+    queue_failed_count = fields.Integer(
+        string="Failed Invoices",
+        compute="_compute_queue_stats",
+        help="Queued invoices whose recomputation kept failing, parked until they change again.",
+    )
+
+    data_version = fields.Integer(
+        string="Data Version",
+        compute="_compute_data_version",
+        help="Bumped whenever commission lines or the invoices they report on change.",
+    )
+    report_cache_hits = fields.Integer(
+        string="Report Cache Hits",
+        compute="_compute_report_cache_stats",
+        help="Report data served from the cache by this server process.",
+    )
+    report_cache_misses = fields.Integer(
+        string="Report Cache Misses",
+        compute="_compute_report_cache_stats",
+        help="Report data computed from the database by this server process.",
+    )
+    report_cache_entries = fields.Integer(
+        string="Report Cache Entries",
+        compute="_compute_report_cache_stats",
+    )
+
+    def init(self):
+        self.env.cr.execute("CREATE SEQUENCE IF NOT EXISTS %s" % DATA_VERSION_SEQUENCE)
+
+    def _compute_queue_stats(self):
+        stats = self.env["sales.commission.queue"]._get_queue_stats()
+        for service in self:
+            service.queue_depth = stats["depth"]
+            service.queue_oldest_date = stats["oldest_date"]
+            service.queue_failed_count = stats["failed"]
+
+    def _compute_data_version(self):
+        version = self._get_data_version()
+        for service in self:
+            service.data_version = version
+
+    def _compute_report_cache_stats(self):
+        stats = report_data_cache.stats()
+        for service in self:
+            service.report_cache_hits = stats["hits"]
+            service.report_cache_misses = stats["misses"]
+            service.report_cache_entries = stats["entries"]
+
+    @api.model
+    def _get_data_version(self):
+        """Current version of the commission report data."""
+        self.env.cr.execute("SELECT last_value FROM %s" % DATA_VERSION_SEQUENCE)
+        return self.env.cr.fetchone()[0]
+
+    @api.model
+    def _bump_data_version(self):
+        """
+        Mark the commission report data as changed.
+
+        The version is a sequence, so bumping it takes no lock and is visible
+        to other transactions at once. It is bumped again after commit, so a
+        report computed by another transaction before the change was
+        committed is never cached under the final version.
+        """
+        self.env.cr.execute("SELECT nextval(%s)", [DATA_VERSION_SEQUENCE])
+        postcommit = self.env.cr.postcommit
+        if not postcommit.data.get(DATA_VERSION_BUMPED):
+            postcommit.data[DATA_VERSION_BUMPED] = True
+            registry = self.pool
+
+            def bump_after_commit():
+                with registry.cursor() as cr:
+                    cr.execute("SELECT nextval(%s)", [DATA_VERSION_SEQUENCE])
+
+            postcommit.add(bump_after_commit)
 
     @api.model
     def _get_service(self):
@@ -24,131 +165,1050 @@ class CommissionService(models.Model):
         return service
 
     @api.model
-    def run_commission_sync(self):
-        """Synchronize commission lines from invoice lines."""
-        try:
-            self._get_service()  # ensure record exists for backward compatibility
-            move_line_model = self.env["account.move.line"]
-            commission_line_model = self.env["sales.commission.line"]
+    def _get_eligible_line_domain(self):
+        """Domain of invoice lines that may generate a commission line."""
+        return [
+            ("move_id.state", "=", "posted"),
+            ("move_id.move_type", "in", ["out_invoice", "out_refund"]),
+            ("product_id", "!=", False),
+            ("display_type", "not in", ["line_section", "line_note"]),
+        ]
 
-            _logger.info("Starting commission sync...")
+    def _get_incremental_scope_domain(self):
+        """
+        Domain of customer invoice lines created or changed since the last
+        successful sync, whatever their current state.
 
-            invoice_lines = move_line_model.search([
-                ("move_id.state", "=", "posted"),
-                ("move_id.move_type", "=", "out_invoice"),
-                ("product_id", "!=", False),
-                ("display_type", "not in", ["line_section", "line_note"]),
-            ])
+        A line is in scope when it is newer than ``last_processed_move_line_id``
+        or when the line or its move has been written since ``last_sync_date``
+        (posting, reset to draft, cancellation and payment all write the move).
+        """
+        self.ensure_one()
+        watermark = self.last_sync_date
+        scope = [
+            ("write_date", ">=", watermark),
+            ("move_id.write_date", ">=", watermark),
+        ]
+        if self.last_processed_move_line_id:
+            scope.append(("id", ">", self.last_processed_move_line_id.id))
+        return [
+            ("move_id.move_type", "in", ["out_invoice", "out_refund"]),
+        ] + ["|"] * (len(scope) - 1) + scope
 
-            refund_lines = move_line_model.search([
-                ("move_id.state", "=", "posted"),
-                ("move_id.move_type", "=", "out_refund"),
-                ("product_id", "!=", False),
-                ("display_type", "not in", ["line_section", "line_note"]),
-            ])
+    @api.model
+    def _get_sync_watermark(self):
+        """
+        Return the date from which the next incremental sync must look
+        again: the start of the current transaction, or of the oldest
+        transaction running on the database if earlier.
 
-            eligible_lines = invoice_lines | refund_lines
-            _logger.info("Found %d eligible invoice lines for commission", len(eligible_lines))
-
-            eligible_map = {}
-            for line in eligible_lines:
-                commission_rate = line.product_id.product_tmpl_id.commission_rate
-                if not commission_rate:
-                    continue
-
-                move = line.move_id
-                base_amount = line.price_subtotal
-                commission_amount = base_amount * (commission_rate / 100.0)
-                if move.move_type == "out_refund":
-                    commission_amount *= -1
-
-                salesperson = move.invoice_user_id or self.env.user
-
-                eligible_map[line.id] = {
-                    "salesperson_id": salesperson.id,
-                    "invoice_id": move.id,
-                    "invoice_line_id": line.id,
-                    "product_id": line.product_id.id,
-                    "quantity": line.quantity,
-                    "commission_rate": commission_rate,
-                    "commission_amount": commission_amount,
-                    "line_subtotal": base_amount,
-                    "company_id": move.company_id.id,
-                }
-
-            _logger.info("Found %d lines with commission rates", len(eligible_map))
-
-            existing_lines = commission_line_model.search([])
-            create_vals = []
-            lines_to_unlink = []
-
-            for commission_line in existing_lines:
-                line_vals = eligible_map.pop(commission_line.invoice_line_id.id, None)
-                if not line_vals:
-                    # Only delete if invoice line no longer exists or is no longer eligible
-                    invoice_line = move_line_model.browse(commission_line.invoice_line_id.id)
-                    if not invoice_line.exists():
-                        lines_to_unlink.append(commission_line.id)
+        Records are stamped with the start date of the transaction writing
+        them, so a transaction that started before this sync but commits
+        after its snapshot writes dates older than the start of the sync,
+        for lines the sync cannot see. Trailing the watermark behind it
+        keeps those lines in the next incremental scope.
+        """
+        cr = self.env.cr
+        # pg_stat_activity is otherwise frozen at its first read in the transaction
+        cr.execute("SELECT pg_stat_clear_snapshot()")
+        cr.execute("""
+            SELECT LEAST(now(), min(xact_start)) AT TIME ZONE 'UTC'
+              FROM pg_stat_activity
+             WHERE datname = current_database()
+               AND xact_start IS NOT NULL
+        """)
+        return cr.fetchone()[0]
+
+    @api.model
+    def _get_sync_engine(self):
+        """Engine used when the caller does not choose one: ``orm`` or ``sql``."""
+        engine = self.env["ir.config_parameter"].sudo().get_param(
+            "sales_commision_product.sync_engine", "orm"
+        )
+        return engine if engine in SYNC_ENGINES else "orm"
+
+    @api.model
+    def run_commission_sync(self, incremental=False, engine=None, chunked=False, workers=0):
+        """
+        Synchronize commission lines from invoice lines, see
+        :meth:`_run_commission_sync` for the parameters.
+
+        :return: whether the sync succeeded
+        """
+        return self._run_commission_sync(incremental, engine, chunked, workers).state == "done"
+
+    @api.model
+    def _run_commission_sync(self, incremental=False, engine=None, chunked=False, workers=0):
+        """
+        Synchronize commission lines from invoice lines.
+
+        :param incremental: only visit invoice lines created or changed since
+            the last successful sync. Falls back to a full reconcile when the
+            service has never completed a sync. A full reconcile rescans every
+            eligible invoice line and repairs any drift.
+        :param engine: ``orm`` diffs lines record by record, ``sql`` reconciles
+            them with a few set-based statements. Both produce the same
+            commission lines. Defaults to the ``sales_commision_product.sync_engine``
+            system parameter.
+        :param chunked: process invoice lines in id-ordered chunks and commit
+            after each one, resuming an interrupted chunked run if any.
+        :param workers: when greater than 1, split the invoice lines by company
+            (or by id range) and reconcile the partitions in parallel, each in
+            its own database cursor. Ignored by chunked runs.
+
+        :return: the ``sales.commission.sync.run`` recording this call, failed
+            when the sync raised
+        """
+        run_model = self.env["sales.commission.sync.run"]
+        run_vals = {
+            "start_date": fields.Datetime.now(),
+            "mode": "incremental" if incremental else "full",
+            "chunked": chunked,
+        }
+        started = time.monotonic()
+        counts = {}
+        try:
+            service = self._get_service()
+            engine = run_vals["engine"] = engine or self._get_sync_engine()
+            profile = self.env["sales.commission.profile"]
+            if chunked:
+                with profile._profile("sync", f"Chunked sync ({engine})") as stats:
+                    counts = service._run_chunked_sync(incremental, engine)
+                    stats["rows"] = counts["scanned"]
+                run_vals["mode"] = "incremental" if service.sync_run_incremental else "full"
+            else:
+                sync_start = self._get_sync_watermark()
+                incremental = incremental and bool(service.last_sync_date)
+                run_vals["mode"] = "incremental" if incremental else "full"
+
+                _logger.info(
+                    "Starting %s commission sync (%s engine)...",
+                    "incremental" if incremental else "full", engine,
+                )
+
+                mode = "Incremental" if incremental else "Full"
+                with profile._profile("sync", f"{mode} sync ({engine})") as stats:
+                    scope_domain = service._get_incremental_scope_domain() if incremental else None
+                    if workers > 1:
+                        # Partitions commit in their own cursors, so there is
+                        # nothing to roll back: after a failed partition, the
+                        # committed ones stay and the watermarks do not move,
+                        # so the next sync visits their lines again.
+                        counts = self._run_parallel_sync(
+                            engine, workers, scope_domain, rebuild_summary=not incremental,
+                        )
+                        service._finish_sync(sync_start, incremental, update_summary=False)
                     else:
-                        move = invoice_line.move_id
-                        if move.state != 'posted':
-                            lines_to_unlink.append(commission_line.id)
-                    continue
-
-                updates = {}
-                if commission_line.salesperson_id.id != line_vals["salesperson_id"]:
-                    updates["salesperson_id"] = line_vals["salesperson_id"]
-                if commission_line.invoice_id.id != line_vals["invoice_id"]:
-                    updates["invoice_id"] = line_vals["invoice_id"]
-                if commission_line.product_id.id != line_vals["product_id"]:
-                    updates["product_id"] = line_vals["product_id"]
-                uom = commission_line.invoice_line_id.product_uom_id
-                qty_differs = False
-                if uom and uom.rounding:
-                    qty_differs = float_compare(
-                        commission_line.quantity,
-                        line_vals["quantity"],
-                        precision_rounding=uom.rounding,
-                    )
-                else:
-                    qty_differs = float_compare(
-                        commission_line.quantity,
-                        line_vals["quantity"],
-                        precision_digits=6,
-                    )
-                if qty_differs:
-                    updates["quantity"] = line_vals["quantity"]
-                if float_compare(commission_line.commission_rate, line_vals["commission_rate"], precision_digits=4):
-                    updates["commission_rate"] = line_vals["commission_rate"]
-
-                currency = commission_line.company_currency_id
-                if currency and not currency.is_zero(commission_line.commission_amount - line_vals["commission_amount"]):
-                    updates["commission_amount"] = line_vals["commission_amount"]
-                if currency and not currency.is_zero(commission_line.line_subtotal - line_vals["line_subtotal"]):
-                    updates["line_subtotal"] = line_vals["line_subtotal"]
-                if commission_line.company_id.id != line_vals["company_id"]:
-                    updates["company_id"] = line_vals["company_id"]
-
-                if updates:
-                    commission_line.write(updates)
-
-            # Delete invalid commission lines
-            if lines_to_unlink:
-                commission_line_model.browse(lines_to_unlink).unlink()
-                _logger.info("Deleted %d invalid commission lines", len(lines_to_unlink))
-
-            # Create new commission lines in batches
-            if eligible_map:
-                create_vals = list(eligible_map.values())
-                batch_size = 100
-                for i in range(0, len(create_vals), batch_size):
-                    batch = create_vals[i:i + batch_size]
-                    commission_line_model.create(batch)
-                _logger.info("Created %d new commission lines", len(create_vals))
+                        # a failed serial sync leaves nothing half done, only its run record
+                        with self.env.cr.savepoint():
+                            counts = self._sync_commission_lines(engine, scope_domain)
+                            service._finish_sync(sync_start, incremental)
+                    stats["rows"] = counts["scanned"]
 
+            sync_run = run_model._record(
+                run_vals, counts, time.monotonic() - started, profile_id=stats.get("profile_id"),
+            )
             _logger.info("Commission sync completed successfully")
-            return True
+            return sync_run
         except Exception as e:
             _logger.error("Error in commission sync: %s", str(e), exc_info=True)
-            return False
+            return run_model._record(run_vals, counts, time.monotonic() - started, error=str(e))
+
+    @api.model
+    def _recompute_moves(self, move_ids):
+        """Reconcile the commission lines of the given invoices only."""
+        if not move_ids:
+            return
+        _logger.info("Recomputing commissions of %d invoices", len(move_ids))
+        self._sync_commission_lines(self._get_sync_engine(), [("move_id", "in", move_ids)])
+        self.env["sales.commission.summary"]._refresh_dirty()
+
+    @api.model
+    def _get_rate_change_policy(self):
+        """Policy applied to existing lines when a commission rate changes, see RATE_CHANGE_POLICIES."""
+        policy = self.env["ir.config_parameter"].sudo().get_param(
+            "sales_commision_product.rate_change_policy", "restate_all"
+        )
+        return policy if policy in RATE_CHANGE_POLICIES else "restate_all"
+
+    @api.model
+    def _propagate_commission_rates(self, templates):
+        """
+        Restate the commission lines of the variants of ``templates`` at the
+        rate effective on their invoice date with one UPDATE, instead of
+        waiting for a full sync. Lines of paid invoices are kept under the
+        ``keep_paid`` policy, and lines without a rate are kept, as in a sync.
+
+        :return: number of commission lines updated
+        """
+        self.env.flush_all()
+        cr = self.env.cr
+        self._create_rule_band_table(self._get_commission_rule_set(), """
+            SELECT DISTINCT line.company_id, am.invoice_user_id, am.team_id, pt.categ_id, am.commercial_partner_id
+              FROM sales_commission_line line
+              JOIN account_move am ON am.id = line.invoice_id
+              JOIN product_product pp ON pp.id = line.product_id
+              JOIN product_template pt ON pt.id = pp.product_tmpl_id
+             WHERE pt.id IN %s
+        """, [tuple(templates.ids)])
+        cr.execute("""
+            WITH changed AS (
+                UPDATE sales_commission_line scl
+                   SET commission_rate = effective.rate,
+                       commission_amount = ROUND(
+                           scl.line_subtotal * effective.rate::numeric / 100.0
+                           * CASE WHEN scl.move_type = 'out_refund' THEN -1 ELSE 1 END,
+                           effective.decimal_places
+                       ),
+                       write_uid = %%s,
+                       write_date = (now() at time zone 'UTC')
+                  FROM (
+                      SELECT line.id, COALESCE(band.rate, history.rate, pt.commission_rate, 0) AS rate,
+                             cur.decimal_places
+                        FROM sales_commission_line line
+                        JOIN account_move am ON am.id = line.invoice_id
+                        JOIN product_product pp ON pp.id = line.product_id
+                        JOIN product_template pt ON pt.id = pp.product_tmpl_id
+                        JOIN res_currency cur ON cur.id = line.company_currency_id
+                        %s
+                        %s
+                       WHERE pt.id IN %%s
+                  ) effective
+                 WHERE effective.id = scl.id
+                   AND effective.rate != 0
+                   AND scl.commission_rate IS DISTINCT FROM effective.rate
+                   AND NOT (%%s AND COALESCE(scl.payment_state, '') IN %%s)
+             RETURNING scl.salesperson_id, scl.company_id, scl.invoice_date, scl.move_type
+            )
+            SELECT salesperson_id, company_id, date_trunc('month', invoice_date)::date, move_type, count(*)
+              FROM changed
+             GROUP BY 1, 2, 3, 4
+        """ % (
+            rule_band_join(
+                "line.company_id", "am.invoice_user_id", "am.team_id",
+                "pt.categ_id", "am.commercial_partner_id", "line.line_subtotal",
+            ),
+            rate_history_join("pt.id", "line.invoice_date"),
+        ), [
+            self.env.uid, tuple(templates.ids),
+            self._get_rate_change_policy() == "keep_paid", PAID_PAYMENT_STATES,
+        ])
+        dirty_keys = set()
+        changed_rows = cr.fetchall()
+        cr.execute("DROP TABLE sales_commission_rule_band")
+        updated = self._collect_summary_keys(changed_rows, dirty_keys)
+        if updated:
+            self.env["sales.commission.line"].invalidate_model(
+                ["commission_rate", "commission_amount", "write_uid", "write_date"],
+            )
+            summary = self.env["sales.commission.summary"]
+            summary._mark_dirty(dirty_keys)
+            summary._refresh_dirty()
+            self._bump_data_version()
+        _logger.info("Commission rate change restated %d commission lines", updated)
+        return updated
+
+    @api.model
+    def _sync_commission_lines(self, engine, scope_domain=None):
+        """
+        Reconcile commission lines with the chosen engine.
+
+        :return: ``{"scanned": int, "skipped": int, "created": int,
+            "updated": int, "deleted": int}``, ``scanned`` being the posted
+            customer invoice product lines visited and ``skipped`` those of
+            them without a commission rate, counted by the engine on the rows
+            it processes
+        """
+        if engine == "sql":
+            return self._sync_commission_lines_sql(scope_domain)
+        return self._sync_commission_lines_orm(scope_domain)
+
+    def _finish_sync(self, sync_start, incremental, update_summary=True):
+        """
+        Move the watermarks forward after a successful sync started at
+        ``sync_start``, see :meth:`_get_sync_watermark`.
+
+        :param update_summary: refresh the summary rows the sync changed, or
+            rebuild the summary after a full reconcile. Parallel syncs do it
+            themselves, see :meth:`_run_parallel_sync`.
+        """
+        self.ensure_one()
+        last_line = self.env["account.move.line"].search([], order="id desc", limit=1)
+        vals = {
+            "last_processed_move_line_id": last_line.id,
+            "last_sync_date": sync_start,
+        }
+        if not incremental:
+            vals["last_full_sync_date"] = sync_start
+            # a completed full reconcile supersedes any interrupted chunked run
+            vals["sync_run_start"] = False
+            vals["sync_cursor_move_line_id"] = 0
+        self.write(vals)
+        if not update_summary:
+            return
+
+        summary = self.env["sales.commission.summary"]
+        with profile_phase(self.env, "summary"):
+            if incremental:
+                summary._refresh_dirty()
+            else:
+                # full reconciles are the repair path: rebuild the summary too
+                summary._rebuild()
+
+    @api.model
+    def _get_sync_partitions(self, workers, scope_domain=None):
+        """
+        Split customer invoice lines into disjoint domains for a parallel sync:
+        one per company when there are at least ``workers`` companies, else
+        ``workers`` contiguous id ranges of similar size.
+        """
+        cr = self.env.cr
+        lines_domain = [("move_id.move_type", "in", ["out_invoice", "out_refund"])] + (scope_domain or [])
+        subselect, params = self.env["account.move.line"]._search(lines_domain).subselect()
+
+        cr.execute(
+            "SELECT DISTINCT company_id FROM account_move_line WHERE id IN (%s) ORDER BY company_id" % subselect,
+            params,
+        )
+        company_ids = [row[0] for row in cr.fetchall()]
+        if len(company_ids) >= workers:
+            return [[("company_id", "=", company_id)] for company_id in company_ids]
+
+        cr.execute("""
+            SELECT min(id), max(id)
+              FROM (SELECT id, ntile(%%s) OVER (ORDER BY id) AS bucket
+                      FROM account_move_line
+                     WHERE id IN (%s)) AS lines
+             GROUP BY bucket
+             ORDER BY 1
+        """ % subselect, [workers] + list(params))
+        return [[("id", ">=", low), ("id", "<=", high)] for low, high in cr.fetchall()]
+
+    @api.model
+    def _run_parallel_sync(self, engine, workers, scope_domain=None, rebuild_summary=False):
+        """
+        Reconcile the partitions of :meth:`_get_sync_partitions` in a pool of
+        ``workers`` threads. Each partition runs and commits in its own cursor,
+        so the database does the work concurrently. Python work holds the GIL,
+        so the ORM engine gains far less from the threads than the SQL engine.
+
+        Partitions of the same company share summary rows, so they leave the
+        summary alone: the rows they changed are refreshed once they are all
+        done, in a new cursor whose snapshot sees their commits. Concurrent
+        upserts of the same rows would fail to serialize, or total the lines
+        of one partition only. The snapshot of the calling cursor predates
+        the partition commits, so it must not touch the lines or the summary
+        afterwards.
+
+        :param rebuild_summary: rebuild the whole summary instead of
+            refreshing the rows the partitions changed
+        :return: counts of all partitions added up, see :meth:`_sync_commission_lines`
+        """
+        partitions = self._get_sync_partitions(workers, scope_domain)
+        _logger.info("Running commission sync on %d partitions with %d workers", len(partitions), workers)
+        scopes = [(scope_domain or []) + partition for partition in partitions]
+
+        if self.pool.test_cr is None and getattr(threading.current_thread(), "testing", False):
+            # new cursors would not see the uncommitted test data
+            results = [self._sync_commission_lines(engine, scope) for scope in scopes]
+            if rebuild_summary:
+                self.env["sales.commission.summary"]._rebuild()
+            return _sum_counts(results)
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(self._sync_partition, engine, scope) for scope in scopes]
+        results, dirty_keys, errors = [], set(), []
+        for future in futures:
+            try:
+                counts, keys = future.result()
+            except Exception as e:
+                errors.append(e)
+                continue
+            results.append(counts)
+            dirty_keys |= keys
+        # the summary follows whatever partitions committed, even when one failed
+        with profile_phase(self.env, "summary"), self.pool.cursor() as cr:
+            summary = api.Environment(cr, self.env.uid, self.env.context)["sales.commission.summary"]
+            if rebuild_summary:
+                summary._rebuild()
+            elif dirty_keys:
+                summary._refresh(dirty_keys)
+        self.env.invalidate_all()
+        if errors:
+            raise errors[0]
+        return _sum_counts(results)
+
+    def _sync_partition(self, engine, scope_domain):
+        """
+        Reconcile one partition in a new cursor, committed on success.
+
+        :return: ``(counts, summary keys)``, the summary rows the partition
+            changed being left for :meth:`_run_parallel_sync` to refresh
+        """
+        with self.pool.cursor() as cr:
+            env = api.Environment(cr, self.env.uid, self.env.context)
+            counts = env["sales.commission.service"]._sync_commission_lines(engine, scope_domain)
+            return counts, env["sales.commission.summary"]._take_dirty()
+
+    def _run_chunked_sync(self, incremental, engine):
+        """
+        Run (or resume) a sync over customer invoice lines in id-ordered chunks
+        of ``SYNC_CHUNK_SIZE``, committing after each chunk.
+
+        The id of the last processed line is saved on the service, so a run
+        killed by a crash or the cron time limit resumes after the last
+        committed chunk, in the mode it was started with.
+
+        :return: counts of the chunks processed by this call, see
+            :meth:`_sync_commission_lines`
+        """
+        self.ensure_one()
+        auto_commit = not getattr(threading.current_thread(), "testing", False)
+        move_line_model = self.env["account.move.line"]
+
+        if self.sync_run_start:
+            _logger.info(
+                "Resuming chunked commission sync after move line %d (%d chunks done)",
+                self.sync_cursor_move_line_id, self.sync_chunks_done,
+            )
+        else:
+            self.write({
+                "sync_run_start": self._get_sync_watermark(),
+                "sync_run_incremental": incremental and bool(self.last_sync_date),
+                "sync_cursor_move_line_id": 0,
+                "sync_chunks_done": 0,
+                "sync_rows_done": 0,
+                "sync_rows_per_second": 0.0,
+            })
+            if auto_commit:
+                self.env.cr.commit()
+            _logger.info(
+                "Starting chunked %s commission sync (%s engine)...",
+                "incremental" if self.sync_run_incremental else "full", engine,
+            )
+
+        lines_domain = [("move_id.move_type", "in", ["out_invoice", "out_refund"])]
+        if self.sync_run_incremental:
+            lines_domain = self._get_incremental_scope_domain()
+
+        started = time.monotonic()
+        rows = 0
+        results = []
+        while True:
+            chunk_ids = move_line_model.search(
+                lines_domain + [("id", ">", self.sync_cursor_move_line_id)],
+                order="id", limit=SYNC_CHUNK_SIZE,
+            ).ids
+            if not chunk_ids:
+                break
+            try:
+                results.append(self._sync_commission_lines(engine, [("id", "in", chunk_ids)]))
+                rows += len(chunk_ids)
+                self.write({
+                    "sync_cursor_move_line_id": chunk_ids[-1],
+                    "sync_chunks_done": self.sync_chunks_done + 1,
+                    "sync_rows_done": self.sync_rows_done + len(chunk_ids),
+                    "sync_rows_per_second": rows / max(time.monotonic() - started, 1e-6),
+                })
+                if auto_commit:
+                    self.env.cr.commit()
+            except Exception:
+                if auto_commit:
+                    self.env.cr.rollback()
+                raise
+            _logger.info(
+                "Commission sync chunk %d done up to move line %d (%.0f lines/s)",
+                self.sync_chunks_done, self.sync_cursor_move_line_id, self.sync_rows_per_second,
+            )
+
+        sync_start, incremental = self.sync_run_start, self.sync_run_incremental
+        self._finish_sync(sync_start, incremental)
+        self.write({"sync_run_start": False, "sync_cursor_move_line_id": 0})
+        if auto_commit:
+            self.env.cr.commit()
+        _logger.info(
+            "Chunked commission sync completed: %d lines in %d chunks",
+            self.sync_rows_done, self.sync_chunks_done,
+        )
+        return _sum_counts(results)
+
+    @api.model
+    def _get_commission_rate_map(self, product_ids=None):
+        """
+        Return ``{product.product id: commission rate}`` for products with a rate.
+
+        :param product_ids: only map these products, all products when ``None``
+        """
+        product_model = self.env["product.product"].with_context(active_test=False)
+        template_domain = [("commission_rate", "!=", 0)]
+        if product_ids is not None:
+            template_domain.append(("product_variant_ids", "in", list(product_ids)))
+        templates = self.env["product.template"].with_context(active_test=False).search_read(
+            template_domain, ["commission_rate"],
+        )
+        rate_by_template = {t["id"]: t["commission_rate"] for t in templates if t["commission_rate"]}
+        product_domain = [("product_tmpl_id", "in", list(rate_by_template))]
+        if product_ids is not None:
+            product_domain.append(("id", "in", list(product_ids)))
+        products = product_model.search_read(product_domain, ["product_tmpl_id"], load=None)
+        return {p["id"]: rate_by_template[p["product_tmpl_id"]] for p in products}
+
+    @api.model
+    def _get_commission_rate_index(self, product_ids=None):
+        """
+        Return a :class:`RateIntervalIndex` of the rate history of every
+        product, falling back to :meth:`_get_commission_rate_map`.
+
+        :param product_ids: only index these products, all products when ``None``
+        """
+        history_domain = []
+        if product_ids is not None:
+            history_domain.append(("product_tmpl_id.product_variant_ids", "in", list(product_ids)))
+        history = self.env["sales.commission.rate"].sudo().search_read(
+            history_domain, ["product_tmpl_id", "valid_from", "valid_to", "rate"], load=None,
+        )
+        intervals_by_template = {}
+        for entry in history:
+            intervals_by_template.setdefault(entry["product_tmpl_id"], []).append(
+                (entry["valid_from"], entry["valid_to"] or None, entry["rate"])
+            )
+        product_domain = [("product_tmpl_id", "in", list(intervals_by_template))]
+        if product_ids is not None:
+            product_domain.append(("id", "in", list(product_ids)))
+        products = self.env["product.product"].with_context(active_test=False).search_read(
+            product_domain, ["product_tmpl_id"], load=None,
+        )
+        return RateIntervalIndex(
+            {p["id"]: intervals_by_template[p["product_tmpl_id"]] for p in products},
+            self._get_commission_rate_map(product_ids),
+        )
+
+    @api.model
+    def _get_commission_rule_set(self):
+        """Compile the active commission rules, see :class:`CompiledRuleSet`."""
+        return CompiledRuleSet(self.env["sales.commission.rule"].sudo().search_read(
+            [],
+            [
+                "company_id", "salesperson_id", "team_id", "product_categ_id",
+                "partner_category_id", "min_amount", "rate",
+            ],
+            order="sequence, id",
+            load=None,
+        ))
+
+    @api.model
+    def _get_category_paths(self, categ_ids):
+        """Return ``{category id: ids of the category and its parents}``, see :meth:`CompiledRuleSet.get`."""
+        return {
+            categ["id"]: tuple(int(categ_id) for categ_id in categ["parent_path"].split("/") if categ_id)
+            for categ in self.env["product.category"].browse(set(categ_ids) - {False, None}).read(["parent_path"])
+        }
+
+    @api.model
+    def _get_partner_tags(self, partner_ids):
+        """Return ``{partner id: frozenset of its tag ids}``, see :meth:`CompiledRuleSet.get`."""
+        return {
+            partner["id"]: frozenset(partner["category_id"])
+            for partner in self.env["res.partner"].browse(set(partner_ids) - {False, None}).read(["category_id"])
+        }
+
+    @api.model
+    def _create_rule_band_table(self, rule_set, keys_query, params):
+        """
+        Compile ``rule_set`` into the temporary lookup table joined by
+        :func:`rule_band_join`, with one row per amount band of each
+        distinct combination of line attributes, so SQL statements match
+        rules with an equality join instead of evaluating every rule per line.
+
+        :param keys_query: SQL returning the distinct ``(company, salesperson,
+            team, product category, commercial partner)`` of the lines to
+            match; not run when there are no rules
+        """
+        cr = self.env.cr
+        cr.execute("DROP TABLE IF EXISTS sales_commission_rule_band")
+        cr.execute("""
+            CREATE TEMPORARY TABLE sales_commission_rule_band (
+                company_id integer, salesperson_id integer, team_id integer,
+                categ_id integer, partner_id integer,
+                amount_from numeric, amount_to numeric, rate double precision
+            )
+        """)
+        if not rule_set:
+            return
+        cr.execute(keys_query, params)
+        keys = cr.fetchall()
+        categ_paths = self._get_category_paths({key[3] for key in keys})
+        partner_tags = self._get_partner_tags({key[4] for key in keys})
+        rows = [
+            (company_id, salesperson_id or 0, team_id or 0, categ_id or 0, partner_id or 0) + band
+            for company_id, salesperson_id, team_id, categ_id, partner_id in keys
+            for band in rule_set.bands(
+                company_id, salesperson_id, team_id,
+                categ_paths.get(categ_id, ()), partner_tags.get(partner_id, frozenset()),
+            )
+        ]
+        if rows:
+            cr.execute("""
+                INSERT INTO sales_commission_rule_band
+                SELECT * FROM unnest(%s::int[], %s::int[], %s::int[], %s::int[], %s::int[],
+                                     %s::numeric[], %s::numeric[], %s::float8[])
+            """, [list(column) for column in zip(*rows)])
+        cr.execute("ANALYZE sales_commission_rule_band")
+
+    @api.model
+    def _prepare_commission_vals(self, line_rows, rate_index, rule_set=None):
+        """
+        Build commission line values from raw invoice line rows.
+
+        :param line_rows: dicts read with ``load=None`` holding ``id``,
+            ``move_id``, ``product_id``, ``quantity`` and ``price_subtotal``
+        :param rate_index: see :meth:`_get_commission_rate_index`
+        :param rule_set: optional :meth:`_get_commission_rule_set`, whose
+            matching rule takes precedence over the product rate
+        :return: ``{invoice line id: values}`` for lines with a commission rate
+            on their invoice date
+        """
+        move_ids = {row["move_id"] for row in line_rows}
+        moves = {
+            move["id"]: move
+            for move in self.env["account.move"].browse(move_ids).read(
+                ["move_type", "invoice_user_id", "company_id", "invoice_date", "team_id", "commercial_partner_id"],
+                load=None,
+            )
+        }
+        if rule_set:
+            products = self.env["product.product"].browse(
+                {row["product_id"] for row in line_rows}
+            ).read(["categ_id"], load=None)
+            categ_paths = self._get_category_paths({product["categ_id"] for product in products})
+            product_categ_paths = {product["id"]: categ_paths.get(product["categ_id"], ()) for product in products}
+            partner_tags = self._get_partner_tags({move["commercial_partner_id"] for move in moves.values()})
+        eligible_map = {}
+        for row in line_rows:
+            move = moves[row["move_id"]]
+            commission_rate = None
+            if rule_set:
+                commission_rate = rule_set.get(
+                    move["company_id"], move["invoice_user_id"], move["team_id"],
+                    product_categ_paths[row["product_id"]],
+                    partner_tags.get(move["commercial_partner_id"], frozenset()),
+                    row["price_subtotal"],
+                )
+            if commission_rate is None:
+                commission_rate = rate_index.get(row["product_id"], move["invoice_date"])
+            if not commission_rate:
+                continue
+
+            base_amount = row["price_subtotal"]
+            commission_amount = base_amount * (commission_rate / 100.0)
+            if move["move_type"] == "out_refund":
+                commission_amount *= -1
+
+            eligible_map[row["id"]] = {
+                "salesperson_id": move["invoice_user_id"] or self.env.uid,
+                "invoice_id": move["id"],
+                "invoice_line_id": row["id"],
+                "product_id": row["product_id"],
+                "quantity": row["quantity"],
+                "commission_rate": commission_rate,
+                "commission_amount": commission_amount,
+                "line_subtotal": base_amount,
+                "company_id": move["company_id"],
+            }
+        return eligible_map
+
+    @api.model
+    def _sync_commission_lines_orm(self, scope_domain=None):
+        """
+        Reconcile commission lines with invoice lines through the ORM.
+
+        Eligible invoice lines are processed in id order, ``SYNC_CHUNK_SIZE``
+        at a time, reading only the columns the computation needs so memory
+        stays bounded whatever the size of the invoice history.
+
+        :param scope_domain: optional domain on ``account.move.line`` restricting
+            both the eligible lines and the existing commission lines visited.
+        :return: see :meth:`_sync_commission_lines`
+        """
+        move_line_model = self.env["account.move.line"]
+        commission_line_model = self.env["sales.commission.line"]
+
+        # lines without a rate are visited too, to count them as skipped
+        eligible_domain = self._get_eligible_line_domain()
+        existing_domain = []
+        if scope_domain is not None:
+            eligible_domain += scope_domain
+            existing_domain = [("invoice_line_id", "in", move_line_model._search(scope_domain))]
+
+        with profile_phase(self.env, "search") as stats:
+            eligible_ids = move_line_model.search(eligible_domain, order="id").ids
+            stats["rows"] = len(eligible_ids)
+        _logger.info("Found %d eligible invoice lines for commission", len(eligible_ids))
+
+        rate_index = self._get_commission_rate_index()
+        rule_set = self._get_commission_rule_set()
+        uom_rounding = {}
+        currencies = {}
+        created = updated = skipped = 0
+        for chunk_ids in split_every(SYNC_CHUNK_SIZE, eligible_ids, list):
+            chunk_created, chunk_updated, chunk_skipped = self._sync_commission_chunk_orm(
+                chunk_ids, rate_index, uom_rounding, currencies, rule_set,
+            )
+            created += chunk_created
+            updated += chunk_updated
+            skipped += chunk_skipped
+            self.env.invalidate_all()
+
+        # Delete commission lines whose invoice is no longer posted. Lines of
+        # deleted invoice lines are already gone through ondelete="cascade".
+        with profile_phase(self.env, "search"):
+            stale_lines = commission_line_model.search(existing_domain + [
+                ("invoice_line_id.move_id.state", "!=", "posted"),
+            ])
+        if stale_lines:
+            with profile_phase(self.env, "unlink") as stats:
+                stale_lines.unlink()
+                stats["rows"] = len(stale_lines)
+            _logger.info("Deleted %d invalid commission lines", len(stale_lines))
+        if updated:
+            _logger.info("Updated %d commission lines", updated)
+        if created:
+            _logger.info("Created %d new commission lines", created)
+        return {
+            "scanned": len(eligible_ids),
+            "skipped": skipped,
+            "created": created,
+            "updated": updated,
+            "deleted": len(stale_lines),
+        }
+
+    @api.model
+    def _sync_commission_chunk_orm(self, line_ids, rate_index, uom_rounding, currencies, rule_set=None):
+        """
+        Reconcile the commission lines of one chunk of eligible invoice lines.
+
+        :param uom_rounding: ``{uom id: rounding}`` cache shared across chunks
+        :param currencies: ``{currency id: res.currency}`` cache shared across chunks
+        :return: ``(created, updated, skipped)`` line counts, skipped lines
+            being those without a commission rate
+        """
+        commission_line_model = self.env["sales.commission.line"]
+        with profile_phase(self.env, "eligibility mapping") as stats:
+            line_rows = self.env["account.move.line"].browse(line_ids).read(
+                ["move_id", "product_id", "quantity", "price_subtotal", "product_uom_id"], load=None,
+            )
+            eligible_map = self._prepare_commission_vals(line_rows, rate_index, rule_set)
+            skipped = len(line_rows) - len(eligible_map)
+
+            missing_uom_ids = {row["product_uom_id"] for row in line_rows} - set(uom_rounding) - {False, None}
+            for uom in self.env["uom.uom"].browse(missing_uom_ids).read(["rounding"]):
+                uom_rounding[uom["id"]] = uom["rounding"]
+            line_uom = {row["id"]: row["product_uom_id"] for row in line_rows}
+            stats["rows"] = len(line_rows)
+
+        with profile_phase(self.env, "diff") as stats:
+            changes = self._diff_commission_lines(eligible_map, line_uom, uom_rounding, currencies)
+            stats["rows"] = len(changes)
+
+        with profile_phase(self.env, "write") as stats:
+            for line_id, updates in changes:
+                commission_line_model.browse(line_id).write(updates)
+            stats["rows"] = len(changes)
+
+        if eligible_map:
+            with profile_phase(self.env, "create") as stats:
+                commission_line_model.create(list(eligible_map.values()))
+                stats["rows"] = len(eligible_map)
+        return len(eligible_map), len(changes), skipped
+
+    @api.model
+    def _diff_commission_lines(self, eligible_map, line_uom, uom_rounding, currencies):
+        """
+        Compare the existing commission lines of ``eligible_map`` with their
+        expected values. Lines found are popped from ``eligible_map``, which
+        is left with the lines to create. Under the ``keep_paid`` rate change
+        policy, lines of paid invoices are expected at the rate they have.
+
+        :return: ``[(commission line id, {field: new value})]`` of lines that drifted
+        """
+        existing_rows = self.env["sales.commission.line"].search_read(
+            [("invoice_line_id", "in", list(eligible_map))],
+            [
+                "invoice_line_id", "salesperson_id", "invoice_id", "product_id", "quantity",
+                "commission_rate", "commission_amount", "line_subtotal", "company_id",
+                "company_currency_id", "payment_state",
+            ],
+            load=None,
+        )
+        keep_paid = self._get_rate_change_policy() == "keep_paid"
+
+        changes = []
+        for row in existing_rows:
+            line_vals = eligible_map.pop(row["invoice_line_id"], None)
+            if not line_vals:
+                continue
+            if keep_paid and row["payment_state"] in PAID_PAYMENT_STATES:
+                line_vals = dict(
+                    line_vals,
+                    commission_rate=row["commission_rate"],
+                    commission_amount=line_vals["commission_amount"] * row["commission_rate"] / line_vals["commission_rate"],
+                )
+
+            updates = {}
+            for fname in ("salesperson_id", "invoice_id", "product_id", "company_id"):
+                if row[fname] != line_vals[fname]:
+                    updates[fname] = line_vals[fname]
+            rounding = uom_rounding.get(line_uom[row["invoice_line_id"]])
+            if rounding:
+                qty_differs = float_compare(
+                    row["quantity"], line_vals["quantity"], precision_rounding=rounding,
+                )
+            else:
+                qty_differs = float_compare(
+                    row["quantity"], line_vals["quantity"], precision_digits=6,
+                )
+            if qty_differs:
+                updates["quantity"] = line_vals["quantity"]
+            if float_compare(row["commission_rate"], line_vals["commission_rate"], precision_digits=4):
+                updates["commission_rate"] = line_vals["commission_rate"]
+
+            currency_id = row["company_currency_id"]
+            if currency_id and currency_id not in currencies:
+                currencies[currency_id] = self.env["res.currency"].browse(currency_id)
+            currency = currencies.get(currency_id)
+            if currency and not currency.is_zero(row["commission_amount"] - line_vals["commission_amount"]):
+                updates["commission_amount"] = line_vals["commission_amount"]
+            if currency and not currency.is_zero(row["line_subtotal"] - line_vals["line_subtotal"]):
+                updates["line_subtotal"] = line_vals["line_subtotal"]
+
+            if updates:
+                changes.append((row["id"], updates))
+        return changes
+
+    @api.model
+    def _collect_summary_keys(self, rows, dirty_keys):
+        """
+        Add the summary keys of ``(salesperson, company, month, type, count)``
+        rows to ``dirty_keys`` and return the total count.
+        """
+        count = 0
+        for salesperson_id, company_id, month, move_type, key_count in rows:
+            if month:
+                dirty_keys.add((salesperson_id, company_id, month, move_type))
+            count += key_count
+        return count
+
+    @api.model
+    def _sync_commission_lines_sql(self, scope_domain=None):
+        """
+        Reconcile commission lines with invoice lines using set-based SQL.
+
+        Mirrors :meth:`_sync_commission_lines_orm`: the invoice lines in scope
+        and their rates are read once into a temporary table, then one DELETE
+        removes lines whose invoice is no longer posted, one UPDATE lines whose
+        values drifted and one INSERT adds eligible invoice lines without a
+        commission line. Each statement returns the monthly summary keys it
+        touched.
+
+        :param scope_domain: optional domain on ``account.move.line`` restricting
+            the invoice lines visited.
+        :return: see :meth:`_sync_commission_lines`
+        """
+        self.env.flush_all()
+        cr = self.env.cr
+        scope_sql, scope_params = "", []
+        if scope_domain is not None:
+            query = self.env["account.move.line"]._search(scope_domain)
+            subselect, scope_params = query.subselect()
+            scope_sql = "AND aml.id IN (%s)" % subselect
+            scope_params = list(scope_params)
+
+        with profile_phase(self.env, "eligibility mapping") as stats:
+            cr.execute("DROP TABLE IF EXISTS sales_commission_eligible")
+            cr.execute("""
+                CREATE TEMPORARY TABLE sales_commission_eligible AS
+                SELECT aml.id AS invoice_line_id,
+                       am.id AS invoice_id,
+                       COALESCE(am.invoice_user_id, %%s) AS salesperson_id,
+                       aml.product_id AS product_id,
+                       aml.quantity AS quantity,
+                       kept.commission_rate AS kept_rate,
+                       COALESCE(history.rate, pt.commission_rate, 0) AS product_rate,
+                       aml.price_subtotal AS line_subtotal,
+                       am.company_id AS company_id,
+                       am.invoice_date AS invoice_date,
+                       am.move_type AS move_type,
+                       rc.currency_id AS company_currency_id,
+                       am.state AS invoice_state,
+                       am.payment_state AS payment_state,
+                       cur.decimal_places,
+                       -- what commission rules match on
+                       am.invoice_user_id, am.team_id, pt.categ_id, am.commercial_partner_id
+                  FROM account_move_line aml
+                  JOIN account_move am ON am.id = aml.move_id
+                  JOIN product_product pp ON pp.id = aml.product_id
+                  JOIN product_template pt ON pt.id = pp.product_tmpl_id
+                  JOIN res_company rc ON rc.id = am.company_id
+                  JOIN res_currency cur ON cur.id = rc.currency_id
+                  -- rate of a paid line kept by the keep_paid rate change policy
+                  LEFT JOIN LATERAL (
+                      SELECT paid.commission_rate
+                        FROM sales_commission_line paid
+                       WHERE paid.invoice_line_id = aml.id
+                         AND paid.payment_state IN %%s
+                         AND %%s
+                       LIMIT 1
+                  ) kept ON TRUE
+                  %s
+                 WHERE am.state = 'posted'
+                   AND am.move_type IN ('out_invoice', 'out_refund')
+                   AND COALESCE(aml.display_type, '') NOT IN ('line_section', 'line_note')
+                   %s
+            """ % (rate_history_join("pt.id", "am.invoice_date"), scope_sql), [
+                self.env.uid, PAID_PAYMENT_STATES, self._get_rate_change_policy() == "keep_paid",
+            ] + scope_params)
+            cr.execute("ANALYZE sales_commission_eligible")
+            self._create_rule_band_table(self._get_commission_rule_set(), """
+                SELECT DISTINCT company_id, invoice_user_id, team_id, categ_id, commercial_partner_id
+                  FROM sales_commission_eligible
+            """, [])
+
+            rated_lines = """
+                SELECT e.*, COALESCE(band.rate, e.product_rate) AS line_rate
+                  FROM sales_commission_eligible e
+                  %s
+            """ % rule_band_join(
+                "e.company_id", "e.invoice_user_id", "e.team_id",
+                "e.categ_id", "e.commercial_partner_id", "e.line_subtotal",
+            )
+            cr.execute("SELECT count(*), count(*) FILTER (WHERE line_rate = 0) FROM (%s) rated" % rated_lines)
+            scanned, skipped = cr.fetchone()
+            stats["rows"] = scanned
+
+        eligible_cte = """
+            WITH eligible AS (
+                SELECT invoice_line_id, invoice_id, salesperson_id, product_id, quantity,
+                       COALESCE(kept_rate, line_rate) AS commission_rate,
+                       ROUND(
+                           line_subtotal * COALESCE(kept_rate, line_rate)::numeric / 100.0
+                           * CASE WHEN move_type = 'out_refund' THEN -1 ELSE 1 END,
+                           decimal_places
+                       ) AS commission_amount,
+                       line_subtotal, company_id, invoice_date, move_type, company_currency_id,
+                       invoice_state, payment_state
+                  FROM (%s) rated
+                 WHERE line_rate != 0
+            )
+        """ % rated_lines
+        dirty_keys = set()
+
+        # Commission lines of invoices that are no longer posted. Lines of
+        # deleted invoice lines are already gone through ondelete="cascade".
+        with profile_phase(self.env, "unlink") as stats:
+            cr.execute("""
+                WITH changed AS (
+                    DELETE FROM sales_commission_line scl
+                     USING account_move_line aml, account_move am
+                     WHERE aml.id = scl.invoice_line_id
+                       AND am.id = aml.move_id
+                       AND am.state != 'posted'
+                       %s
+                 RETURNING scl.salesperson_id, scl.company_id, scl.invoice_date, scl.move_type
+                )
+                SELECT salesperson_id, company_id, date_trunc('month', invoice_date)::date, move_type, count(*)
+                  FROM changed
+                 GROUP BY 1, 2, 3, 4
+            """ % scope_sql, scope_params)
+            deleted = self._collect_summary_keys(cr.fetchall(), dirty_keys)
+            stats["rows"] = deleted
+
+        with profile_phase(self.env, "write") as stats:
+            cr.execute(eligible_cte + """
+                , changed AS (
+                UPDATE sales_commission_line scl
+                   SET salesperson_id = e.salesperson_id,
+                       invoice_id = e.invoice_id,
+                       product_id = e.product_id,
+                       quantity = e.quantity,
+                       commission_rate = e.commission_rate,
+                       commission_amount = e.commission_amount,
+                       line_subtotal = e.line_subtotal,
+                       company_id = e.company_id,
+                       invoice_date = e.invoice_date,
+                       move_type = e.move_type,
+                       company_currency_id = e.company_currency_id,
+                       invoice_state = e.invoice_state,
+                       payment_state = e.payment_state,
+                       write_uid = %s,
+                       write_date = (now() at time zone 'UTC')
+                  FROM eligible e, sales_commission_line old
+                 WHERE scl.invoice_line_id = e.invoice_line_id
+                   AND old.id = scl.id
+                   AND (scl.salesperson_id, scl.invoice_id, scl.product_id, scl.quantity,
+                        scl.commission_rate, scl.commission_amount, scl.line_subtotal,
+                        scl.company_id, scl.invoice_date, scl.move_type, scl.company_currency_id,
+                        scl.invoice_state, scl.payment_state)
+                       IS DISTINCT FROM
+                       (e.salesperson_id, e.invoice_id, e.product_id, e.quantity,
+                        e.commission_rate, e.commission_amount, e.line_subtotal,
+                        e.company_id, e.invoice_date, e.move_type, e.company_currency_id,
+                        e.invoice_state, e.payment_state)
+             RETURNING old.salesperson_id AS old_salesperson_id, old.company_id AS old_company_id,
+                       old.invoice_date AS old_invoice_date, old.move_type AS old_move_type,
+                       scl.salesperson_id, scl.company_id, scl.invoice_date, scl.move_type
+                )
+                SELECT old_salesperson_id, old_company_id, date_trunc('month', old_invoice_date)::date,
+                       old_move_type, count(*)
+                  FROM changed
+                 GROUP BY 1, 2, 3, 4
+                 UNION ALL
+                SELECT salesperson_id, company_id, date_trunc('month', invoice_date)::date, move_type, 0
+                  FROM changed
+                 GROUP BY 1, 2, 3, 4
+            """, [self.env.uid])
+            updated = self._collect_summary_keys(cr.fetchall(), dirty_keys)
+            stats["rows"] = updated
+
+        with profile_phase(self.env, "create") as stats:
+            cr.execute(eligible_cte + """
+                , changed AS (
+                INSERT INTO sales_commission_line (
+                    salesperson_id, invoice_id, invoice_line_id, product_id, quantity,
+                    commission_rate, commission_amount, line_subtotal, company_id,
+                    invoice_date, move_type, company_currency_id, invoice_state, payment_state,
+                    create_uid, create_date, write_uid, write_date
+                )
+                SELECT e.salesperson_id, e.invoice_id, e.invoice_line_id, e.product_id, e.quantity,
+                       e.commission_rate, e.commission_amount, e.line_subtotal, e.company_id,
+                       e.invoice_date, e.move_type, e.company_currency_id, e.invoice_state, e.payment_state,
+                       %s, (now() at time zone 'UTC'), %s, (now() at time zone 'UTC')
+                  FROM eligible e
+                 WHERE NOT EXISTS (
+                       SELECT 1 FROM sales_commission_line scl
+                        WHERE scl.invoice_line_id = e.invoice_line_id
+                 )
+             RETURNING salesperson_id, company_id, invoice_date, move_type
+                )
+                SELECT salesperson_id, company_id, date_trunc('month', invoice_date)::date, move_type, count(*)
+                  FROM changed
+                 GROUP BY 1, 2, 3, 4
+            """, [self.env.uid, self.env.uid])
+            created = self._collect_summary_keys(cr.fetchall(), dirty_keys)
+            stats["rows"] = created
 
+        cr.execute("DROP TABLE sales_commission_eligible, sales_commission_rule_band")
+        self.env["sales.commission.line"].invalidate_model()
+        self.env["sales.commission.summary"]._mark_dirty(dirty_keys)
+        if deleted or updated or created:
+            self._bump_data_version()
+        _logger.info(
+            "SQL sync: deleted %d, updated %d, created %d commission lines",
+            deleted, updated, created,
+        )
+        return {
+            "scanned": scanned,
+            "skipped": skipped,
+            "created": created,
+            "updated": updated,
+            "deleted": deleted,
+        }
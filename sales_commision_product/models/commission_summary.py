@@ -0,0 +1,181 @@
+from odoo import api, fields, models
+from odoo.tools import date_utils
+import logging
+
+_logger = logging.getLogger(__name__)
+
+DIRTY_KEYS = "sales_commision_product.summary_dirty_keys"
+
+
+class CommissionSummary(models.Model):
+    _name = "sales.commission.summary"
+    _description = "Sales Commission Monthly Summary"
+    _order = "date desc, salesperson_id"
+    _log_access = False
+
+    salesperson_id = fields.Many2one(
+        comodel_name="res.users",
+        string="Salesperson",
+        required=True,
+        readonly=True,
+        index=True,
+    )
+    company_id = fields.Many2one(
+        comodel_name="res.company",
+        string="Company",
+        required=True,
+        readonly=True,
+    )
+    date = fields.Date(string="Month", required=True, readonly=True)
+    move_type = fields.Selection(
+        selection=[
+            ("out_invoice", "Customer Invoice"),
+            ("out_refund", "Customer Credit Note"),
+        ],
+        string="Type",
+        required=True,
+        readonly=True,
+    )
+    company_currency_id = fields.Many2one(
+        comodel_name="res.currency",
+        string="Company Currency",
+        related="company_id.currency_id",
+        readonly=True,
+    )
+    total_sales = fields.Monetary(string="Total Sales", currency_field="company_currency_id", readonly=True)
+    total_returns = fields.Monetary(string="Total Returns", currency_field="company_currency_id", readonly=True)
+    total_commission = fields.Monetary(
+        string="Total Commission", currency_field="company_currency_id", readonly=True,
+    )
+    line_count = fields.Integer(string="# Lines", readonly=True)
+
+    _sql_constraints = [
+        (
+            "unique_key",
+            "unique(salesperson_id, company_id, date, move_type)",
+            "Only one summary row per salesperson, company, month and type.",
+        ),
+    ]
+
+    @api.model
+    def _get_key(self, salesperson_id, company_id, invoice_date, move_type):
+        """Summary key of a commission line, ``None`` when it has no invoice date."""
+        if not invoice_date:
+            return None
+        return (salesperson_id, company_id, date_utils.start_of(invoice_date, "month"), move_type)
+
+    @api.model
+    def _mark_dirty(self, keys):
+        """
+        Record summary keys whose commission lines changed. They are refreshed
+        by :meth:`_refresh_dirty`, at the latest just before the transaction
+        commits.
+        """
+        keys = {key for key in keys if key}
+        if not keys:
+            return
+        precommit = self.env.cr.precommit
+        dirty = precommit.data.setdefault(DIRTY_KEYS, set())
+        if not dirty:
+            precommit.add(self._refresh_dirty)
+        dirty.update(keys)
+
+    @api.model
+    def _take_dirty(self):
+        """
+        Return the keys marked dirty in this transaction and forget them, for
+        the caller to refresh them in another transaction.
+        """
+        self.env.flush_all()
+        return self.env.cr.precommit.data.pop(DIRTY_KEYS, set())
+
+    @api.model
+    def _refresh_dirty(self):
+        """Recompute the summary rows of the keys marked dirty in this transaction."""
+        keys = self.env.cr.precommit.data.pop(DIRTY_KEYS, set())
+        if keys:
+            self._refresh(keys)
+
+    @api.model
+    def _refresh(self, keys):
+        """
+        Recompute the summary rows of ``keys`` from their commission lines.
+
+        Only the lines of the given salesperson/company/month/type keys are
+        aggregated, so the cost follows what changed, not the whole history.
+        """
+        self.env["sales.commission.line"].flush_model()
+        cr = self.env.cr
+        salesperson_ids, company_ids, months, move_types = zip(*keys)
+        key_params = [list(salesperson_ids), list(company_ids), list(months), list(move_types)]
+        keys_sql = """
+            SELECT * FROM unnest(%s::int[], %s::int[], %s::date[], %s::varchar[])
+                       AS k(salesperson_id, company_id, date, move_type)
+        """
+        cr.execute("""
+            WITH keys AS (%s),
+            totals AS (
+                SELECT l.salesperson_id, l.company_id,
+                       date_trunc('month', l.invoice_date)::date AS date, l.move_type,
+                       SUM(CASE WHEN l.move_type = 'out_refund' THEN 0 ELSE l.line_subtotal END) AS total_sales,
+                       SUM(CASE WHEN l.move_type = 'out_refund' THEN ABS(l.line_subtotal) ELSE 0 END) AS total_returns,
+                       SUM(l.commission_amount) AS total_commission,
+                       COUNT(*) AS line_count
+                  FROM sales_commission_line l
+                  JOIN keys k ON k.salesperson_id = l.salesperson_id
+                             AND k.company_id = l.company_id
+                             AND k.move_type = l.move_type
+                             AND l.invoice_date >= k.date
+                             AND l.invoice_date < k.date + interval '1 month'
+                 GROUP BY 1, 2, 3, 4
+            ),
+            upserted AS (
+                INSERT INTO sales_commission_summary (
+                    salesperson_id, company_id, date, move_type,
+                    total_sales, total_returns, total_commission, line_count
+                )
+                SELECT * FROM totals
+                ON CONFLICT (salesperson_id, company_id, date, move_type) DO UPDATE
+                   SET total_sales = EXCLUDED.total_sales,
+                       total_returns = EXCLUDED.total_returns,
+                       total_commission = EXCLUDED.total_commission,
+                       line_count = EXCLUDED.line_count
+            )
+            DELETE FROM sales_commission_summary s
+             USING keys k
+             WHERE s.salesperson_id = k.salesperson_id
+               AND s.company_id = k.company_id
+               AND s.date = k.date
+               AND s.move_type = k.move_type
+               AND NOT EXISTS (
+                   SELECT 1 FROM totals t
+                    WHERE t.salesperson_id = k.salesperson_id
+                      AND t.company_id = k.company_id
+                      AND t.date = k.date
+                      AND t.move_type = k.move_type
+               )
+        """ % keys_sql, key_params)
+        self.invalidate_model()
+        _logger.info("Refreshed %d commission summary keys", len(keys))
+
+    @api.model
+    def _rebuild(self):
+        """Recompute the whole summary table from the commission lines."""
+        self.env["sales.commission.line"].flush_model()
+        self.env.cr.precommit.data.pop(DIRTY_KEYS, None)
+        self.env.cr.execute("DELETE FROM sales_commission_summary")
+        self.env.cr.execute("""
+            INSERT INTO sales_commission_summary (
+                salesperson_id, company_id, date, move_type,
+                total_sales, total_returns, total_commission, line_count
+            )
+            SELECT salesperson_id, company_id, date_trunc('month', invoice_date)::date, move_type,
+                   SUM(CASE WHEN move_type = 'out_refund' THEN 0 ELSE line_subtotal END),
+                   SUM(CASE WHEN move_type = 'out_refund' THEN ABS(line_subtotal) ELSE 0 END),
+                   SUM(commission_amount),
+                   COUNT(*)
+              FROM sales_commission_line
+             WHERE invoice_date IS NOT NULL
+             GROUP BY 1, 2, 3, 4
+        """)
+        self.invalidate_model()
@@ -0,0 +1,108 @@
+from odoo import api, fields, models
+from datetime import timedelta
+
+SYNC_RUN_RETENTION_DAYS = 90
+
+
+class CommissionSyncRun(models.Model):
+    _name = "sales.commission.sync.run"
+    _description = "Sales Commission Sync Run"
+    _order = "id desc"
+    _rec_name = "start_date"
+
+    start_date = fields.Datetime(string="Started On", required=True, readonly=True)
+    end_date = fields.Datetime(string="Finished On", readonly=True)
+    duration = fields.Float(string="Duration (s)", digits=(16, 3), readonly=True)
+    user_id = fields.Many2one(
+        comodel_name="res.users",
+        string="User",
+        readonly=True,
+        default=lambda self: self.env.user,
+    )
+    mode = fields.Selection(
+        [
+            ("incremental", "Incremental"),
+            ("full", "Full Reconcile"),
+        ],
+        string="Mode",
+        readonly=True,
+    )
+    engine = fields.Selection(
+        [
+            ("orm", "ORM"),
+            ("sql", "SQL"),
+        ],
+        string="Engine",
+        readonly=True,
+    )
+    chunked = fields.Boolean(string="Chunked", readonly=True)
+    state = fields.Selection(
+        [
+            ("done", "Done"),
+            ("failed", "Failed"),
+        ],
+        string="Status",
+        required=True,
+        readonly=True,
+        default="done",
+    )
+    lines_scanned = fields.Integer(
+        string="Lines Scanned",
+        readonly=True,
+        help="Posted customer invoice product lines visited by the run.",
+    )
+    lines_skipped = fields.Integer(
+        string="Lines Skipped",
+        readonly=True,
+        help="Scanned lines whose product has no commission rate.",
+    )
+    lines_created = fields.Integer(string="Lines Created", readonly=True)
+    lines_updated = fields.Integer(string="Lines Updated", readonly=True)
+    lines_deleted = fields.Integer(string="Lines Deleted", readonly=True)
+    lines_per_second = fields.Float(
+        string="Lines per Second",
+        digits=(16, 1),
+        readonly=True,
+        help="Scanned lines divided by the duration of the run.",
+    )
+    error = fields.Text(string="Error", readonly=True)
+    profile_id = fields.Many2one(
+        comodel_name="sales.commission.profile",
+        string="Profiling Run",
+        readonly=True,
+        ondelete="set null",
+        help="Set when the run was profiled, see the sales_commision_product.profiling system parameter.",
+    )
+
+    @api.model
+    def _record(self, vals, counts, duration, profile_id=False, error=False):
+        """
+        Store a finished sync run.
+
+        :param vals: ``start_date``, ``mode``, ``engine`` and ``chunked`` of the run
+        :param counts: counts returned by the sync, see
+            ``sales.commission.service._sync_commission_lines``; may be
+            partial or empty when the run failed
+        """
+        scanned = counts.get("scanned", 0)
+        return self.sudo().create(dict(
+            vals,
+            end_date=fields.Datetime.now(),
+            duration=duration,
+            state="failed" if error else "done",
+            lines_scanned=scanned,
+            lines_skipped=counts.get("skipped", 0),
+            lines_created=counts.get("created", 0),
+            lines_updated=counts.get("updated", 0),
+            lines_deleted=counts.get("deleted", 0),
+            lines_per_second=scanned / duration if duration > 0 else 0.0,
+            error=error,
+            profile_id=profile_id,
+        ))
+
+    @api.autovacuum
+    def _gc_sync_runs(self):
+        """Remove sync runs older than SYNC_RUN_RETENTION_DAYS."""
+        self.search([
+            ("start_date", "<", fields.Datetime.now() - timedelta(days=SYNC_RUN_RETENTION_DAYS)),
+        ]).unlink()
@@ -1,5 +1,6 @@
 from odoo import fields, models, api
 from odoo.exceptions import ValidationError
+from odoo.tools import float_compare
 
 
 class ProductTemplate(models.Model):
@@ -11,6 +12,13 @@ class ProductTemplate(models.Model):
              "(e.g., 5.0 for 5%). This rate will be used to calculate "
              "commission on paid invoices.",
     )
+    commission_rate_ids = fields.One2many(
+        comodel_name="sales.commission.rate",
+        inverse_name="product_tmpl_id",
+        string="Commission Rate History",
+        help="Rates effective over given periods. Invoices dated outside "
+             "every period use the commission rate above.",
+    )
 
     @api.constrains('commission_rate')
     def _check_commission_rate(self):
@@ -21,3 +29,20 @@ class ProductTemplate(models.Model):
             if product.commission_rate > 100:
                 raise ValidationError("Commission rate cannot exceed 100%.")
 
+    def write(self, vals):
+        """Restate the commission lines of templates whose commission rate changes."""
+        if "commission_rate" not in vals:
+            return super().write(vals)
+        changed = self.filtered(
+            lambda template: float_compare(
+                template.commission_rate, vals["commission_rate"] or 0.0, precision_digits=4,
+            )
+        )
+        res = super().write(vals)
+        changed._commission_rate_changed()
+        return res
+
+    def _commission_rate_changed(self):
+        """Restate the commission lines of these templates at their effective rates."""
+        if self:
+            self.env["sales.commission.service"].sudo()._propagate_commission_rates(self)
@@ -0,0 +1,38 @@
+from bisect import bisect_right
+
+
+class RateIntervalIndex:
+    """
+    Commission rates of product variants by effective date.
+
+    The rate history intervals of each product are kept sorted by start
+    date, so the rate effective on a date is found by bisection in
+    O(log n). Dates outside every interval, and products without history,
+    fall back to the product's current rate.
+    """
+
+    def __init__(self, intervals, default_rates):
+        """
+        :param intervals: ``{product id: [(valid_from, valid_to, rate)]}`` of
+            non-overlapping intervals, ``valid_to`` being inclusive or
+            ``None`` when open-ended
+        :param default_rates: ``{product id: rate}`` used outside the intervals
+        """
+        self._starts = {}
+        self._intervals = {}
+        for product_id, product_intervals in intervals.items():
+            product_intervals = sorted(product_intervals, key=lambda interval: interval[0])
+            self._starts[product_id] = [interval[0] for interval in product_intervals]
+            self._intervals[product_id] = product_intervals
+        self._default_rates = default_rates
+
+    def get(self, product_id, date):
+        """Return the rate of ``product_id`` effective on ``date``, ``0.0`` when none."""
+        starts = self._starts.get(product_id)
+        if starts and date:
+            index = bisect_right(starts, date) - 1
+            if index >= 0:
+                dummy, valid_to, rate = self._intervals[product_id][index]
+                if not valid_to or date <= valid_to:
+                    return rate
+        return self._default_rates.get(product_id, 0.0)
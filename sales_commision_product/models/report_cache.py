@@ -0,0 +1,60 @@
+from collections import OrderedDict
+import threading
+import time
+
+
+class ReportDataCache:
+    """
+    Process-local LRU cache of commission report data.
+
+    Entries expire ``max_age`` seconds after they were stored, and the least
+    recently used entry is evicted once the cache holds ``max_size`` entries.
+    Values are stored and returned as is, without a copy, so they must be
+    small and never mutated by callers.
+    Keys are expected to embed the commission data version, so an entry is
+    never served after the underlying lines changed.
+    """
+
+    def __init__(self):
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, max_age):
+        """Return the value cached under ``key``, or ``None``."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() - entry[0] > max_age:
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key, value, max_size):
+        """Store ``value`` under ``key``, evicting the oldest entries."""
+        if max_size <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > max_size:
+                self._entries.popitem(last=False)
+
+    def stats(self):
+        """Return ``{"hits", "misses", "entries"}`` of this process."""
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries)}
+
+    def clear(self):
+        """Drop all entries and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+
+report_data_cache = ReportDataCache()
@@ -0,0 +1,17 @@
+from odoo import api, models
+
+
+class ReportCommissionFinancial(models.AbstractModel):
+    _name = "report.sales_commision_product.report_commission_financial_document"
+    _description = "Commission Financial Report"
+
+    @api.model
+    def _get_report_values(self, docids, data=None):
+        """Build each wizard's commission data once for the whole render."""
+        docs = self.env["wizard.commission.report"].browse(docids)
+        return {
+            "doc_ids": docids,
+            "doc_model": "wizard.commission.report",
+            "docs": docs,
+            "commission_data": {wizard.id: wizard._get_commission_data() for wizard in docs},
+        }
@@ -3,10 +3,50 @@ from odoo.exceptions import UserError
 from datetime import datetime
 import logging
 import base64
+import csv
+import io
+import tempfile
 from io import BytesIO
 
+from .commission_profile import profile_phase
+from .commission_service import DATA_VERSION_BUMPED
+from .report_cache import report_data_cache
+
 _logger = logging.getLogger(__name__)
 
+DETAIL_FIELDS = [
+    'salesperson_id', 'invoice_date', 'invoice_id', 'product_id', 'quantity',
+    'line_subtotal', 'commission_rate', 'commission_amount', 'move_type',
+]
+EXPORT_BATCH_SIZE = 2000
+REPORT_CACHE_SIZE = 128
+REPORT_CACHE_MAX_AGE = 3600
+# (column name, type) of the raw CSV/Parquet export, in query order
+EXPORT_COLUMNS = [
+    ('commission_line_id', 'int'),
+    ('invoice_date', 'date'),
+    ('salesperson_id', 'int'),
+    ('salesperson_name', 'str'),
+    ('invoice_id', 'int'),
+    ('invoice_number', 'str'),
+    ('invoice_line_id', 'int'),
+    ('product_id', 'int'),
+    ('product_code', 'str'),
+    ('product_name', 'str'),
+    ('quantity', 'float'),
+    ('line_subtotal', 'float'),
+    ('commission_rate', 'float'),
+    ('commission_amount', 'float'),
+    ('move_type', 'str'),
+    ('company_id', 'int'),
+    ('currency', 'str'),
+]
+STATUS_FILTER_SELECTION = [
+    ('paid', 'Paid Only'),
+    ('posted', 'Posted Only (Not Paid)'),
+    ('all', 'All Posted Invoices')
+]
+
 
 class WizardCommissionReport(models.TransientModel):
     _name = "wizard.commission.report"
@@ -28,11 +68,7 @@ class WizardCommissionReport(models.TransientModel):
         required=True,
         default=fields.Date.today
     )
-    status_filter = fields.Selection([
-        ('paid', 'Paid Only'),
-        ('posted', 'Posted Only (Not Paid)'),
-        ('all', 'All Posted Invoices')
-    ], string='Invoice Status', required=True, default='posted',
+    status_filter = fields.Selection(STATUS_FILTER_SELECTION, string='Invoice Status', required=True, default='posted',
         help="Paid: Only fully paid invoices (actual earnings)\n"
              "Posted Only: Posted but not paid (forecast earnings)\n"
              "All: Both paid and unpaid posted invoices")
@@ -44,93 +80,218 @@ class WizardCommissionReport(models.TransientModel):
             if wizard.date_from > wizard.date_to:
                 raise UserError("Date From cannot be later than Date To.")
 
-    def _get_commission_data(self):
-        """
-        Query commission data from sales.commission.line model.
-        Returns structured data grouped by salesperson.
-        
-        This method now queries from the sales.commission.line model (the same
-        data source as the Commission Report) instead of rebuilding from account.move,
-        ensuring data consistency and better performance.
-        """
+    def _get_commission_domain(self):
+        """Domain of the commission lines matching the wizard filters."""
         self.ensure_one()
-        
-        # Build domain for commission lines
         domain = [
             ('invoice_date', '>=', self.date_from),
             ('invoice_date', '<=', self.date_to),
         ]
         
-        # Status filter - check the related invoice's payment state
+        # Status filter - on the invoice payment state stored on the line
         if self.status_filter == 'paid':
-            domain.append(('invoice_id.payment_state', 'in', ['paid', 'in_payment']))
+            domain.append(('payment_state', 'in', ['paid', 'in_payment']))
         elif self.status_filter == 'posted':
-            domain.append(('invoice_id.payment_state', 'not in', ['paid', 'in_payment']))
+            domain.append(('payment_state', 'not in', ['paid', 'in_payment']))
         # 'all' doesn't need additional payment_state filter
         
         # Ensure invoice is still posted (in case it was cancelled after sync)
-        domain.append(('invoice_id.state', '=', 'posted'))
+        domain.append(('invoice_state', '=', 'posted'))
         
         # Salesperson filter
         if self.salesperson_ids:
             domain.append(('salesperson_id', 'in', self.salesperson_ids.ids))
-        
-        # Get commission lines ordered by salesperson and date
-        commission_lines = self.env['sales.commission.line'].search(
-            domain, 
-            order='salesperson_id, invoice_date'
+        return domain
+
+    def _get_commission_totals(self, domain):
+        """
+        Aggregate commission lines in the database.
+
+        Returns ``{salesperson_id: {'total_sales', 'total_returns',
+        'total_commission'}}`` computed with one grouped query, whatever the
+        number of lines.
+        """
+        commission_line_model = self.env['sales.commission.line']
+        subselect, params = commission_line_model._search(domain).subselect()
+        self.env.cr.execute("""
+            SELECT salesperson_id,
+                   SUM(CASE WHEN move_type = 'out_refund' THEN 0 ELSE line_subtotal END),
+                   SUM(CASE WHEN move_type = 'out_refund' THEN ABS(line_subtotal) ELSE 0 END),
+                   SUM(commission_amount)
+              FROM sales_commission_line
+             WHERE id IN (%s)
+             GROUP BY salesperson_id
+        """ % subselect, params)
+        return {
+            salesperson_id: {
+                'total_sales': total_sales or 0.0,
+                'total_returns': total_returns or 0.0,
+                'total_commission': total_commission or 0.0,
+            }
+            for salesperson_id, total_sales, total_returns, total_commission in self.env.cr.fetchall()
+        }
+
+    def _prepare_detail_lines(self, rows):
+        """Format commission line rows read with DETAIL_FIELDS for the reports."""
+        invoice_names = {
+            move['id']: move['name']
+            for move in self.env['account.move'].browse(
+                {row['invoice_id'][0] for row in rows}
+            ).read(['name'])
+        }
+        return [{
+            'invoice_date': row['invoice_date'],
+            'invoice_number': invoice_names[row['invoice_id'][0]],
+            'invoice_id': row['invoice_id'][0],
+            'product_name': row['product_id'][1],
+            'quantity': row['quantity'] or 0.0,
+            'line_subtotal': row['line_subtotal'],
+            'commission_rate': row['commission_rate'] or 0.0,
+            'commission_amount': row['commission_amount'],
+            'move_type': 'Invoice' if row['move_type'] == 'out_invoice' else 'Refund',
+        } for row in rows]
+
+    def _iter_commission_lines(self, salesperson, batch_size=EXPORT_BATCH_SIZE):
+        """
+        Yield the formatted detail lines of one salesperson in date order.
+
+        Lines are read ``batch_size`` at a time with keyset pagination on
+        (invoice_date, id) and the cache is dropped after each batch, so
+        memory stays flat however many lines match.
+        """
+        domain = self._get_commission_domain() + [('salesperson_id', '=', salesperson.id)]
+        page_domain = domain
+        while True:
+            with profile_phase(self.env, 'fetch') as stats:
+                rows = self.env['sales.commission.line'].search_read(
+                    page_domain, DETAIL_FIELDS, order='invoice_date, id', limit=batch_size,
+                )
+                stats['rows'] = len(rows)
+            if not rows:
+                return
+            yield from self._prepare_detail_lines(rows)
+            last = rows[-1]
+            page_domain = domain + [
+                '|',
+                ('invoice_date', '>', last['invoice_date']),
+                '&', ('invoice_date', '=', last['invoice_date']), ('id', '>', last['id']),
+            ]
+            self.env.invalidate_all()
+
+    def _get_report_cache_key(self):
+        """
+        Cache key of the report data: the wizard filters, the companies,
+        language and record rules of the user, and the commission data
+        version, so any change to the lines makes older entries unreachable.
+        """
+        self.ensure_one()
+        rule_domain = self.env['ir.rule']._compute_domain('sales.commission.line', 'read')
+        return (
+            self.env.cr.dbname,
+            self.env['sales.commission.service']._get_data_version(),
+            tuple(self.env.companies.ids),
+            self.env.lang,
+            str(rule_domain),
+            self.date_from,
+            self.date_to,
+            self.status_filter,
+            tuple(sorted(self.salesperson_ids.ids)),
         )
+
+    def _get_cached_commission_totals(self):
+        """
+        Return :meth:`_get_commission_totals` of the wizard filters, from the
+        report cache when the same report was computed since the commission
+        data last changed.
+
+        Only these totals are cached, a few numbers per salesperson, so
+        entries stay small and are served without a copy; detail lines are
+        read again for each report. The cache holds
+        ``sales_commision_product.report_cache_size`` entries (default 128,
+        0 disables it) for at most
+        ``sales_commision_product.report_cache_max_age`` seconds (default 3600).
+        """
+        self.ensure_one()
+        get_param = self.env['ir.config_parameter'].sudo().get_param
+        max_size = int(get_param('sales_commision_product.report_cache_size', REPORT_CACHE_SIZE))
+        max_age = int(get_param('sales_commision_product.report_cache_max_age', REPORT_CACHE_MAX_AGE))
+        if max_size <= 0 or self.env.cr.postcommit.data.get(DATA_VERSION_BUMPED):
+            # never cache data this transaction changed but has not committed
+            return self._get_commission_totals(self._get_commission_domain())
+
+        key = self._get_report_cache_key()
+        totals = report_data_cache.get(key, max_age)
+        if totals is None:
+            totals = self._get_commission_totals(self._get_commission_domain())
+            report_data_cache.put(key, totals, max_size)
+        return totals
+
+    def _get_commission_data(self):
+        """Return the report data grouped by salesperson, see :meth:`_compute_commission_data`."""
+        self.ensure_one()
+        return self._compute_commission_data()
+
+    def _compute_commission_data(self):
+        """
+        Query commission data from sales.commission.line model.
+        Returns structured data grouped by salesperson.
         
-        # Structure: {salesperson_id: {data}}
-        data_by_salesperson = {}
+        Totals are aggregated in the database or served from the report cache
+        (see _get_cached_commission_totals) and detail rows are fetched with a
+        single search_read of the printed columns, so no commission line
+        record is loaded in Python.
+        """
+        self.ensure_one()
+        with self.env['sales.commission.profile']._profile('report', 'Report data') as stats:
+            data = self._build_commission_data()
+            stats['rows'] = sum(len(sp_data['lines']) for sp_data in data)
+        return data
+
+    def _build_commission_data(self):
+        """Build the report data of _compute_commission_data, one profiled phase per step."""
+        domain = self._get_commission_domain()
+        commission_line_model = self.env['sales.commission.line']
+        
+        with profile_phase(self.env, 'totals'):
+            totals = self._get_cached_commission_totals()
+        if not totals:
+            return []
+        
+        # Get commission lines ordered by salesperson and date
+        with profile_phase(self.env, 'detail read') as stats:
+            rows = commission_line_model.search_read(
+                domain, DETAIL_FIELDS, order='salesperson_id, invoice_date',
+            )
+            stats['rows'] = len(rows)
         
-        for line in commission_lines:
-            salesperson = line.salesperson_id
-            if not salesperson:
-                continue
+        with profile_phase(self.env, 'format'):
+            salespersons = self.env['res.users'].browse(list(totals))
             
-            if salesperson.id not in data_by_salesperson:
-                data_by_salesperson[salesperson.id] = {
+            # Structure: {salesperson_id: {data}}
+            data_by_salesperson = {
+                salesperson.id: {
                     'salesperson': salesperson,
-                    'total_sales': 0.0,
-                    'total_returns': 0.0,
-                    'total_commission': 0.0,
-                    'lines': []
+                    **totals[salesperson.id],
+                    'lines': [],
                 }
+                for salesperson in salespersons
+            }
             
-            # Handle refunds (already negative in commission line)
-            if line.move_type == 'out_refund':
-                data_by_salesperson[salesperson.id]['total_returns'] += abs(line.line_subtotal)
-            else:
-                data_by_salesperson[salesperson.id]['total_sales'] += line.line_subtotal
-            
-            data_by_salesperson[salesperson.id]['total_commission'] += line.commission_amount
+            for row, line in zip(rows, self._prepare_detail_lines(rows)):
+                data_by_salesperson[row['salesperson_id'][0]]['lines'].append(line)
             
-            # Add line detail
-            data_by_salesperson[salesperson.id]['lines'].append({
-                'invoice_date': line.invoice_date,
-                'invoice_number': line.invoice_id.name,
-                'invoice_id': line.invoice_id.id,
-                'product_name': line.product_id.display_name,
-                'quantity': line.quantity or 0.0,
-                'line_subtotal': line.line_subtotal,
-                'commission_rate': line.commission_rate or 0.0,
-                'commission_amount': line.commission_amount,
-                'move_type': 'Invoice' if line.move_type == 'out_invoice' else 'Refund',
-            })
-        
-        # Return as list sorted by salesperson name (for QWeb compatibility)
-        # QWeb can't use lambda functions, so we pre-sort here
-        sorted_data = [
-            {
-                'salesperson_id': sp_id,
-                **data
-            }
-            for sp_id, data in sorted(
-                data_by_salesperson.items(),
-                key=lambda x: x[1]['salesperson'].name
-            )
-        ]
+            # Return as list sorted by salesperson name (for QWeb compatibility)
+            # QWeb can't use lambda functions, so we pre-sort here
+            sorted_data = [
+                {
+                    'salesperson_id': sp_id,
+                    **data
+                }
+                for sp_id, data in sorted(
+                    data_by_salesperson.items(),
+                    key=lambda x: x[1]['salesperson'].name
+                )
+            ]
         
         return sorted_data
 
@@ -294,15 +455,289 @@ class WizardCommissionReport(models.TransientModel):
             'target': 'self',
         }
 
+    def action_print_excel_streaming(self):
+        """Generate the Excel report for large periods and return it as download."""
+        self.ensure_one()
+        with self.env['sales.commission.profile']._profile('export', "Excel export"):
+            content = self._render_excel_streaming()
+        return self._download_attachment(
+            f"Commission_Report_{self.date_from}_{self.date_to}.xlsx",
+            content,
+            'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+        )
+
+    def _render_excel_streaming(self):
+        """
+        Render the Excel report for large periods and return the file content.
+
+        Rows are streamed from _iter_commission_lines into an xlsxwriter
+        workbook in constant_memory mode, which flushes each row to disk once
+        written. Column widths are tracked while rows stream and applied when
+        the workbook is closed.
+        """
+        self.ensure_one()
+        
+        try:
+            import xlsxwriter
+        except ImportError:
+            raise UserError("The 'xlsxwriter' Python library is required for Excel export. "
+                          "Please install it or contact your administrator.")
+        
+        totals = self._get_cached_commission_totals()
+        if not totals:
+            raise UserError("No commission data found for the selected filters.")
+        salespersons = self.env['res.users'].browse(list(totals)).sorted('name')
+        
+        with tempfile.TemporaryFile() as output:
+            wb = xlsxwriter.Workbook(output, {'constant_memory': True, 'tmpdir': tempfile.gettempdir()})
+            header_format = wb.add_format({
+                'bold': True, 'font_color': '#FFFFFF', 'bg_color': '#4472C4', 'align': 'center',
+            })
+            bold_format = wb.add_format({'bold': True})
+            number_format = wb.add_format({'num_format': '#,##0.00'})
+            bold_number_format = wb.add_format({'num_format': '#,##0.00', 'bold': True})
+            date_format = wb.add_format({'num_format': 'yyyy-mm-dd'})
+            rate_format = wb.add_format({'num_format': '0.00"%"'})
+            
+            # Summary sheet
+            ws_summary = wb.add_worksheet('Summary')
+            headers_summary = ['Salesperson', 'Total Sales', 'Total Returns', 'Net Sales', 'Total Commission']
+            summary_widths = [len(header) for header in headers_summary]
+            ws_summary.write_row(0, 0, headers_summary, header_format)
+            
+            grand = [0.0, 0.0, 0.0]
+            row_num = 1
+            for salesperson in salespersons:
+                sp_totals = totals[salesperson.id]
+                values = [
+                    sp_totals['total_sales'],
+                    sp_totals['total_returns'],
+                    sp_totals['total_sales'] - sp_totals['total_returns'],
+                    sp_totals['total_commission'],
+                ]
+                ws_summary.write(row_num, 0, salesperson.name)
+                ws_summary.write_row(row_num, 1, values, number_format)
+                for col, value in enumerate([salesperson.name] + values):
+                    summary_widths[col] = max(summary_widths[col], len(str(value)))
+                grand[0] += sp_totals['total_sales']
+                grand[1] += sp_totals['total_returns']
+                grand[2] += sp_totals['total_commission']
+                row_num += 1
+            
+            ws_summary.write(row_num, 0, 'GRAND TOTAL', bold_format)
+            ws_summary.write_row(
+                row_num, 1, [grand[0], grand[1], grand[0] - grand[1], grand[2]], bold_number_format,
+            )
+            for col, width in enumerate(summary_widths):
+                ws_summary.set_column(col, col, width + 2)
+            
+            # Detailed Lines sheet
+            ws_detail = wb.add_worksheet('Detailed Lines')
+            headers_detail = ['Date', 'Salesperson', 'Invoice', 'Product', 'Quantity',
+                              'Subtotal', 'Commission Rate', 'Commission', 'Type']
+            detail_widths = [len(header) for header in headers_detail]
+            ws_detail.write_row(0, 0, headers_detail, header_format)
+            
+            row_num = 1
+            for salesperson in salespersons:
+                for line in self._iter_commission_lines(salesperson):
+                    values = [
+                        line['invoice_date'], salesperson.name, line['invoice_number'],
+                        line['product_name'], line['quantity'], line['line_subtotal'],
+                        line['commission_rate'], line['commission_amount'], line['move_type'],
+                    ]
+                    ws_detail.write_datetime(row_num, 0, line['invoice_date'], date_format)
+                    ws_detail.write_row(row_num, 1, values[1:4])
+                    ws_detail.write_number(row_num, 4, values[4], number_format)
+                    ws_detail.write_number(row_num, 5, values[5], number_format)
+                    ws_detail.write_number(row_num, 6, values[6], rate_format)
+                    ws_detail.write_number(row_num, 7, values[7], number_format)
+                    ws_detail.write(row_num, 8, values[8])
+                    for col, value in enumerate(values):
+                        detail_widths[col] = max(detail_widths[col], len(str(value)))
+                    row_num += 1
+            for col, width in enumerate(detail_widths):
+                ws_detail.set_column(col, col, min(width + 2, 50))
+            
+            wb.close()
+            output.seek(0)
+            return output.read()
+
+    def _download_attachment(self, filename, content, mimetype):
+        """Store ``content`` as an attachment of the wizard and return its download action."""
+        attachment = self.env['ir.attachment'].create({
+            'name': filename,
+            'type': 'binary',
+            'raw': content,
+            'res_model': self._name,
+            'res_id': self.id,
+            'mimetype': mimetype,
+        })
+        return {
+            'type': 'ir.actions.act_url',
+            'url': f'/web/content/{attachment.id}?download=true',
+            'target': 'self',
+        }
+
+    def _iter_export_batches(self, batch_size=EXPORT_BATCH_SIZE):
+        """
+        Yield raw commission rows matching the wizard filters as lists of
+        tuples ordered like EXPORT_COLUMNS, ``batch_size`` rows at a time.
+
+        Rows are fetched through a server-side cursor (DECLARE/FETCH), so no
+        ORM record is created and memory stays flat for tens of millions of
+        rows. Record rules apply through the _search subquery.
+        """
+        self.ensure_one()
+        cr = self.env.cr
+        subselect, params = self.env['sales.commission.line']._search(
+            self._get_commission_domain()
+        ).subselect()
+        lang = self.env.lang or 'en_US'
+        cr.execute("""
+            DECLARE commission_export NO SCROLL CURSOR FOR
+            SELECT scl.id, scl.invoice_date, scl.salesperson_id, partner.name,
+                   scl.invoice_id, am.name, scl.invoice_line_id, scl.product_id,
+                   pp.default_code, COALESCE(pt.name->>%%s, pt.name->>'en_US'),
+                   scl.quantity, scl.line_subtotal, scl.commission_rate, scl.commission_amount,
+                   scl.move_type, scl.company_id, currency.name
+              FROM sales_commission_line scl
+              JOIN res_users users ON users.id = scl.salesperson_id
+              JOIN res_partner partner ON partner.id = users.partner_id
+              JOIN account_move am ON am.id = scl.invoice_id
+              JOIN product_product pp ON pp.id = scl.product_id
+              JOIN product_template pt ON pt.id = pp.product_tmpl_id
+              LEFT JOIN res_currency currency ON currency.id = scl.company_currency_id
+             WHERE scl.id IN (%s)
+             ORDER BY scl.salesperson_id, scl.invoice_date, scl.id
+        """ % subselect, [lang] + list(params))
+        try:
+            while True:
+                with profile_phase(self.env, 'fetch') as stats:
+                    cr.execute("FETCH FORWARD %s FROM commission_export", [batch_size])
+                    rows = cr.fetchall()
+                    stats['rows'] = len(rows)
+                if not rows:
+                    return
+                yield rows
+        finally:
+            cr.execute("CLOSE commission_export")
+
+    def _write_export_csv(self, fileobj):
+        """
+        Write the filtered commission rows as UTF-8 CSV to a binary file.
+
+        :return: number of rows written
+        """
+        text = io.TextIOWrapper(fileobj, encoding='utf-8', newline='')
+        writer = csv.writer(text)
+        writer.writerow([name for name, dummy in EXPORT_COLUMNS])
+        count = 0
+        for rows in self._iter_export_batches():
+            writer.writerows(rows)
+            count += len(rows)
+        text.flush()
+        text.detach()
+        return count
+
+    def _write_export_parquet(self, fileobj):
+        """
+        Write the filtered commission rows as a Parquet file, one row group per batch.
+
+        :return: number of rows written
+        """
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            raise UserError("The 'pyarrow' Python library is required for Parquet export. "
+                          "Please install it or contact your administrator.")
+        types = {
+            'int': pyarrow.int64(),
+            'date': pyarrow.date32(),
+            'str': pyarrow.string(),
+            'float': pyarrow.float64(),
+        }
+        schema = pyarrow.schema([(name, types[kind]) for name, kind in EXPORT_COLUMNS])
+        count = 0
+        with pyarrow.parquet.ParquetWriter(fileobj, schema) as writer:
+            for rows in self._iter_export_batches():
+                columns = list(zip(*rows))
+                writer.write_batch(pyarrow.record_batch(
+                    [pyarrow.array(column, type=field.type) for column, field in zip(columns, schema)],
+                    schema=schema,
+                ))
+                count += len(rows)
+        return count
+
+    def _export_commission_lines(self, file_format):
+        """Export the filtered commission rows in ``file_format`` (csv or parquet)."""
+        self.ensure_one()
+        if not self._has_commission_data():
+            raise UserError("No commission data found for the selected filters.")
+        writers = {
+            'csv': (self._write_export_csv, 'text/csv'),
+            'parquet': (self._write_export_parquet, 'application/vnd.apache.parquet'),
+        }
+        write, mimetype = writers[file_format]
+        with self.env['sales.commission.profile']._profile('export', f"{file_format.upper()} export") as stats:
+            with tempfile.TemporaryFile() as output:
+                stats['rows'] = write(output)
+                output.seek(0)
+                content = output.read()
+        return self._download_attachment(
+            f"Commission_Lines_{self.date_from}_{self.date_to}.{file_format}", content, mimetype,
+        )
+
+    def action_export_csv(self):
+        """Export raw commission lines to CSV for payroll and BI pipelines."""
+        return self._export_commission_lines('csv')
+
+    def action_export_parquet(self):
+        """Export raw commission lines to Parquet for payroll and BI pipelines."""
+        return self._export_commission_lines('parquet')
+
+    def _has_commission_data(self):
+        """Cheap emptiness check: fetch at most one matching commission line."""
+        self.ensure_one()
+        return bool(self.env['sales.commission.line'].search(self._get_commission_domain(), limit=1))
+
     def action_print_pdf(self):
         """Generate PDF report."""
         self.ensure_one()
         
         # Validate that we have data before generating report
-        data = self._get_commission_data()
-        
-        if not data:
+        if not self._has_commission_data():
             raise UserError("No commission data found for the selected filters.")
         
-        # Generate report - the QWeb template will call _get_commission_data() during rendering
+        # Generate report - the report model builds the data once per render
         return self.env.ref('sales_commision_product.action_report_commission_financial').report_action(self)
+
+    def _get_data_fingerprint(self):
+        """
+        Fingerprint of the commission lines matching the wizard filters.
+
+        Built from aggregates that change whenever a line is added, removed,
+        rewritten by the sync or moves in or out of the status filter, so two
+        renders with the same fingerprint print the same figures.
+        """
+        self.ensure_one()
+        subselect, params = self.env['sales.commission.line']._search(
+            self._get_commission_domain()
+        ).subselect()
+        self.env.cr.execute("""
+            SELECT count(*), max(write_date), sum(id), sum(commission_amount)
+              FROM sales_commission_line
+             WHERE id IN (%s)
+        """ % subselect, params)
+        return '/'.join(str(value) for value in self.env.cr.fetchone())
+
+    def action_generate_pdf_background(self):
+        """Queue the PDF report for background generation."""
+        self.ensure_one()
+        return self.env['sales.commission.report.job']._request(self, 'pdf')
+
+    def action_generate_excel_background(self):
+        """Queue the Excel report for background generation."""
+        self.ensure_one()
+        return self.env['sales.commission.report.job']._request(self, 'xlsx')
@@ -13,21 +13,36 @@ class WizardCommissionSync(models.TransientModel):
         string="Message",
         readonly=True,
     )
+    full_reconcile = fields.Boolean(
+        string="Full Reconcile",
+        help="Rescan every posted invoice line instead of only the lines "
+             "created or changed since the last sync.",
+    )
+    sync_run_id = fields.Many2one(
+        comodel_name="sales.commission.sync.run",
+        string="Sync Run",
+        readonly=True,
+    )
 
     def action_run_sync(self):
         """Run the commission sync and display results."""
         self.ensure_one()
         try:
             service = self.env["sales.commission.service"]
-            result = service.run_commission_sync()
+            run = self.sync_run_id = service._run_commission_sync(incremental=not self.full_reconcile)
             
-            if result:
-                # Count commission lines for feedback
-                commission_count = self.env["sales.commission.line"].search_count([])
+            if run.state == "done":
+                run_summary = f"""
+                    <p>Invoice lines scanned: <strong>{run.lines_scanned}</strong>
+                       ({run.lines_skipped} without commission rate) in {run.duration:.1f}s</p>
+                    <p>Commission lines created: <strong>{run.lines_created}</strong>,
+                       updated: <strong>{run.lines_updated}</strong>,
+                       deleted: <strong>{run.lines_deleted}</strong></p>
+                """
                 self.message = f"""
                     <div class="alert alert-success" role="alert">
                         <h4>✅ Commission Sync Completed Successfully!</h4>
-                        <p>Total commission lines in database: <strong>{commission_count}</strong></p>
+                        {run_summary}
                         <p>The commission data has been synchronized. You can now view the updated report.</p>
                     </div>
                 """
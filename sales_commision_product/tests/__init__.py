@@ -4,3 +4,11 @@ from . import test_product
 from . import test_commission_service
 from . import test_wizard_commission_sync
 from . import test_wizard_commission_report
+from . import test_account_move
+from . import test_commission_queue
+from . import test_commission_summary
+from . import test_commission_report_job
+from . import test_commission_profile
+from . import test_commission_sync_run
+from . import test_commission_rate
+from . import test_commission_rule
@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+from odoo.tests.common import TransactionCase
+from odoo import fields
+
+
+class TestAccountMove(TransactionCase):
+    """Test cases for event-driven commission updates on invoices."""
+
+    def setUp(self):
+        super(TestAccountMove, self).setUp()
+        self.CommissionLine = self.env['sales.commission.line']
+        self.CommissionQueue = self.env['sales.commission.queue']
+        self.AccountMove = self.env['account.move']
+
+        company = self.env.company
+
+        self.receivable_account = self.env['account.account'].create({
+            'name': 'Test Receivable',
+            'code': 'TREC005',
+            'account_type': 'asset_receivable',
+            'reconcile': True,
+            'company_id': company.id,
+        })
+        self.income_account = self.env['account.account'].create({
+            'name': 'Test Income',
+            'code': 'TINC005',
+            'account_type': 'income',
+            'company_id': company.id,
+        })
+        self.journal = self.env['account.journal'].create({
+            'name': 'Test Sale Journal',
+            'code': 'TSJ5',
+            'type': 'sale',
+            'company_id': company.id,
+            'default_account_id': self.income_account.id,
+        })
+        self.partner = self.env['res.partner'].create({
+            'name': 'Test Customer Events',
+            'property_account_receivable_id': self.receivable_account.id,
+            'property_payment_term_id': False,
+        })
+        self.salesperson = self.env['res.users'].create({
+            'name': 'Test Salesperson Events',
+            'login': 'test_salesperson_events',
+            'email': 'salesperson_events@test.com',
+        })
+        self.product = self.env['product.product'].create({
+            'name': 'Product with Commission Events',
+            'type': 'consu',
+            'commission_rate': 10.0,
+            'list_price': 100.0,
+            'property_account_income_id': self.income_account.id,
+        })
+
+    def test_post_queues_commission_recompute(self):
+        """Test that posting an invoice queues it and the queue creates its commission line."""
+        invoice = self._create_invoice()
+        invoice.action_post()
+        self.assertFalse(self.CommissionLine.search([('invoice_id', '=', invoice.id)]))
+        self.assertTrue(self.CommissionQueue.search([('move_id', '=', invoice.id)]))
+
+        self.CommissionQueue._process_queue()
+
+        commission = self.CommissionLine.search([('invoice_id', '=', invoice.id)])
+        self.assertEqual(len(commission), 1)
+        self.assertAlmostEqual(commission.commission_amount, 10.0, places=2)
+        self.assertFalse(self.CommissionQueue.search([('move_id', '=', invoice.id)]))
+
+    def test_reset_to_draft_and_cancel_remove_commission(self):
+        """Test that resetting to draft and cancelling removes the commission line."""
+        invoice = self._create_invoice()
+        invoice.action_post()
+        self.CommissionQueue._process_queue()
+        self.assertTrue(self.CommissionLine.search([('invoice_id', '=', invoice.id)]))
+
+        invoice.button_draft()
+        invoice.button_cancel()
+        self.CommissionQueue._process_queue()
+        self.assertFalse(self.CommissionLine.search([('invoice_id', '=', invoice.id)]))
+
+    def test_payment_state_change_queues_invoice(self):
+        """Test that a payment state change queues only the affected invoice."""
+        invoice = self._create_invoice()
+        other_invoice = self._create_invoice()
+        (invoice | other_invoice).action_post()
+        self.CommissionQueue._process_queue()
+
+        invoice.write({'payment_state': 'paid'})
+        self.assertEqual(self.CommissionQueue.search([]).move_id, invoice)
+
+    def _create_invoice(self):
+        """Helper method to create a draft invoice."""
+        return self.AccountMove.create({
+            'partner_id': self.partner.id,
+            'invoice_user_id': self.salesperson.id,
+            'move_type': 'out_invoice',
+            'invoice_date': fields.Date.today(),
+            'journal_id': self.journal.id,
+            'invoice_payment_term_id': False,
+            'invoice_line_ids': [(0, 0, {
+                'product_id': self.product.id,
+                'quantity': 1.0,
+                'price_unit': 100.0,
+                'account_id': self.income_account.id,
+            })],
+        })
@@ -1,8 +1,11 @@
 # -*- coding: utf-8 -*-
 from odoo.tests.common import TransactionCase
 from odoo import fields
+from odoo.tools import sql
 from datetime import datetime, timedelta
 
+from odoo.addons.sales_commision_product.models.commission import COMMISSION_LINE_INDEXES
+
 
 class TestCommission(TransactionCase):
     """Test cases for sales commission line model."""
@@ -168,6 +171,38 @@ class TestCommission(TransactionCase):
         self.assertIn(self.salesperson.name, name)
         self.assertIn(self.product.name, name)
 
+    def test_commission_line_name_get_batched(self):
+        """Test that naming many lines takes as many queries as naming one."""
+        commissions = self.CommissionLine
+        for invoice in self._create_invoice() | self._create_invoice() | self._create_invoice():
+            commissions |= self.CommissionLine.create({
+                'invoice_id': invoice.id,
+                'invoice_line_id': invoice.invoice_line_ids[0].id,
+                'invoice_date': invoice.invoice_date,
+                'salesperson_id': self.salesperson.id,
+                'product_id': self.product.id,
+                'quantity': 1.0,
+                'line_subtotal': 100.0,
+                'commission_rate': 10.0,
+                'commission_amount': 10.0,
+                'move_type': 'out_invoice',
+            })
+        self.env.flush_all()
+        commissions.name_get()
+
+        def count_queries(records):
+            self.env.invalidate_all()
+            queries = self.env.cr.sql_log_count
+            names = records.name_get()
+            return self.env.cr.sql_log_count - queries, names
+
+        single_queries, dummy = count_queries(commissions[0])
+        batch_queries, names = count_queries(commissions)
+        self.assertEqual(batch_queries, single_queries)
+        self.assertEqual([commission_id for commission_id, dummy in names], commissions.ids)
+        for commission, (dummy, name) in zip(commissions, names):
+            self.assertEqual(name, f"{self.salesperson.name} - {self.product.name} - {commission.invoice_id.name}")
+
     def test_commission_line_refund_negative_amount(self):
         """Test that refund commission lines have negative amounts."""
         invoice = self._create_invoice(move_type='out_refund')
@@ -235,6 +270,33 @@ class TestCommission(TransactionCase):
         self.assertEqual(commission.commission_rate, 15.0)
         self.assertNotEqual(commission.commission_rate, self.product.product_tmpl_id.commission_rate)
 
+    def test_commission_line_batch_create_sets_rates(self):
+        """Test that a batch create sets missing rates per product and keeps explicit ones."""
+        other_product = self.Product.create({
+            'name': 'Test Product with Other Commission',
+            'type': 'consu',
+            'commission_rate': 5.0,
+            'property_account_income_id': self.income_account.id,
+        })
+        invoices = self._create_invoice() | self._create_invoice() | self._create_invoice()
+        products = [self.product, other_product, other_product]
+        vals_list = [{
+            'invoice_id': invoice.id,
+            'invoice_line_id': invoice.invoice_line_ids[0].id,
+            'invoice_date': invoice.invoice_date,
+            'salesperson_id': self.salesperson.id,
+            'product_id': product.id,
+            'quantity': 1.0,
+            'line_subtotal': 100.0,
+            'commission_amount': 10.0,
+            'move_type': 'out_invoice',
+        } for invoice, product in zip(invoices, products)]
+        vals_list[2]['commission_rate'] = 15.0
+
+        commissions = self.CommissionLine.create(vals_list)
+
+        self.assertEqual(commissions.mapped('commission_rate'), [10.0, 5.0, 15.0])
+
     def test_commission_line_unique_constraint(self):
         """Test that unique constraint prevents duplicate commission lines."""
         invoice = self._create_invoice()
@@ -269,6 +331,38 @@ class TestCommission(TransactionCase):
                 'move_type': 'out_invoice',
             })
 
+    def test_commission_line_tracks_invoice_payment_state(self):
+        """Test that the stored invoice and payment states follow the invoice."""
+        invoice = self._create_invoice()
+        invoice.action_post()
+        self.env['sales.commission.service'].run_commission_sync(engine='sql')
+        commission = self.CommissionLine.search([('invoice_id', '=', invoice.id)])
+        self.assertEqual(commission.invoice_state, 'posted')
+        self.assertEqual(commission.payment_state, 'not_paid')
+        
+        self.env['account.payment.register'].with_context(
+            active_model='account.move',
+            active_ids=invoice.ids,
+        ).create({
+            'payment_date': invoice.invoice_date,
+        }).action_create_payments()
+        self.assertIn(commission.payment_state, ['paid', 'in_payment'])
+        self.assertEqual(
+            self.CommissionLine.search([
+                ('invoice_id', '=', invoice.id),
+                ('payment_state', 'in', ['paid', 'in_payment']),
+            ]),
+            commission,
+        )
+        
+        invoice.button_draft()
+        self.assertEqual(commission.invoice_state, 'draft')
+
+    def test_commission_line_report_indexes(self):
+        """Test that the report access path indexes exist."""
+        for suffix, dummy, dummy in COMMISSION_LINE_INDEXES:
+            self.assertTrue(sql.index_exists(self.env.cr, f'sales_commission_line_{suffix}'), suffix)
+
     def _create_invoice(self, move_type='out_invoice', invoice_date=None):
         """Helper method to create a test invoice."""
         if invoice_date is None:
@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+from odoo.tests.common import TransactionCase
+from odoo import fields
+
+
+class TestCommissionProfile(TransactionCase):
+    """Test cases for the opt-in profiling of syncs, reports and exports."""
+
+    def setUp(self):
+        super(TestCommissionProfile, self).setUp()
+        self.Profile = self.env['sales.commission.profile']
+        self.Service = self.env['sales.commission.service']
+        self.AccountMove = self.env['account.move']
+
+        company = self.env.company
+
+        self.receivable_account = self.env['account.account'].create({
+            'name': 'Test Receivable',
+            'code': 'TREC008',
+            'account_type': 'asset_receivable',
+            'reconcile': True,
+            'company_id': company.id,
+        })
+        self.income_account = self.env['account.account'].create({
+            'name': 'Test Income',
+            'code': 'TINC008',
+            'account_type': 'income',
+            'company_id': company.id,
+        })
+        self.journal = self.env['account.journal'].create({
+            'name': 'Test Sale Journal',
+            'code': 'TSJ8',
+            'type': 'sale',
+            'company_id': company.id,
+            'default_account_id': self.income_account.id,
+        })
+        self.partner = self.env['res.partner'].create({
+            'name': 'Test Customer Profile',
+            'property_account_receivable_id': self.receivable_account.id,
+            'property_payment_term_id': False,
+        })
+        self.salesperson = self.env['res.users'].create({
+            'name': 'Test Salesperson Profile',
+            'login': 'test_salesperson_profile',
+            'email': 'salesperson_profile@test.com',
+        })
+        self.product = self.env['product.product'].create({
+            'name': 'Product with Commission Profile',
+            'type': 'consu',
+            'commission_rate': 10.0,
+            'list_price': 100.0,
+            'property_account_income_id': self.income_account.id,
+        })
+        self.today = fields.Date.today()
+        self._create_and_post_invoice(100.0)
+        self._create_and_post_invoice(50.0)
+
+    def _enable_profiling(self, engine='orm'):
+        icp = self.env['ir.config_parameter'].sudo()
+        icp.set_param('sales_commision_product.profiling', '1')
+        icp.set_param('sales_commision_product.sync_engine', engine)
+
+    def test_profiling_disabled_by_default(self):
+        """Test that nothing is recorded unless profiling is enabled."""
+        self.Service.run_commission_sync()
+        self.assertFalse(self.Profile.search([]))
+
+    def test_sync_profile_phases(self):
+        """Test that a profiled sync records its phases, queries and rows for both engines."""
+        for engine in ('orm', 'sql'):
+            with self.subTest(engine=engine):
+                self.env['sales.commission.line'].search([]).unlink()
+                self._enable_profiling(engine)
+                self.Service.run_commission_sync(engine=engine)
+
+                profile = self.Profile.search([('operation', '=', 'sync')], limit=1)
+                self.assertIn(engine, profile.name)
+                self.assertEqual(profile.user_id, self.env.user)
+                self.assertGreater(profile.query_count, 0)
+                self.assertGreaterEqual(profile.row_count, 2)
+                phases = {phase.name: phase for phase in profile.phase_ids}
+                self.assertIn('create', phases)
+                self.assertIn('summary', phases)
+                self.assertEqual(phases['create'].row_count, 2)
+                self.assertLessEqual(sum(profile.phase_ids.mapped('query_count')), profile.query_count)
+
+    def test_report_profile(self):
+        """Test that report data and CSV exports are profiled."""
+        self.Service.run_commission_sync()
+        self._enable_profiling()
+        wizard = self.env['wizard.commission.report'].create({
+            'date_from': self.today,
+            'date_to': self.today,
+            'status_filter': 'all',
+            'salesperson_ids': [(6, 0, [self.salesperson.id])],
+        })
+
+        wizard._compute_commission_data()
+        profile = self.Profile.search([('operation', '=', 'report')], limit=1)
+        self.assertEqual(profile.row_count, 2)
+        self.assertEqual(profile.phase_ids.mapped('name'), ['totals', 'detail read', 'format'])
+
+        wizard.action_export_csv()
+        profile = self.Profile.search([('operation', '=', 'export')], limit=1)
+        self.assertEqual(profile.row_count, 2)
+        self.assertIn('fetch', profile.phase_ids.mapped('name'))
+
+    def _create_and_post_invoice(self, price_unit):
+        """Helper method to create and post a customer invoice."""
+        invoice = self.AccountMove.create({
+            'partner_id': self.partner.id,
+            'invoice_user_id': self.salesperson.id,
+            'move_type': 'out_invoice',
+            'invoice_date': self.today,
+            'journal_id': self.journal.id,
+            'invoice_payment_term_id': False,
+            'invoice_line_ids': [(0, 0, {
+                'product_id': self.product.id,
+                'quantity': 1.0,
+                'price_unit': price_unit,
+                'account_id': self.income_account.id,
+            })],
+        })
+        invoice.action_post()
+        return invoice
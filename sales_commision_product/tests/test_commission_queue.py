@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+from odoo.tests.common import TransactionCase
+from odoo import fields
+from odoo.tools import mute_logger
+from unittest.mock import patch
+
+from odoo.addons.sales_commision_product.models.commission_queue import QUEUE_MAX_ATTEMPTS
+
+
+class TestCommissionQueue(TransactionCase):
+    """Test cases for the commission recompute queue."""
+
+    def setUp(self):
+        super(TestCommissionQueue, self).setUp()
+        self.CommissionQueue = self.env['sales.commission.queue']
+        self.CommissionService = self.env['sales.commission.service']
+        self.partner = self.env['res.partner'].create({'name': 'Test Customer Queue'})
+        self.moves = self.env['account.move'].create([
+            {'partner_id': self.partner.id, 'move_type': 'entry'} for dummy in range(3)
+        ])
+        self.CommissionQueue.search([]).unlink()
+
+    def test_enqueue_coalesces_repeated_moves(self):
+        """Test that queuing the same invoice several times keeps one entry."""
+        self.CommissionQueue._enqueue(self.moves[:2].ids)
+        self.CommissionQueue._enqueue(self.moves.ids)
+        self.CommissionQueue._enqueue(self.moves[:1].ids)
+
+        entries = self.CommissionQueue.search([])
+        self.assertEqual(len(entries), 3)
+        self.assertEqual(entries.move_id, self.moves)
+
+    def test_queue_stats(self):
+        """Test queue depth and age statistics."""
+        stats = self.CommissionQueue._get_queue_stats()
+        self.assertEqual(stats['depth'], 0)
+        self.assertFalse(stats['oldest_date'])
+
+        self.CommissionQueue._enqueue(self.moves.ids)
+        stats = self.CommissionQueue._get_queue_stats()
+        self.assertEqual(stats['depth'], 3)
+        self.assertLessEqual(stats['oldest_date'], fields.Datetime.now())
+
+        service = self.CommissionService._get_service()
+        self.assertEqual(service.queue_depth, 3)
+        self.assertEqual(service.queue_oldest_date, stats['oldest_date'])
+
+    def test_process_queue_in_batches(self):
+        """Test that the queue is drained in batches and emptied."""
+        self.CommissionQueue._enqueue(self.moves.ids)
+        with patch.object(type(self.CommissionService), '_recompute_moves') as recompute:
+            processed = self.CommissionQueue._process_queue(batch_size=2)
+
+        self.assertEqual(processed, 3)
+        self.assertEqual(recompute.call_count, 2)
+        self.assertFalse(self.CommissionQueue.search([]))
+
+    def test_failed_invoice_requeued_then_parked(self):
+        """Test that a failing invoice does not block the batch and is parked after repeated failures."""
+        failing_move = self.moves[1]
+        recompute_moves = type(self.CommissionService)._recompute_moves
+
+        def fail_on_move(service, move_ids):
+            if failing_move.id in move_ids:
+                raise ValueError("boom")
+            return recompute_moves(service, move_ids)
+
+        self.CommissionQueue._enqueue(self.moves.ids)
+        with patch.object(type(self.CommissionService), '_recompute_moves', fail_on_move), \
+                mute_logger('odoo.addons.sales_commision_product.models.commission_queue'):
+            self.assertEqual(self.CommissionQueue._process_queue(), 2)
+            entry = self.CommissionQueue.search([])
+            self.assertEqual(entry.move_id, failing_move)
+            self.assertEqual(entry.state, 'queued')
+            self.assertEqual(entry.attempt_count, 1)
+            self.assertIn('boom', entry.error)
+
+            for dummy in range(QUEUE_MAX_ATTEMPTS - 1):
+                self.CommissionQueue._process_queue()
+            self.assertEqual(entry.state, 'failed')
+            self.assertEqual(self.CommissionQueue._process_queue(), 0)
+
+        stats = self.CommissionQueue._get_queue_stats()
+        self.assertEqual(stats['depth'], 0)
+        self.assertEqual(stats['failed'], 1)
+
+        # a new change on the invoice gives it another chance
+        self.CommissionQueue._enqueue(failing_move.ids)
+        entry.invalidate_recordset()
+        self.assertEqual(entry.state, 'queued')
+        self.assertEqual(entry.attempt_count, 0)
+
+    def test_change_during_processing_requeues(self):
+        """Test that an invoice queued again while processed stays queued."""
+        self.CommissionQueue._enqueue(self.moves[:1].ids)
+
+        def requeue(service, move_ids):
+            self.CommissionQueue._enqueue(move_ids)
+
+        with patch.object(type(self.CommissionService), '_recompute_moves', requeue):
+            self.CommissionQueue._process_queue()
+        entry = self.CommissionQueue.search([])
+        self.assertEqual(entry.move_id, self.moves[:1])
+        self.assertEqual(entry.state, 'queued')
@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+from odoo.tests.common import TransactionCase
+from odoo import fields
+from odoo.exceptions import ValidationError
+from datetime import date, timedelta
+
+from odoo.addons.sales_commision_product.models.rate_index import RateIntervalIndex
+
+
+class TestCommissionRate(TransactionCase):
+    """Test cases for effective-dated commission rates."""
+
+    def setUp(self):
+        super(TestCommissionRate, self).setUp()
+        self.CommissionRate = self.env['sales.commission.rate']
+        self.CommissionLine = self.env['sales.commission.line']
+        self.Service = self.env['sales.commission.service']
+        self.AccountMove = self.env['account.move']
+
+        company = self.env.company
+
+        self.receivable_account = self.env['account.account'].create({
+            'name': 'Test Receivable',
+            'code': 'TREC010',
+            'account_type': 'asset_receivable',
+            'reconcile': True,
+            'company_id': company.id,
+        })
+        self.income_account = self.env['account.account'].create({
+            'name': 'Test Income',
+            'code': 'TINC010',
+            'account_type': 'income',
+            'company_id': company.id,
+        })
+        self.journal = self.env['account.journal'].create({
+            'name': 'Test Sale Journal',
+            'code': 'TSJ10',
+            'type': 'sale',
+            'company_id': company.id,
+            'default_account_id': self.income_account.id,
+        })
+        self.partner = self.env['res.partner'].create({
+            'name': 'Test Customer Rate History',
+            'property_account_receivable_id': self.receivable_account.id,
+            'property_payment_term_id': False,
+        })
+        self.salesperson = self.env['res.users'].create({
+            'name': 'Test Salesperson Rate History',
+            'login': 'test_salesperson_rate_history',
+            'email': 'salesperson_rate_history@test.com',
+        })
+        self.product = self.env['product.product'].create({
+            'name': 'Product with Commission Rate History',
+            'type': 'consu',
+            'commission_rate': 10.0,
+            'list_price': 100.0,
+            'property_account_income_id': self.income_account.id,
+        })
+        self.template = self.product.product_tmpl_id
+        self.today = fields.Date.today()
+        self.last_month = self.today - timedelta(days=31)
+
+    def test_rate_interval_index(self):
+        """Test that the index finds the interval of a date and falls back outside them."""
+        index = RateIntervalIndex(
+            {1: [(date(2024, 7, 1), None, 20.0), (date(2024, 1, 1), date(2024, 3, 31), 5.0)]},
+            {1: 10.0},
+        )
+        self.assertEqual(index.get(1, date(2023, 12, 31)), 10.0)
+        self.assertEqual(index.get(1, date(2024, 1, 1)), 5.0)
+        self.assertEqual(index.get(1, date(2024, 3, 31)), 5.0)
+        self.assertEqual(index.get(1, date(2024, 4, 1)), 10.0)
+        self.assertEqual(index.get(1, date(2030, 1, 1)), 20.0)
+        self.assertEqual(index.get(2, date(2024, 1, 1)), 0.0)
+        self.assertEqual(index.get(1, None), 10.0)
+
+    def test_overlapping_periods_rejected(self):
+        """Test that rate periods of a product cannot overlap or end before they start."""
+        self.CommissionRate.create({
+            'product_tmpl_id': self.template.id,
+            'valid_from': date(2024, 1, 1),
+            'valid_to': date(2024, 6, 30),
+            'rate': 5.0,
+        })
+        with self.assertRaises(ValidationError):
+            self.CommissionRate.create({
+                'product_tmpl_id': self.template.id,
+                'valid_from': date(2024, 6, 1),
+                'rate': 7.0,
+            })
+        with self.assertRaises(ValidationError):
+            self.CommissionRate.create({
+                'product_tmpl_id': self.template.id,
+                'valid_from': date(2025, 1, 1),
+                'valid_to': date(2024, 12, 1),
+                'rate': 7.0,
+            })
+
+    def test_sync_applies_rate_on_invoice_date(self):
+        """Test that both engines apply the rate effective on each invoice date."""
+        self.CommissionRate.create({
+            'product_tmpl_id': self.template.id,
+            'valid_from': self.last_month - timedelta(days=10),
+            'valid_to': self.last_month + timedelta(days=10),
+            'rate': 5.0,
+        })
+        old_invoice = self._create_and_post_invoice(self.last_month)
+        new_invoice = self._create_and_post_invoice(self.today)
+
+        for engine in ('orm', 'sql'):
+            with self.subTest(engine=engine):
+                self.CommissionLine.search([]).unlink()
+                self.assertTrue(self.Service.run_commission_sync(engine=engine))
+                old_line = self.CommissionLine.search([('invoice_id', '=', old_invoice.id)])
+                new_line = self.CommissionLine.search([('invoice_id', '=', new_invoice.id)])
+                self.assertEqual(old_line.commission_rate, 5.0)
+                self.assertAlmostEqual(old_line.commission_amount, 5.0, places=2)
+                self.assertEqual(new_line.commission_rate, 10.0)
+                self.assertAlmostEqual(new_line.commission_amount, 10.0, places=2)
+
+    def test_history_change_restates_lines(self):
+        """Test that adding a period restates the lines it covers, and only those."""
+        old_invoice = self._create_and_post_invoice(self.last_month)
+        new_invoice = self._create_and_post_invoice(self.today)
+        self.Service.run_commission_sync()
+
+        history = self.CommissionRate.create({
+            'product_tmpl_id': self.template.id,
+            'valid_from': self.last_month,
+            'valid_to': self.last_month,
+            'rate': 5.0,
+        })
+        old_line = self.CommissionLine.search([('invoice_id', '=', old_invoice.id)])
+        new_line = self.CommissionLine.search([('invoice_id', '=', new_invoice.id)])
+        self.assertEqual(old_line.commission_rate, 5.0)
+        self.assertEqual(new_line.commission_rate, 10.0)
+
+        # the template rate does not override a covered period
+        self.template.commission_rate = 12.0
+        self.assertEqual(old_line.commission_rate, 5.0)
+        self.assertEqual(new_line.commission_rate, 12.0)
+
+        history.unlink()
+        self.assertEqual(old_line.commission_rate, 12.0)
+
+    def test_create_defaults_to_effective_rate(self):
+        """Test that a line created without rate gets the rate of its invoice date."""
+        self.CommissionRate.create({
+            'product_tmpl_id': self.template.id,
+            'valid_from': self.last_month,
+            'valid_to': self.last_month,
+            'rate': 5.0,
+        })
+        invoice = self._create_and_post_invoice(self.last_month)
+        line = self.CommissionLine.create({
+            'invoice_id': invoice.id,
+            'invoice_line_id': invoice.invoice_line_ids[0].id,
+            'salesperson_id': self.salesperson.id,
+            'product_id': self.product.id,
+            'quantity': 1.0,
+            'line_subtotal': 100.0,
+            'commission_amount': 5.0,
+        })
+        self.assertEqual(line.commission_rate, 5.0)
+
+    def _create_and_post_invoice(self, invoice_date):
+        """Helper method to create and post a customer invoice."""
+        invoice = self.AccountMove.create({
+            'partner_id': self.partner.id,
+            'invoice_user_id': self.salesperson.id,
+            'move_type': 'out_invoice',
+            'invoice_date': invoice_date,
+            'journal_id': self.journal.id,
+            'invoice_payment_term_id': False,
+            'invoice_line_ids': [(0, 0, {
+                'product_id': self.product.id,
+                'quantity': 1.0,
+                'price_unit': 100.0,
+                'account_id': self.income_account.id,
+            })],
+        })
+        invoice.action_post()
+        return invoice
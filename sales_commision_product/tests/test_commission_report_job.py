@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+from odoo.tests.common import TransactionCase
+from odoo import fields
+from odoo.exceptions import UserError
+from datetime import timedelta
+from unittest.mock import patch
+
+
+class TestCommissionReportJob(TransactionCase):
+    """Test cases for background commission report generation."""
+
+    def setUp(self):
+        super(TestCommissionReportJob, self).setUp()
+        self.ReportJob = self.env['sales.commission.report.job']
+        self.WizardReport = self.env['wizard.commission.report']
+        self.AccountMove = self.env['account.move']
+
+        company = self.env.company
+
+        self.receivable_account = self.env['account.account'].create({
+            'name': 'Test Receivable',
+            'code': 'TREC007',
+            'account_type': 'asset_receivable',
+            'reconcile': True,
+            'company_id': company.id,
+        })
+        self.income_account = self.env['account.account'].create({
+            'name': 'Test Income',
+            'code': 'TINC007',
+            'account_type': 'income',
+            'company_id': company.id,
+        })
+        self.journal = self.env['account.journal'].create({
+            'name': 'Test Sale Journal',
+            'code': 'TSJ7',
+            'type': 'sale',
+            'company_id': company.id,
+            'default_account_id': self.income_account.id,
+        })
+        self.partner = self.env['res.partner'].create({
+            'name': 'Test Customer Report Job',
+            'property_account_receivable_id': self.receivable_account.id,
+            'property_payment_term_id': False,
+        })
+        self.salesperson = self.env['res.users'].create({
+            'name': 'Test Salesperson Report Job',
+            'login': 'test_salesperson_report_job',
+            'email': 'salesperson_report_job@test.com',
+        })
+        self.product = self.env['product.product'].create({
+            'name': 'Product with Commission Report Job',
+            'type': 'consu',
+            'commission_rate': 10.0,
+            'list_price': 100.0,
+            'property_account_income_id': self.income_account.id,
+        })
+        self.today = fields.Date.today()
+
+        self._create_and_post_invoice(100.0)
+        self.env['sales.commission.service'].run_commission_sync()
+        self.wizard = self.WizardReport.create({
+            'date_from': self.today,
+            'date_to': self.today,
+            'status_filter': 'all',
+            'salesperson_ids': [(6, 0, [self.salesperson.id])],
+        })
+
+    def test_request_queues_job(self):
+        """Test that a background request queues a single job per report."""
+        action = self.wizard.action_generate_pdf_background()
+        self.assertEqual(action['tag'], 'display_notification')
+
+        job = self.ReportJob.search([('date_from', '=', self.today)])
+        self.assertEqual(len(job), 1)
+        self.assertEqual(job.state, 'queued')
+        self.assertEqual(job.report_type, 'pdf')
+        self.assertEqual(job.salesperson_ids, self.salesperson)
+
+        # the same request while the job is pending does not queue it again
+        self.wizard.action_generate_pdf_background()
+        self.assertEqual(self.ReportJob.search_count([('date_from', '=', self.today)]), 1)
+
+    def test_request_without_data(self):
+        """Test that requesting an empty report raises an error."""
+        wizard = self.WizardReport.create({
+            'date_from': self.today - timedelta(days=30),
+            'date_to': self.today - timedelta(days=30),
+            'status_filter': 'all',
+        })
+        with self.assertRaises(UserError):
+            wizard.action_generate_pdf_background()
+
+    def test_process_job_stores_attachment(self):
+        """Test that processing renders the report into an attachment."""
+        self.wizard.action_generate_pdf_background()
+        job = self.ReportJob.search([('date_from', '=', self.today)])
+
+        self.assertEqual(self.ReportJob._process_jobs(), 1)
+        self.assertEqual(job.state, 'done')
+        self.assertTrue(job.attachment_id.raw)
+        self.assertEqual(job.attachment_id.res_model, 'sales.commission.report.job')
+        self.assertEqual(job.data_fingerprint, self.wizard._get_data_fingerprint())
+
+        action = job.action_download()
+        self.assertIn(f'/web/content/{job.attachment_id.id}', action['url'])
+
+    def test_finished_job_reused_until_data_changes(self):
+        """Test that an identical request reuses the file while the data is unchanged."""
+        self.wizard.action_generate_pdf_background()
+        self.ReportJob._process_jobs()
+        job = self.ReportJob.search([('date_from', '=', self.today)])
+
+        action = self.wizard.action_generate_pdf_background()
+        self.assertEqual(action['type'], 'ir.actions.act_url')
+        self.assertIn(f'/web/content/{job.attachment_id.id}', action['url'])
+        self.assertEqual(self.ReportJob.search_count([('date_from', '=', self.today)]), 1)
+
+        # a new invoice changes the data, so the report is queued again
+        self._create_and_post_invoice(50.0)
+        self.env['sales.commission.service'].run_commission_sync()
+        action = self.wizard.action_generate_pdf_background()
+        self.assertEqual(action['tag'], 'display_notification')
+        self.assertEqual(self.ReportJob.search_count([('date_from', '=', self.today)]), 2)
+
+    def test_failed_job(self):
+        """Test that a rendering error marks the job failed."""
+        self.wizard.action_generate_pdf_background()
+        job = self.ReportJob.search([('date_from', '=', self.today)])
+
+        with patch.object(type(self.ReportJob), '_render', side_effect=ValueError("boom")):
+            self.ReportJob._process_jobs()
+
+        self.assertEqual(job.state, 'failed')
+        self.assertIn('boom', job.error)
+        self.assertFalse(job.attachment_id)
+
+    def test_stale_running_job(self):
+        """Test that a job stuck running past the timeout is failed and queued again on request."""
+        self.wizard.action_generate_pdf_background()
+        job = self.ReportJob.search([('date_from', '=', self.today)])
+        job.write({'state': 'running', 'date_started': fields.Datetime.now() - timedelta(hours=2)})
+
+        # the stuck job is not reused
+        self.wizard.action_generate_pdf_background()
+        self.assertEqual(self.ReportJob.search_count([('date_from', '=', self.today)]), 2)
+
+        self.assertEqual(self.ReportJob._process_jobs(), 1)
+        self.assertEqual(job.state, 'failed')
+        self.assertTrue(job.error)
+        self.assertTrue(job.date_done)
+
+    def _create_and_post_invoice(self, price_unit):
+        """Helper method to create and post a customer invoice."""
+        invoice = self.AccountMove.create({
+            'partner_id': self.partner.id,
+            'invoice_user_id': self.salesperson.id,
+            'move_type': 'out_invoice',
+            'invoice_date': self.today,
+            'journal_id': self.journal.id,
+            'invoice_payment_term_id': False,
+            'invoice_line_ids': [(0, 0, {
+                'product_id': self.product.id,
+                'quantity': 1.0,
+                'price_unit': price_unit,
+                'account_id': self.income_account.id,
+            })],
+        })
+        invoice.action_post()
+        return invoice
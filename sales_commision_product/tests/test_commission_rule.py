@@ -0,0 +1,207 @@
+# -*- coding: utf-8 -*-
+from odoo.tests.common import TransactionCase
+from odoo import fields
+from odoo.exceptions import ValidationError
+
+from odoo.addons.sales_commision_product.models.rule_engine import CompiledRuleSet
+
+
+class TestCommissionRule(TransactionCase):
+    """Test cases for commission rules."""
+
+    def setUp(self):
+        super(TestCommissionRule, self).setUp()
+        self.CommissionRule = self.env['sales.commission.rule']
+        self.CommissionLine = self.env['sales.commission.line']
+        self.Service = self.env['sales.commission.service']
+        self.AccountMove = self.env['account.move']
+
+        company = self.env.company
+
+        self.receivable_account = self.env['account.account'].create({
+            'name': 'Test Receivable',
+            'code': 'TREC011',
+            'account_type': 'asset_receivable',
+            'reconcile': True,
+            'company_id': company.id,
+        })
+        self.income_account = self.env['account.account'].create({
+            'name': 'Test Income',
+            'code': 'TINC011',
+            'account_type': 'income',
+            'company_id': company.id,
+        })
+        self.journal = self.env['account.journal'].create({
+            'name': 'Test Sale Journal',
+            'code': 'TSJ11',
+            'type': 'sale',
+            'company_id': company.id,
+            'default_account_id': self.income_account.id,
+        })
+        self.partner_tag = self.env['res.partner.category'].create({'name': 'Test Key Account'})
+        self.partner = self.env['res.partner'].create({
+            'name': 'Test Customer Rules',
+            'property_account_receivable_id': self.receivable_account.id,
+            'property_payment_term_id': False,
+        })
+        self.tagged_partner = self.env['res.partner'].create({
+            'name': 'Test Tagged Customer Rules',
+            'category_id': [(6, 0, [self.partner_tag.id])],
+            'property_account_receivable_id': self.receivable_account.id,
+            'property_payment_term_id': False,
+        })
+        self.salesperson = self.env['res.users'].create({
+            'name': 'Test Salesperson Rules',
+            'login': 'test_salesperson_rules',
+            'email': 'salesperson_rules@test.com',
+        })
+        self.parent_categ = self.env['product.category'].create({'name': 'Test Rule Category'})
+        self.child_categ = self.env['product.category'].create({
+            'name': 'Test Rule Subcategory',
+            'parent_id': self.parent_categ.id,
+        })
+        self.product = self.env['product.product'].create({
+            'name': 'Product with Commission Rules',
+            'type': 'consu',
+            'categ_id': self.child_categ.id,
+            'commission_rate': 10.0,
+            'list_price': 100.0,
+            'property_account_income_id': self.income_account.id,
+        })
+        self.product_no_rate = self.env['product.product'].create({
+            'name': 'Product without Commission Rate',
+            'type': 'consu',
+            'categ_id': self.child_categ.id,
+            'commission_rate': 0.0,
+            'list_price': 100.0,
+            'property_account_income_id': self.income_account.id,
+        })
+
+    def test_compiled_rule_set(self):
+        """Test that the first matching rule wins and tiers apply to the absolute amount."""
+        any_rule = {
+            'company_id': False, 'salesperson_id': False, 'team_id': False,
+            'product_categ_id': False, 'partner_category_id': False, 'min_amount': 0.0,
+        }
+        rule_set = CompiledRuleSet([
+            dict(any_rule, salesperson_id=7, min_amount=1000.0, rate=15.0),
+            dict(any_rule, salesperson_id=7, rate=12.0),
+            dict(any_rule, product_categ_id=3, partner_category_id=5, rate=8.0),
+        ])
+        self.assertEqual(len(rule_set), 3)
+        self.assertEqual(rule_set.get(1, 7, False, (3, 4), frozenset(), 1500.0), 15.0)
+        self.assertEqual(rule_set.get(1, 7, False, (3, 4), frozenset(), -1500.0), 15.0)
+        self.assertEqual(rule_set.get(1, 7, False, (3, 4), frozenset(), 100.0), 12.0)
+        self.assertEqual(rule_set.get(1, 8, False, (3, 4), frozenset({5}), 100.0), 8.0)
+        self.assertIsNone(rule_set.get(1, 8, False, (3, 4), frozenset(), 100.0))
+        self.assertIsNone(rule_set.get(1, 8, False, (4,), frozenset({5}), 100.0))
+        self.assertFalse(CompiledRuleSet([]))
+
+    def test_compiled_rule_bands(self):
+        """Test that matching rules compile into non-overlapping amount bands."""
+        any_rule = {
+            'company_id': False, 'salesperson_id': False, 'team_id': False,
+            'product_categ_id': False, 'partner_category_id': False, 'min_amount': 0.0,
+        }
+        rule_set = CompiledRuleSet([
+            dict(any_rule, salesperson_id=7, min_amount=1000.0, rate=15.0),
+            dict(any_rule, salesperson_id=7, min_amount=5000.0, rate=20.0),
+            dict(any_rule, salesperson_id=7, rate=12.0),
+            dict(any_rule, min_amount=500.0, rate=5.0),
+        ])
+        self.assertEqual(rule_set.bands(1, 7, False, (), frozenset()), [
+            (0.0, 1000.0, 12.0), (1000.0, None, 15.0),
+        ])
+        self.assertEqual(rule_set.bands(1, 8, False, (), frozenset()), [(500.0, None, 5.0)])
+
+    def test_rate_constraint(self):
+        """Test that a rule rate must be a percentage."""
+        with self.assertRaises(ValidationError):
+            self.CommissionRule.create({'name': 'Invalid', 'rate': 120.0})
+
+    def test_engines_apply_rules(self):
+        """Test that both engines give the first matching rule's rate over the product rate."""
+        self.CommissionRule.create([{
+            'name': 'Large deals',
+            'sequence': 1,
+            'salesperson_id': self.salesperson.id,
+            'min_amount': 1000.0,
+            'rate': 15.0,
+        }, {
+            'name': 'Key accounts in category',
+            'sequence': 2,
+            'product_categ_id': self.parent_categ.id,
+            'partner_category_id': self.partner_tag.id,
+            'rate': 8.0,
+        }])
+        small_invoice = self._create_and_post_invoice(self.partner, self.product, 100.0)
+        large_invoice = self._create_and_post_invoice(self.partner, self.product, 2000.0)
+        tagged_invoice = self._create_and_post_invoice(self.tagged_partner, self.product_no_rate, 100.0)
+        untagged_invoice = self._create_and_post_invoice(self.partner, self.product_no_rate, 100.0)
+
+        for engine in ('orm', 'sql'):
+            with self.subTest(engine=engine):
+                self.CommissionLine.search([]).unlink()
+                self.assertTrue(self.Service.run_commission_sync(engine=engine))
+                lines = {
+                    line.invoice_id: line
+                    for line in self.CommissionLine.search([('invoice_id', 'in', (
+                        small_invoice | large_invoice | tagged_invoice | untagged_invoice
+                    ).ids)])
+                }
+                self.assertEqual(lines[small_invoice].commission_rate, 10.0)
+                self.assertEqual(lines[large_invoice].commission_rate, 15.0)
+                self.assertAlmostEqual(lines[large_invoice].commission_amount, 300.0, places=2)
+                # the category rule matches products of its subcategories
+                self.assertEqual(lines[tagged_invoice].commission_rate, 8.0)
+                self.assertNotIn(untagged_invoice, lines)
+
+    def test_zero_rate_rule_excludes_lines(self):
+        """Test that a matching rule with a rate of 0 excludes the line from commissions."""
+        self.CommissionRule.create({
+            'name': 'No commission for this salesperson',
+            'salesperson_id': self.salesperson.id,
+            'rate': 0.0,
+        })
+        invoice = self._create_and_post_invoice(self.partner, self.product, 100.0)
+        for engine in ('orm', 'sql'):
+            with self.subTest(engine=engine):
+                self.Service.run_commission_sync(engine=engine)
+                self.assertFalse(self.CommissionLine.search([('invoice_id', '=', invoice.id)]))
+
+    def test_product_rate_change_keeps_rule_rate(self):
+        """Test that propagating a product rate change leaves rule-driven lines alone."""
+        self.CommissionRule.create({
+            'name': 'Salesperson rate',
+            'salesperson_id': self.salesperson.id,
+            'min_amount': 1000.0,
+            'rate': 15.0,
+        })
+        small_invoice = self._create_and_post_invoice(self.partner, self.product, 100.0)
+        large_invoice = self._create_and_post_invoice(self.partner, self.product, 2000.0)
+        self.Service.run_commission_sync()
+
+        self.product.product_tmpl_id.commission_rate = 12.0
+        small_line = self.CommissionLine.search([('invoice_id', '=', small_invoice.id)])
+        large_line = self.CommissionLine.search([('invoice_id', '=', large_invoice.id)])
+        self.assertEqual(small_line.commission_rate, 12.0)
+        self.assertEqual(large_line.commission_rate, 15.0)
+
+    def _create_and_post_invoice(self, partner, product, price_unit):
+        """Helper method to create and post a customer invoice."""
+        invoice = self.AccountMove.create({
+            'partner_id': partner.id,
+            'invoice_user_id': self.salesperson.id,
+            'move_type': 'out_invoice',
+            'invoice_date': fields.Date.today(),
+            'journal_id': self.journal.id,
+            'invoice_payment_term_id': False,
+            'invoice_line_ids': [(0, 0, {
+                'product_id': product.id,
+                'quantity': 1.0,
+                'price_unit': price_unit,
+                'account_id': self.income_account.id,
+            })],
+        })
+        invoice.action_post()
+        return invoice
@@ -1,7 +1,8 @@
 # -*- coding: utf-8 -*-
 from odoo.tests.common import TransactionCase
-from odoo import fields
+from odoo import api, fields
 from datetime import datetime
+import threading
 from unittest.mock import patch, MagicMock
 
 
@@ -322,6 +323,270 @@ class TestCommissionService(TransactionCase):
         self.assertTrue(commission_lines_after_second_sync)
         self.assertEqual(len(commission_lines), len(commission_lines_after_second_sync))
 
+    def test_incremental_sync_only_visits_changed_lines(self):
+        """Test that incremental sync skips lines untouched since the watermark."""
+        old_invoice = self._create_and_post_invoice()
+        self.CommissionService.run_commission_sync()
+        service = self.CommissionService._get_service()
+        self.assertTrue(service.last_sync_date)
+        self.assertTrue(service.last_full_sync_date)
+
+        # Simulate a later run: everything written so far is behind the watermark
+        service.write({'last_sync_date': fields.Datetime.add(service.last_sync_date, hours=1)})
+        self.CommissionLine.search([('invoice_id', '=', old_invoice.id)]).unlink()
+        new_invoice = self._create_and_post_invoice()
+
+        self.assertTrue(self.CommissionService.run_commission_sync(incremental=True))
+        self.assertFalse(self.CommissionLine.search([('invoice_id', '=', old_invoice.id)]))
+        self.assertTrue(self.CommissionLine.search([('invoice_id', '=', new_invoice.id)]))
+        self.assertEqual(
+            service.last_processed_move_line_id,
+            self.env['account.move.line'].search([], order='id desc', limit=1),
+        )
+
+        # A full reconcile repairs the drift
+        self.assertTrue(self.CommissionService.run_commission_sync())
+        self.assertTrue(self.CommissionLine.search([('invoice_id', '=', old_invoice.id)]))
+
+    def test_sync_watermark_trails_running_transactions(self):
+        """Test that the watermark stays behind transactions still running when a sync starts."""
+        test_start = self.env.cr.now()
+        # the test transaction is still running while another connection syncs
+        with self.registry.cursor() as cr:
+            service_model = api.Environment(cr, self.env.uid, {})['sales.commission.service']
+            self.assertLess(test_start, cr.now())
+            self.assertLessEqual(service_model._get_sync_watermark(), test_start)
+            cr.rollback()
+
+        self.CommissionService.run_commission_sync()
+        self.assertLessEqual(self.CommissionService._get_service().last_sync_date, test_start)
+
+    def test_incremental_sync_removes_cancelled_invoice_lines(self):
+        """Test that incremental sync picks up cancellations through the move write date."""
+        invoice = self._create_and_post_invoice()
+        self.CommissionService.run_commission_sync()
+        self.assertTrue(self.CommissionLine.search([('invoice_id', '=', invoice.id)]))
+
+        invoice.button_draft()
+        invoice.button_cancel()
+        self.CommissionService.run_commission_sync(incremental=True)
+        self.assertFalse(self.CommissionLine.search([('invoice_id', '=', invoice.id)]))
+
+    def test_sql_engine_matches_orm_engine(self):
+        """Test that the SQL engine produces exactly the same lines as the ORM engine."""
+        kept_invoice = self._create_and_post_invoice()
+        drifted_invoice = self._create_and_post_invoice()
+        cancelled_invoice = self._create_and_post_invoice()
+        refund = self.AccountMove.create({
+            'partner_id': self.partner.id,
+            'invoice_user_id': self.salesperson.id,
+            'move_type': 'out_refund',
+            'invoice_date': fields.Date.today(),
+            'journal_id': self.journal.id,
+            'invoice_line_ids': [(0, 0, {
+                'product_id': self.product_with_commission.id,
+                'quantity': 3.0,
+                'price_unit': 33.33,
+                'account_id': self.income_account.id,
+            })],
+        })
+        refund.action_post()
+        self.CommissionLine.search([]).unlink()
+        self.CommissionService.run_commission_sync(engine='orm')
+
+        # Put the ledger in a state that needs deletes, updates and inserts
+        self.CommissionLine.search([('invoice_id', '=', drifted_invoice.id)]).write({
+            'commission_amount': 1.0,
+            'commission_rate': 1.0,
+        })
+        self.CommissionLine.search([('invoice_id', '=', kept_invoice.id)]).unlink()
+        cancelled_invoice.button_draft()
+        cancelled_invoice.button_cancel()
+        self._create_and_post_invoice()
+
+        orm_rows = self._sync_and_snapshot('orm')
+        sql_rows = self._sync_and_snapshot('sql')
+        self.assertTrue(orm_rows)
+        self.assertEqual(orm_rows, sql_rows)
+
+    def test_commission_rate_map(self):
+        """Test the product to rate map only holds products with a rate."""
+        rate_map = self.CommissionService._get_commission_rate_map()
+        self.assertEqual(rate_map.get(self.product_with_commission.id), 15.0)
+        self.assertNotIn(self.product_without_commission.id, rate_map)
+
+    def test_run_commission_sync_in_chunks(self):
+        """Test that chunked eligibility processing gives the same lines."""
+        invoices = self._create_and_post_invoice() | self._create_and_post_invoice() | self._create_and_post_invoice()
+        self.CommissionLine.search([]).unlink()
+        with patch('odoo.addons.sales_commision_product.models.commission_service.SYNC_CHUNK_SIZE', 1):
+            self.assertTrue(self.CommissionService.run_commission_sync())
+        commission_lines = self.CommissionLine.search([('invoice_id', 'in', invoices.ids)])
+        self.assertEqual(len(commission_lines), 3)
+        for commission in commission_lines:
+            self.assertAlmostEqual(commission.commission_amount, 30.0, places=2)
+
+    def test_chunked_sync_records_progress(self):
+        """Test that a chunked sync creates lines and records its progress."""
+        invoices = self._create_and_post_invoice() | self._create_and_post_invoice()
+        self.CommissionLine.search([]).unlink()
+        with patch('odoo.addons.sales_commision_product.models.commission_service.SYNC_CHUNK_SIZE', 1):
+            self.assertTrue(self.CommissionService.run_commission_sync(chunked=True))
+
+        self.assertEqual(len(self.CommissionLine.search([('invoice_id', 'in', invoices.ids)])), 2)
+        service = self.CommissionService._get_service()
+        self.assertFalse(service.sync_run_start)
+        self.assertFalse(service.sync_cursor_move_line_id)
+        self.assertGreaterEqual(service.sync_chunks_done, 4)  # product and receivable line per invoice
+        self.assertEqual(service.sync_rows_done, service.sync_chunks_done)
+        self.assertTrue(service.last_full_sync_date)
+
+    def test_chunked_sync_resumes_after_cursor(self):
+        """Test that an interrupted chunked sync resumes after its saved cursor."""
+        first_invoice = self._create_and_post_invoice()
+        second_invoice = self._create_and_post_invoice()
+        self.CommissionLine.search([]).unlink()
+
+        # Simulate a run interrupted once the first invoice was committed
+        service = self.CommissionService._get_service()
+        service.write({
+            'sync_run_start': fields.Datetime.now(),
+            'sync_cursor_move_line_id': max(first_invoice.line_ids.ids),
+            'sync_chunks_done': 1,
+        })
+        self.assertTrue(self.CommissionService.run_commission_sync(chunked=True))
+
+        self.assertFalse(self.CommissionLine.search([('invoice_id', '=', first_invoice.id)]))
+        self.assertTrue(self.CommissionLine.search([('invoice_id', '=', second_invoice.id)]))
+        self.assertFalse(service.sync_run_start)
+
+    def test_sync_partitions_are_disjoint_and_complete(self):
+        """Test that id range partitions cover every customer invoice line once."""
+        invoices = self._create_and_post_invoice() | self._create_and_post_invoice() | self._create_and_post_invoice()
+        partitions = self.CommissionService._get_sync_partitions(
+            workers=2, scope_domain=[('move_id', 'in', invoices.ids)],
+        )
+        self.assertEqual(len(partitions), 2)
+
+        MoveLine = self.env['account.move.line']
+        seen = MoveLine
+        for partition in partitions:
+            lines = MoveLine.search([('move_id', 'in', invoices.ids)] + partition)
+            self.assertFalse(lines & seen)
+            seen |= lines
+        self.assertEqual(seen, invoices.line_ids)
+
+    def test_parallel_sync_creates_lines(self):
+        """Test that a partitioned sync gives the same lines as a serial one."""
+        invoices = self._create_and_post_invoice() | self._create_and_post_invoice()
+        self.CommissionLine.search([]).unlink()
+        self.assertTrue(self.CommissionService.run_commission_sync(workers=4))
+        commission_lines = self.CommissionLine.search([('invoice_id', 'in', invoices.ids)])
+        self.assertEqual(len(commission_lines), 2)
+
+    def test_parallel_sync_in_threads(self):
+        """Test a partitioned full sync in worker threads, each partition in its own cursor."""
+        invoices = self._create_and_post_invoice() | self._create_and_post_invoice()
+        self.CommissionLine.search([]).unlink()
+        # let worker threads open cursors on the test transaction
+        self.registry.enter_test_mode(self.cr)
+        self.addCleanup(self.registry.leave_test_mode)
+
+        threads = set()
+        partition_keys = []
+        sync_partition = type(self.CommissionService)._sync_partition
+
+        def record_thread(service, engine, scope_domain):
+            threads.add(threading.current_thread())
+            counts, keys = sync_partition(service, engine, scope_domain)
+            partition_keys.append(keys)
+            return counts, keys
+
+        with patch.object(type(self.CommissionService), '_sync_partition', record_thread):
+            self.assertTrue(self.CommissionService.run_commission_sync(engine='sql', workers=2))
+
+        self.assertTrue(threads)
+        self.assertNotIn(threading.current_thread(), threads)
+        commission_lines = self.CommissionLine.search([('invoice_id', 'in', invoices.ids)])
+        self.assertEqual(len(commission_lines), 2)
+        summary = self.env['sales.commission.summary'].search([('salesperson_id', '=', self.salesperson.id)])
+        self.assertEqual(sum(summary.mapped('line_count')), 2)
+        self.assertAlmostEqual(sum(summary.mapped('total_commission')), 60.0, places=2)
+        run = self.env['sales.commission.sync.run'].search([], limit=1)
+        self.assertEqual(run.state, 'done')
+        self.assertGreaterEqual(run.lines_created, 2)
+        self.assertTrue(self.CommissionService._get_service().last_full_sync_date)
+
+        # partitions hand the summary rows they change over instead of refreshing them
+        self._create_and_post_invoice()
+        partition_keys.clear()
+        with patch.object(type(self.CommissionService), '_sync_partition', record_thread):
+            self.assertTrue(self.CommissionService.run_commission_sync(
+                incremental=True, engine='sql', workers=2,
+            ))
+        self.assertTrue(any(partition_keys))
+        summary.invalidate_recordset()
+        self.assertEqual(sum(summary.mapped('line_count')), 3)
+        self.assertAlmostEqual(sum(summary.mapped('total_commission')), 90.0, places=2)
+
+    def test_rate_change_restates_lines(self):
+        """Test that changing a product's rate restates its lines without a sync."""
+        paid_invoice = self._create_and_post_invoice()
+        open_invoice = self._create_and_post_invoice()
+        self._mark_invoice_paid(paid_invoice)
+        self.CommissionService.run_commission_sync()
+
+        self.product_with_commission.product_tmpl_id.commission_rate = 20.0
+
+        for invoice in paid_invoice | open_invoice:
+            line = self.CommissionLine.search([('invoice_id', '=', invoice.id)])
+            self.assertEqual(line.commission_rate, 20.0)
+            self.assertAlmostEqual(line.commission_amount, 40.0, places=2)
+
+    def test_rate_change_keeps_paid_lines(self):
+        """Test that the keep_paid policy keeps the rate of paid lines, also through syncs."""
+        self.env['ir.config_parameter'].sudo().set_param(
+            'sales_commision_product.rate_change_policy', 'keep_paid',
+        )
+        paid_invoice = self._create_and_post_invoice()
+        open_invoice = self._create_and_post_invoice()
+        self._mark_invoice_paid(paid_invoice)
+        self.CommissionService.run_commission_sync()
+
+        self.product_with_commission.product_tmpl_id.commission_rate = 20.0
+
+        paid_line = self.CommissionLine.search([('invoice_id', '=', paid_invoice.id)])
+        open_line = self.CommissionLine.search([('invoice_id', '=', open_invoice.id)])
+        self.assertEqual(paid_line.commission_rate, 15.0)
+        self.assertAlmostEqual(paid_line.commission_amount, 30.0, places=2)
+        self.assertEqual(open_line.commission_rate, 20.0)
+        self.assertAlmostEqual(open_line.commission_amount, 40.0, places=2)
+
+        orm_rows = self._sync_and_snapshot('orm')
+        sql_rows = self._sync_and_snapshot('sql')
+        self.assertEqual(orm_rows, sql_rows)
+        rates = {row[0]: row[5] for row in orm_rows}
+        self.assertEqual(rates[paid_line.invoice_line_id.id], 15.0)
+        self.assertEqual(rates[open_line.invoice_line_id.id], 20.0)
+
+    def _sync_and_snapshot(self, engine):
+        """Run a sync with ``engine`` and return the commission lines, then roll back."""
+        cr = self.env.cr
+        cr.execute('SAVEPOINT commission_engine_compare')
+        self.assertTrue(self.CommissionService.run_commission_sync(engine=engine))
+        self.env.flush_all()
+        cr.execute("""
+            SELECT invoice_line_id, salesperson_id, invoice_id, product_id, quantity,
+                   commission_rate, commission_amount, line_subtotal, company_id,
+                   invoice_date, move_type, company_currency_id, invoice_state, payment_state
+              FROM sales_commission_line
+             ORDER BY invoice_line_id
+        """)
+        rows = cr.fetchall()
+        cr.execute('ROLLBACK TO SAVEPOINT commission_engine_compare')
+        self.env.invalidate_all()
+        return rows
+
     # NOTE: Removed test_run_commission_sync_error_handling
     # Odoo model methods like 'search' are read-only and cannot be mocked with patch.object.
     # Error handling is tested implicitly through other test scenarios.
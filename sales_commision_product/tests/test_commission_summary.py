@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+from odoo.tests.common import TransactionCase
+from odoo import fields
+from odoo.tools import date_utils
+from datetime import timedelta
+
+
+class TestCommissionSummary(TransactionCase):
+    """Test cases for the monthly commission summary."""
+
+    def setUp(self):
+        super(TestCommissionSummary, self).setUp()
+        self.CommissionLine = self.env['sales.commission.line']
+        self.CommissionService = self.env['sales.commission.service']
+        self.Summary = self.env['sales.commission.summary']
+        self.AccountMove = self.env['account.move']
+
+        company = self.env.company
+
+        self.receivable_account = self.env['account.account'].create({
+            'name': 'Test Receivable',
+            'code': 'TREC006',
+            'account_type': 'asset_receivable',
+            'reconcile': True,
+            'company_id': company.id,
+        })
+        self.income_account = self.env['account.account'].create({
+            'name': 'Test Income',
+            'code': 'TINC006',
+            'account_type': 'income',
+            'company_id': company.id,
+        })
+        self.journal = self.env['account.journal'].create({
+            'name': 'Test Sale Journal',
+            'code': 'TSJ6',
+            'type': 'sale',
+            'company_id': company.id,
+            'default_account_id': self.income_account.id,
+        })
+        self.partner = self.env['res.partner'].create({
+            'name': 'Test Customer Summary',
+            'property_account_receivable_id': self.receivable_account.id,
+            'property_payment_term_id': False,
+        })
+        self.salesperson = self.env['res.users'].create({
+            'name': 'Test Salesperson Summary',
+            'login': 'test_salesperson_summary',
+            'email': 'salesperson_summary@test.com',
+        })
+        self.product = self.env['product.product'].create({
+            'name': 'Product with Commission Summary',
+            'type': 'consu',
+            'commission_rate': 10.0,
+            'list_price': 100.0,
+            'property_account_income_id': self.income_account.id,
+        })
+        self.month = date_utils.start_of(fields.Date.today(), 'month')
+
+    def test_full_sync_rebuilds_summary(self):
+        """Test that a full sync aggregates invoices and refunds per month."""
+        self._create_and_post_move('out_invoice', 200.0)
+        self._create_and_post_move('out_invoice', 100.0)
+        self._create_and_post_move('out_refund', 50.0)
+        self.CommissionService.run_commission_sync()
+
+        invoices = self._get_summary('out_invoice')
+        self.assertEqual(invoices.line_count, 2)
+        self.assertAlmostEqual(invoices.total_sales, 300.0, places=2)
+        self.assertAlmostEqual(invoices.total_commission, 30.0, places=2)
+
+        refunds = self._get_summary('out_refund')
+        self.assertEqual(refunds.line_count, 1)
+        self.assertAlmostEqual(refunds.total_returns, 50.0, places=2)
+        self.assertAlmostEqual(refunds.total_commission, -5.0, places=2)
+
+    def test_line_changes_refresh_only_touched_keys(self):
+        """Test that changed lines refresh their own summary rows only."""
+        invoice = self._create_and_post_move('out_invoice', 200.0)
+        self._create_and_post_move('out_refund', 50.0)
+        self.CommissionService.run_commission_sync()
+        refunds = self._get_summary('out_refund')
+        # Tamper with an untouched key: an incremental refresh must leave it alone
+        self.env.cr.execute(
+            "UPDATE sales_commission_summary SET line_count = 99 WHERE id = %s", [refunds.id],
+        )
+
+        self.CommissionLine.search([('invoice_id', '=', invoice.id)]).write({'commission_amount': 1.0})
+        self.Summary._refresh_dirty()
+        self.Summary.invalidate_model()
+
+        self.assertAlmostEqual(self._get_summary('out_invoice').total_commission, 1.0, places=2)
+        self.assertEqual(self._get_summary('out_refund').line_count, 99)
+
+        self.CommissionLine.search([('invoice_id', '=', invoice.id)]).unlink()
+        self.Summary._refresh_dirty()
+        self.assertFalse(self._get_summary('out_invoice'))
+
+    def test_sql_engine_marks_summary_keys(self):
+        """Test that the SQL engine refreshes the summary of the lines it writes."""
+        self.CommissionService.run_commission_sync(engine='sql')
+        invoice = self._create_and_post_move('out_invoice', 200.0)
+        self.CommissionService.run_commission_sync(incremental=True, engine='sql')
+        self.assertAlmostEqual(self._get_summary('out_invoice').total_commission, 20.0, places=2)
+
+        invoice.button_draft()
+        self.CommissionService.run_commission_sync(incremental=True, engine='sql')
+        self.assertFalse(self._get_summary('out_invoice'))
+
+    def test_invoice_date_change_refreshes_old_month(self):
+        """Test that redating an invoice refreshes the summary row of the month it leaves."""
+        invoice = self._create_and_post_move('out_invoice', 200.0)
+        self.CommissionService.run_commission_sync()
+        self.assertTrue(self._get_summary('out_invoice'))
+
+        previous_month = self.month - timedelta(days=1)
+        invoice.button_draft()
+        invoice.write({'invoice_date': previous_month})
+        invoice.action_post()
+        self.CommissionService.run_commission_sync(incremental=True)
+        self.Summary._refresh_dirty()
+        self.Summary.invalidate_model()
+
+        self.assertFalse(self._get_summary('out_invoice'))
+        self.assertAlmostEqual(
+            self._get_summary('out_invoice', date_utils.start_of(previous_month, 'month')).total_commission,
+            20.0, places=2,
+        )
+
+    def test_salesman_reads_own_summary(self):
+        """Test that a salesman can read the summary rows of their own commissions."""
+        self._create_and_post_move('out_invoice', 200.0)
+        self.CommissionService.run_commission_sync()
+        self.salesperson.groups_id = [(4, self.env.ref('sales_team.group_sale_salesman').id)]
+
+        summary = self.Summary.with_user(self.salesperson).search([])
+        self.assertTrue(summary)
+        self.assertEqual(summary.salesperson_id, self.salesperson)
+
+    def _get_summary(self, move_type, month=None):
+        return self.Summary.search([
+            ('salesperson_id', '=', self.salesperson.id),
+            ('date', '=', month or self.month),
+            ('move_type', '=', move_type),
+        ])
+
+    def _create_and_post_move(self, move_type, price_unit):
+        """Helper method to create and post a customer invoice or refund."""
+        move = self.AccountMove.create({
+            'partner_id': self.partner.id,
+            'invoice_user_id': self.salesperson.id,
+            'move_type': move_type,
+            'invoice_date': fields.Date.today(),
+            'journal_id': self.journal.id,
+            'invoice_payment_term_id': False,
+            'invoice_line_ids': [(0, 0, {
+                'product_id': self.product.id,
+                'quantity': 1.0,
+                'price_unit': price_unit,
+                'account_id': self.income_account.id,
+            })],
+        })
+        move.action_post()
+        return move
@@ -0,0 +1,189 @@
+# -*- coding: utf-8 -*-
+from odoo.tests.common import TransactionCase
+from odoo import fields
+from unittest.mock import patch
+
+
+class TestCommissionSyncRun(TransactionCase):
+    """Test cases for the commission sync run history."""
+
+    def setUp(self):
+        super(TestCommissionSyncRun, self).setUp()
+        self.SyncRun = self.env['sales.commission.sync.run']
+        self.Service = self.env['sales.commission.service']
+        self.CommissionLine = self.env['sales.commission.line']
+        self.AccountMove = self.env['account.move']
+
+        company = self.env.company
+
+        self.receivable_account = self.env['account.account'].create({
+            'name': 'Test Receivable',
+            'code': 'TREC009',
+            'account_type': 'asset_receivable',
+            'reconcile': True,
+            'company_id': company.id,
+        })
+        self.income_account = self.env['account.account'].create({
+            'name': 'Test Income',
+            'code': 'TINC009',
+            'account_type': 'income',
+            'company_id': company.id,
+        })
+        self.journal = self.env['account.journal'].create({
+            'name': 'Test Sale Journal',
+            'code': 'TSJ9',
+            'type': 'sale',
+            'company_id': company.id,
+            'default_account_id': self.income_account.id,
+        })
+        self.partner = self.env['res.partner'].create({
+            'name': 'Test Customer Sync Run',
+            'property_account_receivable_id': self.receivable_account.id,
+            'property_payment_term_id': False,
+        })
+        self.salesperson = self.env['res.users'].create({
+            'name': 'Test Salesperson Sync Run',
+            'login': 'test_salesperson_sync_run',
+            'email': 'salesperson_sync_run@test.com',
+        })
+        self.product_with_commission = self.env['product.product'].create({
+            'name': 'Product with Commission Sync Run',
+            'type': 'consu',
+            'commission_rate': 10.0,
+            'list_price': 100.0,
+            'property_account_income_id': self.income_account.id,
+        })
+        self.product_without_commission = self.env['product.product'].create({
+            'name': 'Product without Commission Sync Run',
+            'type': 'consu',
+            'commission_rate': 0.0,
+            'list_price': 50.0,
+            'property_account_income_id': self.income_account.id,
+        })
+        self.today = fields.Date.today()
+        self.invoice = self._create_and_post_invoice()
+
+    def test_sync_records_run_counts(self):
+        """Test that a sync records its counts, skipping lines without a rate."""
+        scan_counts = {}
+        for engine in ('orm', 'sql'):
+            with self.subTest(engine=engine):
+                self.CommissionLine.search([]).unlink()
+                self.assertTrue(self.Service.run_commission_sync(engine=engine))
+
+                run = self._get_last_run()
+                self.assertEqual(run.state, 'done')
+                self.assertEqual(run.mode, 'full')
+                self.assertEqual(run.engine, engine)
+                self.assertEqual(run.user_id, self.env.user)
+                self.assertGreaterEqual(run.lines_scanned, 2)
+                self.assertGreaterEqual(run.lines_skipped, 1)
+                self.assertGreaterEqual(run.lines_created, 1)
+                self.assertEqual(run.lines_deleted, 0)
+                self.assertTrue(run.end_date >= run.start_date)
+                scan_counts[engine] = (run.lines_scanned, run.lines_skipped)
+        # both engines count the rows they process the same way
+        self.assertEqual(scan_counts['orm'], scan_counts['sql'])
+
+    def test_incremental_run_scope(self):
+        """Test that an incremental run only counts the lines it visited."""
+        self.Service.run_commission_sync()
+        self.invoice.button_draft()
+        self.assertTrue(self.Service.run_commission_sync(incremental=True))
+
+        run = self._get_last_run()
+        self.assertEqual(run.mode, 'incremental')
+        self.assertEqual(run.lines_scanned, 0)  # the reset invoice is no longer posted
+        self.assertEqual(run.lines_created, 0)
+        self.assertEqual(run.lines_deleted, 1)
+
+    def test_chunked_run_counts(self):
+        """Test that a chunked run adds up the counts of its chunks."""
+        self.CommissionLine.search([]).unlink()
+        with patch('odoo.addons.sales_commision_product.models.commission_service.SYNC_CHUNK_SIZE', 1):
+            self.assertTrue(self.Service.run_commission_sync(chunked=True))
+
+        run = self._get_last_run()
+        self.assertTrue(run.chunked)
+        self.assertEqual(run.lines_created, len(self.CommissionLine.search([])))
+        self.assertGreaterEqual(run.lines_skipped, 1)
+
+    def test_failed_run(self):
+        """Test that a failed sync is recorded and rolled back."""
+        self.CommissionLine.search([]).unlink()
+        with patch.object(type(self.Service), '_finish_sync', side_effect=ValueError("boom")):
+            self.assertFalse(self.Service.run_commission_sync())
+
+        run = self._get_last_run()
+        self.assertEqual(run.state, 'failed')
+        self.assertIn('boom', run.error)
+        self.assertFalse(self.CommissionLine.search([('invoice_id', '=', self.invoice.id)]))
+
+    def test_profiled_run_links_profile(self):
+        """Test that a profiled sync run links to its profiling run."""
+        self.env['ir.config_parameter'].sudo().set_param('sales_commision_product.profiling', '1')
+        self.Service.run_commission_sync()
+
+        run = self._get_last_run()
+        self.assertTrue(run.profile_id)
+        self.assertEqual(run.profile_id.operation, 'sync')
+
+    def test_wizard_shows_run_counts(self):
+        """Test that the sync wizard shows the counts of its own run."""
+        self.CommissionLine.search([]).unlink()
+        wizard = self.env['wizard.commission.sync'].create({'full_reconcile': True})
+        wizard.action_run_sync()
+
+        self.assertEqual(wizard.sync_run_id, self._get_last_run())
+        self.assertIn('Invoice lines scanned', wizard.message)
+        self.assertIn(f'<strong>{wizard.sync_run_id.lines_created}</strong>', wizard.message)
+
+    def test_wizard_links_its_own_run(self):
+        """Test that the wizard links the run of its sync, not a later one."""
+        run_commission_sync = type(self.Service)._run_commission_sync
+        own_runs = []
+
+        def sync_then_concurrent_run(service, *args, **kwargs):
+            own_runs.append(run_commission_sync(service, *args, **kwargs))
+            # another sync recorded meanwhile, e.g. by the cron
+            self.SyncRun._record({'start_date': fields.Datetime.now(), 'mode': 'incremental'}, {}, 0.0)
+            return own_runs[-1]
+
+        wizard = self.env['wizard.commission.sync'].create({'full_reconcile': True})
+        with patch.object(type(self.Service), '_run_commission_sync', sync_then_concurrent_run):
+            wizard.action_run_sync()
+
+        self.assertEqual(wizard.sync_run_id, own_runs[0])
+        self.assertNotEqual(wizard.sync_run_id, self._get_last_run())
+        self.assertEqual(wizard.sync_run_id.mode, 'full')
+
+    def _get_last_run(self):
+        """Return the most recent sync run."""
+        return self.SyncRun.search([], limit=1)
+
+    def _create_and_post_invoice(self):
+        """Helper method to create and post an invoice with and without commission."""
+        invoice = self.AccountMove.create({
+            'partner_id': self.partner.id,
+            'invoice_user_id': self.salesperson.id,
+            'move_type': 'out_invoice',
+            'invoice_date': self.today,
+            'journal_id': self.journal.id,
+            'invoice_payment_term_id': False,
+            'invoice_line_ids': [
+                (0, 0, {
+                    'product_id': self.product_with_commission.id,
+                    'quantity': 1.0,
+                    'price_unit': 100.0,
+                    'account_id': self.income_account.id,
+                }),
+                (0, 0, {
+                    'product_id': self.product_without_commission.id,
+                    'quantity': 1.0,
+                    'price_unit': 50.0,
+                    'account_id': self.income_account.id,
+                }),
+            ],
+        })
+        invoice.action_post()
+        return invoice
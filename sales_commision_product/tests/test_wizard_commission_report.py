@@ -5,6 +5,9 @@ from odoo.exceptions import UserError
 from datetime import datetime, timedelta
 from unittest.mock import patch, MagicMock
 
+from odoo.addons.sales_commision_product.models import report_cache as report_cache_module
+from odoo.addons.sales_commision_product.models.report_cache import ReportDataCache, report_data_cache
+
 
 class TestWizardCommissionReport(TransactionCase):
     """Test cases for commission financial report wizard."""
@@ -320,6 +323,118 @@ class TestWizardCommissionReport(TransactionCase):
         self.assertGreater(sp_data['total_returns'], 0)
         self.assertLess(sp_data['total_commission'], 0)
 
+    def test_get_commission_data_totals_match_lines(self):
+        """Test that database-side totals match the detail lines."""
+        self._create_invoice(self.salesperson1).action_post()
+        self._create_invoice(self.salesperson1).action_post()
+        refund = self.AccountMove.create({
+            'partner_id': self.partner.id,
+            'invoice_user_id': self.salesperson1.id,
+            'move_type': 'out_refund',
+            'invoice_date': self.today,
+            'journal_id': self.journal.id,
+            'invoice_line_ids': [(0, 0, {
+                'product_id': self.product.id,
+                'quantity': 1.0,
+                'price_unit': 40.0,
+            })],
+        })
+        refund.action_post()
+        self.env['sales.commission.service'].run_commission_sync()
+
+        wizard = self.WizardReport.create({
+            'date_from': self.today,
+            'date_to': self.today,
+            'status_filter': 'all',
+            'salesperson_ids': [(6, 0, [self.salesperson1.id])],
+        })
+        data = wizard._get_commission_data()
+
+        self.assertEqual(len(data), 1)
+        sp_data = data[0]
+        self.assertEqual(len(sp_data['lines']), 3)
+        self.assertAlmostEqual(sp_data['total_sales'], 200.0, places=2)
+        self.assertAlmostEqual(sp_data['total_returns'], 40.0, places=2)
+        self.assertAlmostEqual(
+            sp_data['total_commission'],
+            sum(line['commission_amount'] for line in sp_data['lines']),
+            places=2,
+        )
+        self.assertEqual(
+            {line['invoice_number'] for line in sp_data['lines']},
+            set(self.env['account.move'].search([
+                ('invoice_user_id', '=', self.salesperson1.id),
+            ]).mapped('name')),
+        )
+
+    def test_get_commission_data_cached(self):
+        """Test that an identical report is served from the cache until the data changes."""
+        self._create_invoice(self.salesperson1).action_post()
+        self.env['sales.commission.service'].run_commission_sync()
+        self._simulate_commit()
+        report_data_cache.clear()
+        # entries cached here outlive the test transaction rollback
+        self.addCleanup(report_data_cache.clear)
+
+        wizard = self.WizardReport.create({
+            'date_from': self.today,
+            'date_to': self.today,
+            'status_filter': 'all',
+        })
+        data = wizard._get_commission_data()
+        with patch.object(type(self.WizardReport), '_get_commission_totals') as compute:
+            cached = wizard.copy()._get_commission_data()
+        compute.assert_not_called()
+        self.assertEqual(cached, data)
+        self.assertEqual(cached[0]['salesperson'], self.salesperson1)
+        # only the totals are cached, detail lines are read for each report
+        self.assertEqual(
+            report_data_cache.get(wizard._get_report_cache_key(), max_age=60),
+            {self.salesperson1.id: {
+                key: data[0][key] for key in ('total_sales', 'total_returns', 'total_commission')
+            }},
+        )
+        self.assertEqual(report_data_cache.stats(), {'hits': 2, 'misses': 1, 'entries': 1})
+
+        # new commission lines bump the data version
+        self._create_invoice(self.salesperson1).action_post()
+        self.env['sales.commission.service'].run_commission_sync()
+        self._simulate_commit()
+        data = wizard._get_commission_data()
+        self.assertEqual(len(data[0]['lines']), 2)
+        self.assertEqual(report_data_cache.stats()['misses'], 2)
+
+    def test_get_commission_data_not_cached_before_commit(self):
+        """Test that data changed by the current transaction is not cached."""
+        report_data_cache.clear()
+        self._create_invoice(self.salesperson1).action_post()
+        self.env['sales.commission.service'].run_commission_sync()
+
+        wizard = self.WizardReport.create({
+            'date_from': self.today,
+            'date_to': self.today,
+            'status_filter': 'all',
+        })
+        wizard._get_commission_data()
+        self.assertEqual(report_data_cache.stats()['entries'], 0)
+
+    def test_report_cache_eviction(self):
+        """Test size and age based eviction of the report cache."""
+        cache = ReportDataCache()
+        with patch.object(report_cache_module.time, 'monotonic', return_value=100.0):
+            cache.put('a', [1], max_size=2)
+            cache.put('b', [2], max_size=2)
+            self.assertEqual(cache.get('a', max_age=60), [1])
+            cache.put('c', [3], max_size=2)
+        # 'b' was the least recently used entry
+        self.assertEqual(cache.stats()['entries'], 2)
+        with patch.object(report_cache_module.time, 'monotonic', return_value=130.0):
+            self.assertIsNone(cache.get('b', max_age=60))
+            self.assertEqual(cache.get('c', max_age=60), [3])
+        with patch.object(report_cache_module.time, 'monotonic', return_value=200.0):
+            self.assertIsNone(cache.get('a', max_age=60))
+        self.assertEqual(cache.stats(), {'hits': 2, 'misses': 2, 'entries': 1})
+
     def test_action_print_excel_no_data(self):
         """Test Excel export with no data raises error."""
         wizard = self.WizardReport.create({
@@ -355,6 +470,96 @@ class TestWizardCommissionReport(TransactionCase):
             # Skip test if openpyxl not installed
             self.skipTest("openpyxl not installed")
 
+    def test_action_print_excel_streaming(self):
+        """Test the streaming Excel export pages through every line."""
+        self._create_invoice(self.salesperson1).action_post()
+        self._create_invoice(self.salesperson1).action_post()
+        self._create_invoice(self.salesperson2).action_post()
+        self.env['sales.commission.service'].run_commission_sync()
+        
+        wizard = self.WizardReport.create({
+            'date_from': self.today,
+            'date_to': self.today,
+            'status_filter': 'all',
+        })
+        lines = list(wizard._iter_commission_lines(self.salesperson1, batch_size=1))
+        self.assertEqual(len(lines), 2)
+        self.assertEqual(len({line['invoice_id'] for line in lines}), 2)
+        
+        try:
+            import xlsxwriter
+        except ImportError:
+            self.skipTest("xlsxwriter not installed")
+        result = wizard.action_print_excel_streaming()
+        self.assertEqual(result['type'], 'ir.actions.act_url')
+        attachment_id = int(result['url'].split('/web/content/')[1].split('?')[0])
+        attachment = self.env['ir.attachment'].browse(attachment_id)
+        self.assertTrue(attachment.raw.startswith(b'PK'))
+        
+        try:
+            import openpyxl
+        except ImportError:
+            return
+        from io import BytesIO
+        workbook = openpyxl.load_workbook(BytesIO(attachment.raw), read_only=True)
+        self.assertEqual(workbook.sheetnames, ['Summary', 'Detailed Lines'])
+        detail_rows = list(workbook['Detailed Lines'].iter_rows(min_row=2, values_only=True))
+        self.assertEqual(len(detail_rows), 3)
+
+    def test_action_print_excel_streaming_no_data(self):
+        """Test streaming Excel export with no data raises error."""
+        wizard = self.WizardReport.create({
+            'date_from': self.today,
+            'date_to': self.today,
+        })
+        with self.assertRaises(UserError):
+            wizard.action_print_excel_streaming()
+
+    def test_action_export_csv(self):
+        """Test the raw CSV export streams every filtered line."""
+        self._create_invoice(self.salesperson1).action_post()
+        self._create_invoice(self.salesperson1).action_post()
+        self._create_invoice(self.salesperson2).action_post()
+        self.env['sales.commission.service'].run_commission_sync()
+        
+        wizard = self.WizardReport.create({
+            'date_from': self.today,
+            'date_to': self.today,
+            'status_filter': 'all',
+            'salesperson_ids': [(6, 0, [self.salesperson1.id])],
+        })
+        batches = list(wizard._iter_export_batches(batch_size=1))
+        self.assertEqual(len(batches), 2)
+        
+        result = wizard.action_export_csv()
+        attachment_id = int(result['url'].split('/web/content/')[1].split('?')[0])
+        content = self.env['ir.attachment'].browse(attachment_id).raw.decode('utf-8')
+        rows = [line.split(',') for line in content.strip().splitlines()]
+        self.assertEqual(rows[0][0], 'commission_line_id')
+        self.assertEqual(len(rows), 3)
+        self.assertTrue(all(row[3] == 'Salesperson One' for row in rows[1:]))
+
+    def test_action_export_parquet(self):
+        """Test the raw Parquet export."""
+        try:
+            import pyarrow.parquet
+        except ImportError:
+            self.skipTest("pyarrow not installed")
+        self._create_invoice(self.salesperson1).action_post()
+        self.env['sales.commission.service'].run_commission_sync()
+        
+        wizard = self.WizardReport.create({
+            'date_from': self.today,
+            'date_to': self.today,
+            'status_filter': 'all',
+        })
+        result = wizard.action_export_parquet()
+        attachment_id = int(result['url'].split('/web/content/')[1].split('?')[0])
+        from io import BytesIO
+        table = pyarrow.parquet.read_table(BytesIO(self.env['ir.attachment'].browse(attachment_id).raw))
+        self.assertEqual(table.num_rows, 1)
+        self.assertEqual(table.column('salesperson_id').to_pylist(), [self.salesperson1.id])
+
     def test_action_print_excel_no_openpyxl(self):
         """Test Excel export without openpyxl raises error."""
         invoice = self._create_invoice(self.salesperson1)
@@ -400,6 +605,26 @@ class TestWizardCommissionReport(TransactionCase):
         # Should return report action
         self.assertIn('type', result)
 
+    def test_report_values_compute_data_once(self):
+        """Test that the PDF report model builds the commission data once per wizard."""
+        self._create_invoice(self.salesperson1).action_post()
+        self.env['sales.commission.service'].run_commission_sync()
+        wizard = self.WizardReport.create({
+            'date_from': self.today,
+            'date_to': self.today,
+            'status_filter': 'all',
+        })
+        self.assertTrue(wizard._has_commission_data())
+
+        report = self.env['report.sales_commision_product.report_commission_financial_document']
+        with patch.object(
+            type(wizard), '_get_commission_data', autospec=True, return_value=[],
+        ) as get_data:
+            values = report._get_report_values(wizard.ids)
+        self.assertEqual(get_data.call_count, 1)
+        self.assertEqual(values['docs'], wizard)
+        self.assertEqual(values['commission_data'], {wizard.id: []})
+
     def test_wizard_transient_model(self):
         """Test that wizard is a transient model."""
         self.assertEqual(self.WizardReport._transient, True)
@@ -424,6 +649,11 @@ class TestWizardCommissionReport(TransactionCase):
             })],
         })
 
+    def _simulate_commit(self):
+        """Forget the uncommitted-change marker, as a commit would."""
+        self.env.flush_all()
+        self.env.cr.postcommit.clear()
+
     def _mark_invoice_paid(self, invoice):
         """Helper method to mark invoice as paid."""
         try: